@@ -1,5 +1,9 @@
+import sys
+
 import ply.lex as lex
 
+import tablas
+
 # Definimos los tokens
 tokens = [
     # Palabras reservadas
@@ -110,11 +114,12 @@ def t_error(t):
     print("Carácter ilegal '%s'" % t.value[0])
     t.lexer.skip(1)
 
-# Construimos el lexer
-lexer = lex.lex()
+if __name__ == '__main__':
+    # Construimos el lexer (o lo cargamos de la caché de tablas)
+    lexer = tablas.lexer(sys.modules[__name__])
 
-# Ejemplo de uso
-data = '''
+    # Ejemplo de uso
+    data = '''
 class MyClass:
     def __init__(self, x):
         self.x = x
@@ -126,12 +131,12 @@ obj = MyClass(5)
 print(obj.getX())
 '''
 
-# Pasamos el código al lexer
-lexer.input(data)
+    # Pasamos el código al lexer
+    lexer.input(data)
 
-# Imprimimos los tokens encontrados
-while True:
-    tok = lexer.token()
-    if not tok:
-        break
-    print(tok)
+    # Imprimimos los tokens encontrados
+    while True:
+        tok = lexer.token()
+        if not tok:
+            break
+        print(tok)
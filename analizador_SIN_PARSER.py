@@ -1,6 +1,10 @@
+import sys
+
 import ply.lex as lex
 import ply.yacc as yacc
 
+import tablas
+
 # Definimos los tokens
 tokens = [
     # Palabras reservadas
@@ -138,27 +142,28 @@ def t_error(t):
     print("Carácter ilegal '%s'" % t.value[0])
     t.lexer.skip(1)
 
-# Construimos el lexer
-lexer = lex.lex()
+if __name__ == '__main__':
+    # Construimos el lexer (o lo cargamos de la caché de tablas)
+    lexer = tablas.lexer(sys.modules[__name__])
 
-# Archivo de entrada
-filename = 'code.txt'
+    # Archivo de entrada
+    filename = 'code.txt'
 
-# Construye el parser
-parser = yacc.yacc()
+    # Construye el parser (o lo carga de la caché de tablas)
+    parser = tablas.parser(sys.modules[__name__])
 
 
-# Abrir el archivo y leer su contenido
-with open(filename, 'r') as file:
-    data = file.read()
-parsed_data = parser.parse(data)
-# Pasamos el contenido del archivo al lexer
-lexer.input(data)
+    # Abrir el archivo y leer su contenido
+    with open(filename, 'r') as file:
+        data = file.read()
+    parsed_data = parser.parse(data)
+    # Pasamos el contenido del archivo al lexer
+    lexer.input(data)
 
-# Imprimimos los tokens encontrados
-while True:
-    tok = lexer.token()
-    if not tok:
-        break
-    print(tok)
+    # Imprimimos los tokens encontrados
+    while True:
+        tok = lexer.token()
+        if not tok:
+            break
+        print(tok)
 
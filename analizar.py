@@ -0,0 +1,94 @@
+import sys
+
+import ll_2
+import lotes
+
+# Línea de comandos del analizador de ll_2.py:
+#   python analizar.py [--tokens] [--validar] [--primer-error] [--cache]
+#                      [--procesos[=N]] [archivo o directorio ...]
+# Sin archivos, o con -, lee la entrada estándar; de un directorio se
+# analizan todos los .py. Con --tokens imprime los tokens (con NEWLINE, INDENT
+# y DEDENT) en lugar de analizar, sin construir el parser. Con --validar solo
+# se reconoce, sin acciones semánticas (más rápido, mismos errores), y con
+# --primer-error se informa solo del primer error de cada archivo. Con
+# --cache, los archivos cuyo contenido ya se analizó no se vuelven a
+# analizar: el resultado sale de la caché persistente de
+# ll_2.get_result_cache() (ver cache_resultados.py). Con --procesos los
+# archivos se analizan en N procesos (por defecto, todos los procesadores),
+# los más grandes primero (ver lotes.py), y los resultados salen según
+# terminan. Termina con estado 1 si algún archivo tiene errores.
+
+OPCIONES = ('--tokens', '--validar', '--primer-error', '--cache', '--procesos')
+
+USO = ('uso: python analizar.py [--tokens] [--validar] [--primer-error] [--cache] [--procesos[=N]] '
+       '[archivo o directorio ...]')
+
+
+def leer(nombre):
+    if nombre == '-':
+        return sys.stdin.read()
+    with open(nombre, encoding='utf-8') as f:
+        return f.read()
+
+
+# Imprime el resultado de un archivo; devuelve el estado (0 o 1)
+def informar(nombre, result, prefijo, exito=True):
+    if result is True:
+        if exito:
+            print('%sAnálisis exitoso. El código de entrada pertenece al lenguaje.'
+                  % (nombre + ': ' if prefijo else ''))
+        return 0
+    for error in result:
+        print('%s%s' % (nombre + ': ' if prefijo else '', error))
+    return 1
+
+
+def main(argumentos):
+    solo_tokens = '--tokens' in argumentos
+    validar = '--validar' in argumentos
+    primer_error = '--primer-error' in argumentos
+    procesos = None
+    archivos = []
+    for a in argumentos:
+        if a == '--procesos':
+            procesos = 0
+        elif a.startswith('--procesos=') and a[len('--procesos='):].isdigit():
+            procesos = int(a[len('--procesos='):])
+        elif a not in OPCIONES:
+            archivos.append(a)
+    if any(a.startswith('--') for a in archivos) or (procesos is not None and (solo_tokens or '-' in archivos)):
+        print(USO, file=sys.stderr)
+        return 2
+    archivos = lotes.archivos(archivos or ['-'])
+    prefijo = len(archivos) > 1
+    if procesos is not None:
+        estado = 0
+        for nombre, _, result in ll_2.analyze_files(archivos, procesos or None, validar, primer_error,
+                                                    '--cache' in argumentos):
+            estado |= informar(nombre, result, True)
+        return estado
+    cache = ll_2.get_result_cache() if '--cache' in argumentos and not solo_tokens else None
+    estado = 0
+    for nombre in archivos:
+        try:
+            if cache is not None and nombre != '-':
+                code = None
+                result = ll_2.analyze_file(nombre, recognize_only=validar, fail_fast=primer_error, cache=cache)
+            else:
+                code = leer(nombre)
+        except (OSError, UnicodeDecodeError) as e:
+            print('%s: %s' % (nombre, getattr(e, 'strerror', None) or e), file=sys.stderr)
+            estado = 1
+            continue
+        if solo_tokens:
+            for tok in ll_2.tokenize(code):
+                print(tok)
+            result = ll_2.errors or True
+        elif code is not None:
+            result = ll_2.analyze(code, recognize_only=validar, fail_fast=primer_error)
+        estado |= informar(nombre, result, prefijo, not solo_tokens)
+    return estado
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,407 @@
+from array import array
+
+# Árbol de sintaxis en una arena de arrays paralelos de enteros: un nodo es un
+# índice, y sus datos están en la misma posición de cada array (tipo, primer
+# hijo, siguiente hermano, padre, posición del primer y del último token y
+# valor). No hay un objeto de Python por nodo: cada nodo ocupa 7 enteros de 4
+# bytes. Los nombres, operadores y literales se guardan una sola vez en
+# valores, y el nodo guarda su índice (o -1).
+#
+# Los nodos se crean de abajo arriba, desde las reducciones del parser (ver
+# las funciones p_* de ll_2.py): cuando se crea un nodo, sus hijos ya existen
+# y se enlazan como una lista (primer_hijo, siguiente).
+#
+# Para recorrerlo: Arena.hijos(n) y Arena.preorden(n) dan índices, Cursor da
+# una vista de un nodo con nombres y Visitante despacha por tipo.
+#
+# ArenaCompartida es la misma arena con consing: los subárboles iguales (mismo
+# tipo, valor e hijos) son un único nodo, y las posiciones de cada aparición
+# van aparte (ver más abajo).
+
+TIPOS = (
+    'PROGRAMA',     # Def*
+    'DEF',          # valor: nombre; PARAMETRO*, [TIPO de retorno], BLOQUE
+    'PARAMETRO',    # valor: nombre; TIPO
+    'TIPO',         # valor: 'int' o 'str'
+    'TIPO_LISTA',   # TIPO de los elementos
+    'BLOQUE',       # sentencias
+    'EXPRESION',    # expresión como sentencia
+    'ASIGNACION',   # destino, expresión
+    'PASS',
+    'RETURN',       # [expresión]
+    'IF',           # condición, BLOQUE, ELIF*, [ELSE]
+    'ELIF',         # condición, BLOQUE
+    'ELSE',         # BLOQUE
+    'WHILE',        # condición, BLOQUE
+    'FOR',          # valor: variable; expresión, BLOQUE
+    'BINARIO',      # valor: operador; izquierda, derecha
+    'UNARIO',       # valor: operador; operando
+    'NOMBRE',       # valor: nombre
+    'LLAMADA',      # valor: nombre; argumentos
+    'INDICE',       # valor: nombre; LISTA
+    'LITERAL',      # valor: el literal (int, str, None, True o False)
+    'LISTA',        # elementos
+)
+
+(PROGRAMA, DEF, PARAMETRO, TIPO, TIPO_LISTA, BLOQUE, EXPRESION, ASIGNACION, PASS, RETURN, IF, ELIF, ELSE,
+ WHILE, FOR, BINARIO, UNARIO, NOMBRE, LLAMADA, INDICE, LITERAL, LISTA) = range(len(TIPOS))
+
+NINGUNO = -1
+
+
+class Arena(object):
+
+    # Arrays de la arena, uno por dato de los nodos (ver arbol_binario.py)
+    ARRAYS = ('tipo', 'primer_hijo', 'siguiente', 'padre', 'inicio', 'fin', 'valor')
+
+    def __init__(self):
+        self.tipo = array('i')
+        self.primer_hijo = array('i')
+        self.siguiente = array('i')
+        self.padre = array('i')
+        self.inicio = array('i')
+        self.fin = array('i')
+        self.valor = array('i')
+        self.valores = []
+        self._internados = {}
+        self.raiz = NINGUNO
+
+    def __len__(self):
+        return len(self.tipo)
+
+    # Libera lo que solo hace falta para construir (se rehace si se añaden
+    # más nodos)
+    def terminar(self):
+        self._internados = None
+
+    # Bytes de los arrays (sin la tabla de valores)
+    def nbytes(self):
+        return sum(getattr(self, nombre).itemsize * len(getattr(self, nombre)) for nombre in self.ARRAYS)
+
+    # Índice del valor en la tabla, añadiéndolo si no está. El tipo es parte
+    # de la clave: 1 y True son valores distintos
+    def internar(self, valor):
+        if self._internados is None:
+            self._internados = dict(((type(v), v), i) for i, v in enumerate(self.valores))
+        clave = (type(valor), valor)
+        i = self._internados.get(clave)
+        if i is None:
+            i = self._internados[clave] = len(self.valores)
+            self.valores.append(valor)
+        return i
+
+    # Crea una hoja de un solo token con su valor (que puede ser None, el
+    # literal) y devuelve su índice
+    def hoja(self, tipo, valor, posicion):
+        n = len(self.tipo)
+        self.tipo.append(tipo)
+        self.valor.append(self.internar(valor))
+        self.padre.append(NINGUNO)
+        self.siguiente.append(NINGUNO)
+        self.primer_hijo.append(NINGUNO)
+        self.inicio.append(posicion)
+        self.fin.append(posicion)
+        return n
+
+    # Crea un nodo con los hijos dados (índices ya creados, en orden) y
+    # devuelve su índice. valor None es sin valor. inicio o fin negativos se
+    # toman del primer o del último hijo
+    def nodo(self, tipo, valor, hijos, inicio, fin):
+        n = len(self.tipo)
+        self.tipo.append(tipo)
+        self.valor.append(NINGUNO if valor is None else self.internar(valor))
+        self.padre.append(NINGUNO)
+        self.siguiente.append(NINGUNO)
+        if hijos:
+            self.primer_hijo.append(hijos[0])
+            padre = self.padre
+            siguiente = self.siguiente
+            anterior = NINGUNO
+            for h in hijos:
+                padre[h] = n
+                if anterior != NINGUNO:
+                    siguiente[anterior] = h
+                anterior = h
+            if inicio < 0:
+                inicio = self.inicio[hijos[0]]
+            if fin < 0:
+                fin = self.fin[hijos[-1]]
+        else:
+            self.primer_hijo.append(NINGUNO)
+        self.inicio.append(inicio)
+        self.fin.append(fin)
+        return n
+
+    def valor_de(self, n):
+        i = self.valor[n]
+        return None if i == NINGUNO else self.valores[i]
+
+    def hijos(self, n):
+        h = self.primer_hijo[n]
+        siguiente = self.siguiente
+        while h != NINGUNO:
+            yield h
+            h = siguiente[h]
+
+    # Nodos del subárbol de n (por defecto la raíz) en preorden, sin recursión
+    def preorden(self, n=None):
+        primer_hijo, siguiente, padre = self.primer_hijo, self.siguiente, self.padre
+        raiz = self.raiz if n is None else n
+        if raiz == NINGUNO:
+            return
+        n = raiz
+        while True:
+            yield n
+            if primer_hijo[n] != NINGUNO:
+                n = primer_hijo[n]
+                continue
+            while n != raiz and siguiente[n] == NINGUNO:
+                n = padre[n]
+            if n == raiz:
+                return
+            n = siguiente[n]
+
+    def cursor(self, n=None):
+        return Cursor(self, self.raiz if n is None else n)
+
+
+# Arena con consing de subárboles (hash-consing): nodo() y hoja() devuelven un
+# nodo ya existente si hay uno con el mismo tipo, valor e hijos, así que las
+# expresiones y sentencias repetidas (`a < b`, `[1, 2, 3]`, `return 0`) se
+# guardan una vez. Un nodo compartido no tiene un único padre ni un siguiente
+# hermano: los hijos de cada nodo están seguidos en hijos[primer_hijo[n]:
+# primer_hijo[n] + n_hijos[n]].
+#
+# Las posiciones son de cada aparición y se guardan aparte, en inicio y fin,
+# indexadas por el número de aparición: el orden en que se crean, que es el
+# postorden del árbol sin compartir (el parser reduce los hijos de izquierda a
+# derecha antes que el padre). La aparición de la raíz es la última, y el
+# subárbol de la aparición a de un nodo n ocupa las tamano[n] apariciones que
+# terminan en a, con las de sus hijos seguidas; CursorCompartido hace esa
+# cuenta al bajar, así que cada nodo que se visita tiene su posición.
+class ArenaCompartida(object):
+
+    ARRAYS = ('tipo', 'valor', 'primer_hijo', 'n_hijos', 'tamano', 'hijos_de', 'inicio', 'fin')
+
+    def __init__(self):
+        self.tipo = array('i')
+        self.valor = array('i')
+        self.primer_hijo = array('i')
+        self.n_hijos = array('i')
+        self.tamano = array('i')
+        self.hijos_de = array('i')
+        self.inicio = array('i')
+        self.fin = array('i')
+        self.valores = []
+        self._internados = {}
+        self._nodos = {}
+        self.raiz = NINGUNO
+
+    # Nodos distintos
+    def __len__(self):
+        return len(self.tipo)
+
+    # Apariciones: los nodos del árbol sin compartir
+    def apariciones(self):
+        return len(self.inicio)
+
+    nbytes = Arena.nbytes
+
+    def terminar(self):
+        self._internados = None
+        self._nodos = None
+
+    internar = Arena.internar
+
+    def _compartido(self, tipo, valor, hijos):
+        if self._nodos is None:
+            self._nodos = {}
+            for n in range(len(self.tipo)):
+                i = self.primer_hijo[n]
+                clave = (self.tipo[n], self.valor[n], tuple(self.hijos_de[i:i + self.n_hijos[n]]))
+                self._nodos[clave] = n
+        clave = (tipo, valor, hijos)
+        n = self._nodos.get(clave)
+        if n is None:
+            n = self._nodos[clave] = len(self.tipo)
+            self.tipo.append(tipo)
+            self.valor.append(valor)
+            self.primer_hijo.append(len(self.hijos_de))
+            self.n_hijos.append(len(hijos))
+            self.hijos_de.extend(hijos)
+            tamano = 1
+            for h in hijos:
+                tamano += self.tamano[h]
+            self.tamano.append(tamano)
+        return n
+
+    def hoja(self, tipo, valor, posicion):
+        self.inicio.append(posicion)
+        self.fin.append(posicion)
+        return self._compartido(tipo, self.internar(valor), ())
+
+    def nodo(self, tipo, valor, hijos, inicio, fin):
+        hijos = tuple(hijos) if hijos else ()
+        if hijos:
+            aparicion = len(self.inicio)
+            if inicio < 0:
+                # La aparición del primer hijo es la última de su subárbol
+                tamano = self.tamano
+                inicio = self.inicio[aparicion - sum(tamano[h] for h in hijos) + tamano[hijos[0]] - 1]
+            if fin < 0:
+                fin = self.fin[aparicion - 1]
+        self.inicio.append(inicio)
+        self.fin.append(fin)
+        return self._compartido(tipo, NINGUNO if valor is None else self.internar(valor), hijos)
+
+    valor_de = Arena.valor_de
+
+    def hijos(self, n):
+        i = self.primer_hijo[n]
+        return iter(self.hijos_de[i:i + self.n_hijos[n]])
+
+    # Nodos del subárbol de n en preorden, con los compartidos repetidos en
+    # cada aparición
+    def preorden(self, n=None):
+        raiz = self.raiz if n is None else n
+        if raiz == NINGUNO:
+            return
+        pila = [raiz]
+        primer_hijo, n_hijos, hijos_de = self.primer_hijo, self.n_hijos, self.hijos_de
+        while pila:
+            n = pila.pop()
+            yield n
+            i = primer_hijo[n]
+            pila.extend(reversed(hijos_de[i:i + n_hijos[n]]))
+
+    def cursor(self, n=None):
+        if n is None or n == self.raiz:
+            return CursorCompartido(self, self.raiz, len(self.inicio) - 1, None)
+        raise ValueError('un nodo compartido no tiene una sola posición: use cursor().hijos()')
+
+
+# Vista de un nodo de la arena
+class Cursor(object):
+
+    __slots__ = ('arena', 'nodo')
+
+    def __init__(self, arena, nodo):
+        self.arena = arena
+        self.nodo = nodo
+
+    def __eq__(self, otro):
+        return isinstance(otro, Cursor) and self.arena is otro.arena and self.nodo == otro.nodo
+
+    def __hash__(self):
+        return hash((id(self.arena), self.nodo))
+
+    def __repr__(self):
+        tiene_valor = self.arena.valor[self.nodo] != NINGUNO
+        return '<%s%s @%d>' % (self.nombre, ' %r' % (self.valor,) if tiene_valor else '', self.nodo)
+
+    @property
+    def tipo(self):
+        return self.arena.tipo[self.nodo]
+
+    @property
+    def nombre(self):
+        return TIPOS[self.arena.tipo[self.nodo]]
+
+    @property
+    def valor(self):
+        return self.arena.valor_de(self.nodo)
+
+    @property
+    def inicio(self):
+        return self.arena.inicio[self.nodo]
+
+    @property
+    def fin(self):
+        return self.arena.fin[self.nodo]
+
+    @property
+    def padre(self):
+        p = self.arena.padre[self.nodo]
+        return None if p == NINGUNO else Cursor(self.arena, p)
+
+    def hijos(self):
+        arena = self.arena
+        return [Cursor(arena, h) for h in arena.hijos(self.nodo)]
+
+    def preorden(self):
+        arena = self.arena
+        return (Cursor(arena, n) for n in arena.preorden(self.nodo))
+
+
+# Vista de una aparición de un nodo de ArenaCompartida, con la misma interfaz
+# que Cursor. El padre es el cursor desde el que se llegó
+class CursorCompartido(object):
+
+    __slots__ = ('arena', 'nodo', 'aparicion', '_padre')
+
+    def __init__(self, arena, nodo, aparicion, padre):
+        self.arena = arena
+        self.nodo = nodo
+        self.aparicion = aparicion
+        self._padre = padre
+
+    def __eq__(self, otro):
+        return (isinstance(otro, CursorCompartido) and self.arena is otro.arena
+                and self.aparicion == otro.aparicion)
+
+    def __hash__(self):
+        return hash((id(self.arena), self.aparicion))
+
+    def __repr__(self):
+        tiene_valor = self.arena.valor[self.nodo] != NINGUNO
+        return '<%s%s @%d>' % (self.nombre, ' %r' % (self.valor,) if tiene_valor else '', self.nodo)
+
+    tipo = Cursor.tipo
+    nombre = Cursor.nombre
+    valor = Cursor.valor
+
+    @property
+    def inicio(self):
+        return self.arena.inicio[self.aparicion]
+
+    @property
+    def fin(self):
+        return self.arena.fin[self.aparicion]
+
+    @property
+    def padre(self):
+        return self._padre
+
+    def hijos(self):
+        arena = self.arena
+        tamano = arena.tamano
+        # La primera aparición del subárbol, y a partir de ella las de los hijos
+        aparicion = self.aparicion - tamano[self.nodo]
+        resultado = []
+        for h in arena.hijos(self.nodo):
+            aparicion += tamano[h]
+            resultado.append(CursorCompartido(arena, h, aparicion, self))
+        return resultado
+
+    def preorden(self):
+        pila = [self]
+        while pila:
+            cursor = pila.pop()
+            yield cursor
+            pila.extend(reversed(cursor.hijos()))
+
+
+# Recorrido por tipo de nodo: visitar(cursor) llama a visitar_<tipo> (en
+# minúsculas, por ejemplo visitar_binario) o, si no está definido, a
+# generico, que visita los hijos
+class Visitante(object):
+
+    def visitar(self, cursor):
+        metodo = getattr(self, 'visitar_' + cursor.nombre.lower(), None)
+        if metodo is None:
+            return self.generico(cursor)
+        return metodo(cursor)
+
+    def generico(self, cursor):
+        for hijo in cursor.hijos():
+            self.visitar(hijo)
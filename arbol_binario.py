@@ -0,0 +1,86 @@
+import hashlib
+
+import arbol
+import tablas_compactas
+
+# Resultado de un análisis (el árbol de arbol.py o la lista de errores) en un
+# archivo binario que se abre con mmap: un proceso analiza y guarda, y los
+# demás abren el archivo sin volver a analizar. Se usa el formato de
+# tablas_compactas.py (MAGIA, cabecera JSON y arrays de int32 alineados): los
+# arrays de la arena se escriben tal cual y al abrir son memoryviews sobre el
+# mmap, sin deserializar nodo a nodo. Las páginas las comparte el sistema
+# entre todos los procesos que abren el mismo archivo.
+#
+# La cabecera lleva la versión del formato, la clase de arena, la raíz, la
+# tabla de valores internados (nombres, operadores y literales; JSON
+# distingue 1 de true y null), los errores, el hash del código fuente y el
+# de la gramática (tablas.firma_parser), para que quien lo abre pueda saber
+# si está desactualizado.
+#
+# La arena que se abre es de solo lectura: hijos(), preorden(), valor_de(),
+# cursor() y Visitante funcionan igual, pero no se le pueden añadir nodos.
+
+VERSION = 1
+
+_CLASES = {'ast': arbol.Arena, 'ast_compartido': arbol.ArenaCompartida}
+
+
+def firma_fuente(code):
+    if isinstance(code, str):
+        code = code.encode('utf-8')
+    return hashlib.sha256(code).hexdigest()
+
+
+# Cabecera y arrays en el formato de tablas_compactas.py de la arena (o la
+# lista de errores) del análisis de code
+def disponer(resultado, code=None, gramatica=None):
+    cabecera = {
+        'version': VERSION,
+        'fuente': None if code is None else firma_fuente(code),
+        'gramatica': gramatica,
+    }
+    if isinstance(resultado, list):
+        cabecera.update(tipo='ast', raiz=arbol.NINGUNO, valores=[], errores=list(resultado))
+        arrays = dict((nombre, ()) for nombre in arbol.Arena.ARRAYS)
+    else:
+        tipo = 'ast_compartido' if isinstance(resultado, arbol.ArenaCompartida) else 'ast'
+        cabecera.update(tipo=tipo, raiz=resultado.raiz, valores=list(resultado.valores), errores=[])
+        arrays = dict((nombre, getattr(resultado, nombre)) for nombre in resultado.ARRAYS)
+    return cabecera, arrays
+
+
+# Escribe en ruta la arena (o la lista de errores) del análisis de code
+def guardar(ruta, resultado, code=None, gramatica=None):
+    tablas_compactas.guardar(ruta, *disponer(resultado, code, gramatica))
+
+
+# Abre un archivo de guardar(): devuelve (cabecera, arena o lista de errores).
+# Con code o gramatica, comprueba que el archivo es de ese código y de esa
+# gramática (ValueError si no)
+def abrir(ruta, code=None, gramatica=None):
+    cabecera, arrays = tablas_compactas.abrir(ruta)
+    return cabecera, reconstruir(ruta, cabecera, arrays, code, gramatica)
+
+
+# La arena (o la lista de errores) de la cabecera y los arrays de disponer(),
+# con los arrays tal cual (sin copia). origen es para los mensajes de error
+def reconstruir(origen, cabecera, arrays, code=None, gramatica=None):
+    clase = _CLASES.get(cabecera.get('tipo'))
+    if clase is None:
+        raise ValueError('%s: no es un árbol de sintaxis' % origen)
+    if cabecera['version'] != VERSION:
+        raise ValueError('%s: versión %r del formato, se esperaba %d' % (origen, cabecera['version'], VERSION))
+    if code is not None and cabecera['fuente'] != firma_fuente(code):
+        raise ValueError('%s: es de otro código fuente' % origen)
+    if gramatica is not None and cabecera['gramatica'] != gramatica:
+        raise ValueError('%s: es de otra gramática' % origen)
+    if cabecera['errores']:
+        return cabecera['errores']
+    arena = clase.__new__(clase)
+    for nombre in clase.ARRAYS:
+        setattr(arena, nombre, arrays[nombre])
+    arena.valores = cabecera['valores']
+    arena.raiz = cabecera['raiz']
+    arena._internados = None
+    arena._nodos = None
+    return arena
@@ -0,0 +1,113 @@
+import gc
+import sys
+import time
+import tracemalloc
+
+import arbol
+import corpus
+import ll_2
+
+# Árbol en arena (arbol.py) frente a un árbol ingenuo de un objeto por nodo,
+# construidos por las mismas reducciones del parser de ll_2.py con los
+# tokens ya calculados. Mide el tiempo de construcción (con el reconocedor,
+# que no construye nada, como referencia) y la memoria que queda asignada por
+# nodo (tracemalloc). Uso: python bench_arbol.py [lineas]
+
+
+class Nodo(object):
+
+    def __init__(self, tipo, valor, hijos, inicio, fin):
+        self.tipo = tipo
+        self.valor = valor
+        self.hijos = hijos
+        self.padre = None
+        self.inicio = inicio
+        self.fin = fin
+
+
+# Misma interfaz que arbol.Arena, con un Nodo por nodo
+class ArbolIngenuo(object):
+
+    def __init__(self):
+        self.n = 0
+
+    def hoja(self, tipo, valor, posicion):
+        self.n += 1
+        return Nodo(tipo, valor, [], posicion, posicion)
+
+    def nodo(self, tipo, valor, hijos, inicio, fin):
+        self.n += 1
+        hijos = list(hijos or ())
+        nodo = Nodo(tipo, valor, hijos, inicio, fin)
+        for h in hijos:
+            h.padre = nodo
+        if hijos:
+            if inicio < 0:
+                nodo.inicio = hijos[0].inicio
+            if fin < 0:
+                nodo.fin = hijos[-1].fin
+        return nodo
+
+
+class ListaLexer(object):
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.lineno = self.lexpos = 0
+
+    def token(self):
+        return next(self.iterador, None)
+
+    def input(self, data):
+        self.iterador = iter(self.tokens)
+
+
+def medir(funcion, repeticiones=5):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def main(lineas=50000):
+    data = corpus.generar(lineas)
+    lista = ListaLexer(ll_2.tokenize(data))
+    parser = ll_2.get_parser()
+    reconocedor = ll_2.get_reconocedor()
+
+    def construir(arbol_nuevo):
+        def construir():
+            destino = ll_2._empezar(arbol_nuevo())
+            raiz = parser.parse('', lexer=lista)
+            assert not ll_2.errors, ll_2.errors
+            return destino, raiz
+        return construir
+
+    def reconocer():
+        ll_2._empezar()
+        return reconocedor.parse('', lexer=lista)
+
+    print('%d tokens' % len(lista.tokens))
+    _, t = medir(reconocer)
+    print('%-22s %10s %8s %14s' % ('árbol', 'tiempo (s)', 'nodos', 'bytes por nodo'))
+    print('%-22s %10.3f %8s %14s' % ('ninguno (reconocedor)', t, '-', '-'))
+    for nombre, arbol_nuevo in [('arena', arbol.Arena), ('un objeto por nodo', ArbolIngenuo)]:
+        _, t = medir(construir(arbol_nuevo))
+        # Memoria que queda asignada al árbol una vez construido
+        gc.collect()
+        tracemalloc.start()
+        destino, raiz = construir(arbol_nuevo)()
+        ll_2._empezar()
+        gc.collect()
+        memoria = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        nodos = len(destino) if isinstance(destino, arbol.Arena) else destino.n
+        print('%-22s %10.3f %8d %14.1f' % (nombre, t, nodos, memoria / float(nodos)))
+        del destino, raiz
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import time
+
+import arbol
+import corpus
+import ll_2
+
+# "Analizar una vez, consultar muchas": volver a analizar con analyze() o
+# parse_ast() frente a abrir el resultado guardado con save_ast() (formato de
+# arbol_binario.py, por mmap). Mide también abrir y recorrer el árbol entero
+# (contando los operadores binarios), que es lo que haría una herramienta que
+# lo consume. Uso: python bench_arbol_binario.py [lineas]
+
+
+def medir(funcion, repeticiones=5):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def binarios(arena):
+    tipo = arena.tipo
+    return sum(1 for n in arena.preorden() if tipo[n] == arbol.BINARIO)
+
+
+def main(lineas=50000):
+    data = corpus.generar(lineas)
+    directorio = tempfile.mkdtemp(prefix='bench_arbol_binario-')
+    ll_2.get_parser()
+    ll_2.grammar_signature()
+
+    print('%d líneas' % lineas)
+    print('%-44s %12s' % ('operación', 'tiempo (ms)'))
+    filas = [('analyze()', lambda: ll_2.analyze(data)),
+             ('analyze(recognize_only=True)', lambda: ll_2.analyze(data, recognize_only=True)),
+             ('parse_ast()', lambda: ll_2.parse_ast(data)),
+             ('parse_ast() y recorrer', lambda: binarios(ll_2.parse_ast(data)))]
+    for hash_cons in (False, True):
+        ruta = os.path.join(directorio, 'arbol-%d.ast' % hash_cons)
+        sufijo = ' (consing)' if hash_cons else ''
+        _, t = medir(lambda: ll_2.save_ast(data, ruta, hash_cons=hash_cons), 1)
+        print('%-44s %12.1f   %d KiB' % ('save_ast()' + sufijo, 1000 * t, os.path.getsize(ruta) // 1024))
+        filas += [('load_ast()' + sufijo, lambda ruta=ruta: ll_2.load_ast(ruta)),
+                  ('load_ast() comprobando el código' + sufijo, lambda ruta=ruta: ll_2.load_ast(ruta, data)),
+                  ('load_ast() y recorrer' + sufijo, lambda ruta=ruta: binarios(ll_2.load_ast(ruta)))]
+    for nombre, funcion in filas:
+        _, t = medir(funcion)
+        print('%-44s %12.3f' % (nombre, 1000 * t))
+
+    for nombre in os.listdir(directorio):
+        os.unlink(os.path.join(directorio, nombre))
+    os.rmdir(directorio)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
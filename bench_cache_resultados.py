@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import time
+
+import corpus
+import ll_2
+
+# Caché de resultados (cache_resultados.py) en el caso de la integración
+# continua: los mismos archivos se vuelven a validar en cada ejecución. Mide
+# analyze_file() sin caché, con la caché vacía (analizar y guardar, con y sin
+# tokens) y con la caché llena (un hash y una consulta por archivo), más
+# varios procesos sobre la misma base a la vez. Uso:
+#   python bench_cache_resultados.py [archivos] [lineas por archivo]
+
+
+def recorrer(archivos, **opciones):
+    inicio = time.perf_counter()
+    for ruta in archivos:
+        ll_2.analyze_file(ruta, **opciones)
+    return time.perf_counter() - inicio
+
+
+def trabajador(argumentos):
+    directorio, archivos = argumentos
+    cache = ll_2.get_result_cache(directorio)
+    return recorrer(archivos, cache=cache)
+
+
+def main(n=2000, lineas=40):
+    import multiprocessing
+    directorio = tempfile.mkdtemp(prefix='bench_cache_resultados-')
+    archivos = []
+    for i in range(n):
+        ruta = os.path.join(directorio, 'f%d.py' % i)
+        with open(ruta, 'w') as f:
+            f.write(corpus.generar(lineas, semilla=i))
+        archivos.append(ruta)
+    ll_2.get_parser()
+
+    print('%d archivos de %d líneas' % (n, lineas))
+    print('%-40s %12s %14s' % ('analyze_file()', 'tiempo (s)', 'ms por archivo'))
+
+    def fila(nombre, t):
+        print('%-40s %12.3f %14.3f' % (nombre, t, 1000 * t / n))
+
+    fila('sin caché', recorrer(archivos))
+    for save_tokens in (False, True):
+        cache = ll_2.get_result_cache(directorio)
+        cache.vaciar()
+        sufijo = ' con tokens' if save_tokens else ''
+        fila('caché vacía' + sufijo, recorrer(archivos, cache=cache, save_tokens=save_tokens))
+        fila('caché llena' + sufijo, recorrer(archivos, cache=cache))
+        print('%-40s %12d KiB' % ('tamaño de la caché' + sufijo, cache.tamano() // 1024))
+        cache.close()
+
+    procesos = 4
+    cache = ll_2.get_result_cache(directorio)
+    cache.vaciar()
+    cache.close()
+    inicio = time.perf_counter()
+    with multiprocessing.Pool(procesos) as pool:
+        # Todos los procesos recorren todos los archivos: se pisan al guardar
+        pool.map(trabajador, [(directorio, archivos)] * procesos)
+    fila('%d procesos, caché vacía compartida' % procesos, time.perf_counter() - inicio)
+
+    for nombre in os.listdir(directorio):
+        os.unlink(os.path.join(directorio, nombre))
+    os.rmdir(directorio)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,85 @@
+import gc
+import sys
+import time
+import tracemalloc
+
+import arbol
+import corpus
+import ll_2
+
+# Memoria del árbol con consing (arbol.ArenaCompartida, parse_ast(...,
+# hash_cons=True)) frente a la arena normal, en el corpus de los benchmarks,
+# en uno muy repetitivo (pocos nombres y números, como el código generado por
+# máquina) y en programas del estilo de test_parser.txt. Para cada uno: nodos
+# distintos frente a apariciones, la memoria que queda asignada al árbol
+# (tracemalloc, con la tabla de valores), el pico durante la construcción y
+# el tiempo de parse_ast(). Uso: python bench_consing.py [lineas]
+
+# test_parser.txt dentro de una función sin parámetros (la gramática de
+# ll_2.py no acepta parámetros tipados: int es un ID para el lexer)
+ESTILO_TEST_PARSER = '''def foo%d():
+    if x < y:
+        return x + 1
+    elif x > y:
+        return y + 1
+    else:
+        return 0
+    while a < b:
+        a = a * 1
+    y = 1
+    for x in [1, 2, 3]:
+        y = y * x
+    r = foo(a, b)
+    s = (a == b)
+
+'''
+
+
+def estilo_test_parser(lineas):
+    bloque = ESTILO_TEST_PARSER.count('\n')
+    return ''.join(ESTILO_TEST_PARSER % i for i in range(max(1, lineas // bloque)))
+
+
+def medir(funcion, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def memoria(data, hash_cons):
+    ll_2._empezar()
+    gc.collect()
+    tracemalloc.start()
+    arena = ll_2.parse_ast(data, hash_cons=hash_cons)
+    ll_2._empezar()
+    gc.collect()
+    retenida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return arena, retenida, pico
+
+
+def main(lineas=20000):
+    entradas = [
+        ('corpus', corpus.generar(lineas)),
+        ('corpus repetitivo', corpus.generar(lineas, nombres=3, numeros=2)),
+        ('estilo test_parser', estilo_test_parser(lineas)),
+    ]
+    ll_2.get_parser()
+    print('%-20s %-10s %9s %10s %12s %12s %10s' % ('entrada', 'árbol', 'nodos', 'apariciones', 'memoria (KiB)',
+                                                  'pico (KiB)', 'tiempo (s)'))
+    for nombre, data in entradas:
+        for arbol_nombre, hash_cons in [('arena', False), ('consing', True)]:
+            arena, retenida, pico = memoria(data, hash_cons)
+            assert not isinstance(arena, list), arena[:3]
+            _, t = medir(lambda: ll_2.parse_ast(data, hash_cons=hash_cons))
+            apariciones = arena.apariciones() if isinstance(arena, arbol.ArenaCompartida) else len(arena)
+            print('%-20s %-10s %9d %10d %12.1f %12.1f %10.3f' % (nombre, arbol_nombre, len(arena), apariciones,
+                                                                 retenida / 1024.0, pico / 1024.0, t))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
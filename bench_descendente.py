@@ -0,0 +1,76 @@
+import sys
+import time
+
+import corpus
+import descendente
+import ll_1
+import ll_2
+
+# Tokens por segundo del parser descendente generado (descendente.py) frente
+# al parser LALR de PLY (ll_2.py) y al predictivo dirigido por tabla
+# (predictivo.py), con los mismos tokens ya calculados. Cada parser incluye
+# su propia traducción de tokens a terminales. Uso: python bench_descendente.py [lineas]
+
+
+class ListaLexer(object):
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def token(self):
+        return next(self.iterador, None)
+
+    def input(self, data):
+        self.iterador = iter(self.tokens)
+
+
+def medir(funcion, repeticiones=5):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def main(lineas=50000):
+    inicio = time.perf_counter()
+    codigo = descendente.generar(ll_1.grammar)
+    t_generar = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    rd = descendente.RDParser(ll_1.grammar, ll_1.terminal)
+    t_cargar = time.perf_counter() - inicio
+    print('módulo generado: %d líneas, generar %.1f ms, cargar %.1f ms'
+          % (codigo.count('\n'), 1000 * t_generar, 1000 * t_cargar))
+
+    data = corpus.generar(lineas)
+    lista = ListaLexer(ll_2.tokenize(data))
+    n = len(lista.tokens)
+
+    def lalr():
+        ll_2.errors = []
+        lista.input(None)
+        ll_2.get_parser().parse(lexer=lista)
+        return ll_2.errors or True
+
+    def tabla():
+        lista.input(None)
+        return ll_1.parser.parse(lista)
+
+    def recursivo():
+        lista.input(None)
+        return rd.parse(lista)
+
+    print('%d tokens' % n)
+    print('%-28s %10s %12s' % ('parser', 'tiempo (s)', 'tokens/s'))
+    for nombre, funcion in [('LALR de PLY (ll_2)', lalr),
+                            ('LL(1) por tabla (ll_1)', tabla),
+                            ('descendente generado', recursivo)]:
+        resultado, t = medir(funcion)
+        assert resultado is True, resultado
+        print('%-28s %10.3f %12.0f' % (nombre, t, n / t))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,281 @@
+import random
+import sys
+import time
+import types
+
+import ply.yacc as yacc
+from ply.lex import LexToken
+
+import ll_1
+import ll_2
+import predictivo
+
+# Expresiones por precedencia (regla Expr única con la tabla de precedencias
+# en ll_2.py, escalada de precedencia de expresiones.py en ll_1.py) frente a
+# la cadena de diez niveles OrExpr -> OrExprPrime -> ... -> TermPrime que
+# había antes, con un programa de líneas con muchas expresiones. Para el LALR
+# cuenta las reducciones; para los dos, el tiempo por línea con los tokens ya
+# calculados. También comprueba que las dos versiones aceptan lo mismo con
+# mutaciones del programa. Uso: python bench_expresiones.py [lineas]
+
+
+# La cadena anterior de ll_2.py, para comparar
+def p_Expr(p):
+    '''Expr : OrExpr'''
+    p[0] = True
+
+def p_OrExpr(p):
+    '''OrExpr : AndExpr OrExprPrime'''
+    p[0] = True
+
+def p_OrExprPrime(p):
+    '''OrExprPrime : OR AndExpr OrExprPrime
+                   | empty'''
+    p[0] = True
+
+def p_AndExpr(p):
+    '''AndExpr : NotExpr AndExprPrime'''
+    p[0] = True
+
+def p_AndExprPrime(p):
+    '''AndExprPrime : AND NotExpr AndExprPrime
+                    | empty'''
+    p[0] = True
+
+def p_NotExpr(p):
+    '''NotExpr : CompExpr NotExprPrime'''
+    p[0] = True
+
+def p_NotExprPrime(p):
+    '''NotExprPrime : NOT CompExpr NotExprPrime
+                    | empty'''
+    p[0] = True
+
+def p_CompExpr(p):
+    '''CompExpr : IntExpr CompExprPrime'''
+    p[0] = True
+
+def p_CompExprPrime(p):
+    '''CompExprPrime : CompOp IntExpr CompExprPrime
+                     | empty'''
+    p[0] = True
+
+def p_IntExpr(p):
+    '''IntExpr : Term IntExprPrime'''
+    p[0] = True
+
+def p_IntExprPrime(p):
+    '''IntExprPrime : PLUS Term IntExprPrime
+                    | MINUS Term IntExprPrime
+                    | empty'''
+    p[0] = True
+
+def p_Term(p):
+    '''Term : Factor TermPrime'''
+    p[0] = True
+
+def p_TermPrime(p):
+    '''TermPrime : TIMES Factor TermPrime
+                 | DIVIDE Factor TermPrime
+                 | MODULO Factor TermPrime
+                 | empty'''
+    p[0] = True
+
+def p_CompOp(p):
+    '''CompOp : EQUALS
+              | NOT_EQUALS
+              | LESS_THAN
+              | GREATER_THAN
+              | LESS_THAN_EQUAL
+              | GREATER_THAN_EQUAL
+              | IS'''
+    p[0] = True
+
+
+_CADENA = [p_Expr, p_OrExpr, p_OrExprPrime, p_AndExpr, p_AndExprPrime, p_NotExpr, p_NotExprPrime,
+           p_CompExpr, p_CompExprPrime, p_IntExpr, p_IntExprPrime, p_Term, p_TermPrime, p_CompOp]
+
+
+def _verdadero(p):
+    p[0] = True
+
+
+# Solo se comparan las gramáticas: las reglas de los dos parsers hacen p[0] =
+# True, como antes del árbol de ll_2.py
+def _sin_acciones(parser):
+    for produccion in parser.productions:
+        if produccion.callable is not None:
+            produccion.callable = _verdadero
+    return parser
+
+
+# Parser de ll_2.py con la cadena en lugar de la regla Expr
+def parser_cadena():
+    modulo = types.ModuleType('ll_2_cadena')
+    for nombre in dir(ll_2):
+        if nombre.startswith(('p_', 't_', 'tokens')):
+            setattr(modulo, nombre, getattr(ll_2, nombre))
+    for funcion in _CADENA:
+        setattr(modulo, funcion.__name__, funcion)
+    modulo.__file__ = __file__
+    return _sin_acciones(yacc.yacc(module=modulo, start='Program', write_tables=False, debug=False,
+                                   errorlog=yacc.NullLogger()))
+
+
+# Parser de ll_2.py, con la regla Expr
+def parser_precedencia():
+    return _sin_acciones(yacc.yacc(module=ll_2, write_tables=False, debug=False, errorlog=yacc.NullLogger()))
+
+
+_NOMBRES = ['x', 'y', 'total', 'valor', 'n']
+# Sin '/': la gramática de ll_1.py solo tiene '//', que el lexer de ll_2.py no
+# reconoce
+_BINARIOS = ['or', 'and', 'not', '==', '!=', '<', '>', '<=', '>=', 'is', '+', '-', '*', '%']
+
+
+def _expresion(rnd, profundidad=0):
+    partes = []
+    for _ in range(rnd.randint(1, 4)):
+        r = rnd.random()
+        if profundidad < 2 and r < 0.15:
+            factor = '(%s)' % _expresion(rnd, profundidad + 1)
+        elif profundidad < 2 and r < 0.25:
+            factor = '%s(%s)' % (rnd.choice(_NOMBRES), ', '.join(_expresion(rnd, profundidad + 1)
+                                                                    for _ in range(rnd.randint(0, 3))))
+        elif profundidad < 2 and r < 0.3:
+            factor = '[%s]' % ', '.join(_expresion(rnd, profundidad + 1) for _ in range(rnd.randint(0, 3)))
+        elif r < 0.65:
+            factor = rnd.choice(_NOMBRES)
+        else:
+            factor = str(rnd.randrange(1000))
+        if rnd.random() < 0.1:
+            factor = '-' + factor
+        partes.append(factor)
+    return (' %s ' % rnd.choice(_BINARIOS)).join(partes) if len(partes) > 1 else partes[0]
+
+
+# Programa de unas `lineas` líneas, casi todas asignaciones con expresiones
+def generar(lineas, semilla=0):
+    rnd = random.Random(semilla)
+    salida = []
+    funcion = 0
+    while len(salida) < lineas:
+        salida.append('def g%d():' % funcion)
+        funcion += 1
+        for _ in range(rnd.randint(5, 15)):
+            salida.append('    %s = %s' % (rnd.choice(_NOMBRES), _expresion(rnd)))
+        salida.append('    return %s' % _expresion(rnd))
+        salida.append('')
+    return '\n'.join(salida) + '\n'
+
+
+class ListaLexer(object):
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def token(self):
+        return next(self.iterador, None)
+
+    def input(self, data):
+        self.iterador = iter(self.tokens)
+
+
+# Cuenta las reducciones de un parser de PLY
+def contar_reducciones(parser):
+    contador = [0]
+
+    def envolver(funcion):
+        def contar(p):
+            contador[0] += 1
+            funcion(p)
+        return contar
+    for produccion in parser.productions:
+        if produccion.callable is not None:
+            produccion.callable = envolver(produccion.callable)
+    return contador
+
+
+def medir(funcion, repeticiones=5):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def lalr(parser, tokens):
+    ll_2.errors = []
+    lista = ListaLexer(tokens)
+    lista.input(None)
+    parser.parse(lexer=lista)
+    return ll_2.errors or True
+
+
+def ll(parser, tokens):
+    lista = ListaLexer(tokens)
+    lista.input(None)
+    return parser.parse(lista)
+
+
+# Las dos versiones aceptan y rechazan lo mismo, con el mismo primer error
+def comprobar(lalr_cadena, lalr_precedencia, ll_cadena, data, casos=2000):
+    rnd = random.Random(1)
+    tokens = ll_2.tokenize(data)
+    tipos = ['PLUS', 'MINUS', 'TIMES', 'NOT', 'AND', 'OR', 'LESS_THAN', 'IS', 'LPAREN', 'RPAREN',
+             'LBRACKET', 'RBRACKET', 'COMMA', 'INTEGER', 'ID', 'IF', 'ELSE']
+    for _ in range(casos):
+        mutado = list(tokens[:rnd.randrange(1, 400)])
+        for _ in range(rnd.randint(1, 3)):
+            i = rnd.randrange(len(mutado))
+            accion = rnd.random()
+            if accion < 0.4:
+                del mutado[i]
+            else:
+                tok = LexToken()
+                tok.type = rnd.choice(tipos)
+                tok.value = {'ID': 'z', 'INTEGER': 7}.get(tok.type, tok.type.lower())
+                tok.lineno, tok.lexpos = mutado[i].lineno, mutado[i].lexpos
+                if accion < 0.7:
+                    mutado[i] = tok
+                else:
+                    mutado.insert(i, tok)
+        for a, b in [(lalr(lalr_cadena, mutado), lalr(lalr_precedencia, mutado)),
+                     (ll(ll_cadena, mutado), ll(ll_1.parser, mutado))]:
+            assert (a is True) == (b is True), (a, b)
+            assert a is True or a[0] == b[0], (a[0], b[0])
+    return casos
+
+
+def main(lineas=20000):
+    data = generar(lineas)
+    tokens = ll_2.tokenize(data)
+    n = data.count('\n')
+    lalr_cadena = parser_cadena()
+    lalr_precedencia = parser_precedencia()
+    ll_cadena = predictivo.LL1Parser(ll_1.grammar, ll_1.terminal)
+    print('%d líneas, %d tokens' % (n, len(tokens)))
+    print('%d mutaciones, mismo resultado' % comprobar(lalr_cadena, lalr_precedencia, ll_cadena, data))
+
+    # Las reducciones se cuentan con copias, para no medir el contador
+    reducciones = {}
+    for nombre, parser in [('cadena', parser_cadena()), ('precedencia', parser_precedencia())]:
+        contador = contar_reducciones(parser)
+        assert lalr(parser, tokens) is True
+        reducciones[nombre] = contador[0]
+
+    print('%-24s %12s %10s %14s' % ('parser', 'reducciones', 'tiempo (s)', 'µs por línea'))
+    for nombre, funcion, contadas in [
+            ('LALR cadena (antes)', lambda: lalr(lalr_cadena, tokens), reducciones['cadena']),
+            ('LALR precedencia', lambda: lalr(lalr_precedencia, tokens), reducciones['precedencia']),
+            ('LL(1) cadena (antes)', lambda: ll(ll_cadena, tokens), None),
+            ('LL(1) precedencia', lambda: ll(ll_1.parser, tokens), None)]:
+        resultado, t = medir(funcion)
+        assert resultado is True, resultado
+        print('%-24s %12s %10.3f %14.2f' % (nombre, '-' if contadas is None else contadas, t, 1e6 * t / n))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
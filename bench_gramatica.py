@@ -0,0 +1,89 @@
+import random
+import sys
+import time
+
+import gramaticas
+
+# Tiempo de Grammar (bitsets + digraph) frente al punto fijo ingenuo con
+# conjuntos de cadenas, que recorre todas las producciones hasta que nada
+# cambia, sobre gramáticas sintéticas de expresiones con un nivel de
+# precedencia por operador. Comprueba que ambos den los mismos conjuntos.
+# Uso: python bench_gramatica.py [niveles ...]
+
+
+# Cada nivel i: E_i -> E_{i+1} E_i' ; E_i' -> op_i E_{i+1} E_i' | ε, más
+# algunas producciones extra al azar para que haya ciclos y anulables
+def expresiones(niveles, semilla=0):
+    azar = random.Random(semilla)
+    gramatica = {'S': ['E0 ;']}
+    for i in range(niveles):
+        gramatica['E%d' % i] = ['E%d R%d' % (i + 1, i)]
+        gramatica['R%d' % i] = ['op%d E%d R%d' % (i, i + 1, i), 'ε']
+        if azar.random() < 0.1:
+            gramatica['R%d' % i].append('R%d op%d' % (azar.randrange(niveles), azar.randrange(niveles)))
+    gramatica['E%d' % niveles] = ['( E0 )', 'id', 'R%d E%d' % (azar.randrange(niveles), niveles)]
+    return gramatica
+
+
+def ingenuo(gramatica):
+    producciones = [(a, [s for s in p.split() if s != 'ε']) for a, ps in gramatica.items() for p in ps]
+    first = dict((a, set()) for a in gramatica)
+    anulable = set()
+    cambio = True
+    while cambio:
+        cambio = False
+        for a, cuerpo in producciones:
+            antes = len(first[a]), a in anulable
+            for s in cuerpo:
+                if s not in gramatica:
+                    first[a].add(s)
+                    break
+                first[a] |= first[s]
+                if s not in anulable:
+                    break
+            else:
+                anulable.add(a)
+            cambio = cambio or (len(first[a]), a in anulable) != antes
+    follow = dict((a, set()) for a in gramatica)
+    follow[next(iter(gramatica))].add('$')
+    cambio = True
+    while cambio:
+        cambio = False
+        for a, cuerpo in producciones:
+            for i, s in enumerate(cuerpo):
+                if s not in gramatica:
+                    continue
+                antes = len(follow[s])
+                for r in cuerpo[i + 1:]:
+                    if r not in gramatica:
+                        follow[s].add(r)
+                        break
+                    follow[s] |= first[r]
+                    if r not in anulable:
+                        break
+                else:
+                    follow[s] |= follow[a]
+                cambio = cambio or len(follow[s]) != antes
+    for a in anulable:
+        first[a].add('ε')
+    return first, follow
+
+
+def main(niveles_lista):
+    print('%8s %12s %12s %12s %10s' % ('niveles', 'producciones', 'Grammar (s)', 'ingenuo (s)', 'conflictos'))
+    for niveles in niveles_lista:
+        gramatica = expresiones(niveles)
+        n = sum(len(p) for p in gramatica.values())
+        inicio = time.perf_counter()
+        g = gramaticas.Grammar(gramatica)
+        conflictos = g.conflictos()
+        t = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        first, follow = ingenuo(gramatica)
+        t_ingenuo = time.perf_counter() - inicio
+        assert g.primeros() == first and g.siguientes() == follow
+        print('%8d %12d %12.3f %12.3f %10d' % (niveles, n, t, t_ingenuo, len(conflictos)))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10, 100, 1000, 3000])
@@ -0,0 +1,69 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Presupuesto de arranque de procesos cortos (trabajadores, analizar.py). Cada
+# caso se mide en un proceso nuevo con la caché de tablas caliente y se le
+# resta el arranque de python sin importar nada. `import ll_2` no debe
+# construir nada ni importar PLY, y tokenizar no debe importar ply.yacc.
+# Uso: python bench_importacion.py [repeticiones]
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Segundos por encima de python vacío
+PRESUPUESTO_IMPORTACION = 0.005
+
+CASOS = [
+    ('import ll_2', 'import ll_2, sys; assert "ply.lex" not in sys.modules'),
+    ('tokenize()', 'import ll_2, sys; ll_2.tokenize(CODIGO); assert "ply.yacc" not in sys.modules'),
+    ('analyze()', 'import ll_2; assert ll_2.analyze(CODIGO) is True'),
+]
+
+CODIGO = 'def f():\n    return x + 1\n'
+
+
+def medir(argumentos, cache, repeticiones):
+    # Con los .pyc escritos (en la caché, no junto al código), como en una
+    # instalación normal
+    entorno = dict(os.environ, LL2_CACHE=cache, PYTHONPYCACHEPREFIX=os.path.join(cache, 'pyc'))
+    entorno.pop('PYTHONDONTWRITEBYTECODE', None)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable] + argumentos, cwd=DIRECTORIO, env=entorno, check=True,
+                       stdout=subprocess.DEVNULL)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main(repeticiones=10):
+    cache = tempfile.mkdtemp(prefix='bench_importacion-')
+    archivo = os.path.join(cache, 'codigo.txt')
+    with open(archivo, 'w') as f:
+        f.write(CODIGO)
+    try:
+        # Calienta la caché de tablas y los .pyc
+        medir(['-c', CASOS[-1][1].replace('CODIGO', repr(CODIGO))], cache, 1)
+        vacio = medir(['-c', 'pass'], cache, repeticiones)
+        print('%-24s %10s %12s' % ('caso', 'total (s)', 'extra (ms)'))
+        print('%-24s %10.3f %12s' % ('python vacío', vacio, '-'))
+        extras = {}
+        for nombre, codigo in CASOS:
+            t = medir(['-c', codigo.replace('CODIGO', repr(CODIGO))], cache, repeticiones)
+            extras[nombre] = t - vacio
+            print('%-24s %10.3f %12.1f' % (nombre, t, 1000 * (t - vacio)))
+        t = medir(['analizar.py', archivo], cache, repeticiones)
+        print('%-24s %10.3f %12.1f' % ('analizar.py archivo', t, 1000 * (t - vacio)))
+        dentro = extras['import ll_2'] <= PRESUPUESTO_IMPORTACION
+        print('import ll_2: %.1f ms, presupuesto %.1f ms: %s'
+              % (1000 * extras['import ll_2'], 1000 * PRESUPUESTO_IMPORTACION, 'ok' if dentro else 'EXCEDIDO'))
+        return 0 if dentro else 1
+    finally:
+        shutil.rmtree(cache)
+
+
+if __name__ == '__main__':
+    sys.exit(main(*[int(a) for a in sys.argv[1:2]]))
@@ -0,0 +1,57 @@
+import random
+import sys
+import time
+
+import corpus
+import lexer_incremental
+
+# Coste de una edición con re-análisis incremental frente a volver a analizar
+# todo el texto, para ediciones típicas de un editor: escribir un carácter en
+# un identificador, añadir una sentencia, borrar una línea y cambiar la
+# indentación de un bloque. Uso: python bench_incremental.py [lineas]
+
+
+# Una edición al azar sobre el texto actual: siempre al comienzo de una línea
+# del cuerpo de una función, para no partir cadenas
+def edicion(data, rnd):
+    linea = data.find('\n    ', rnd.randrange(len(data) - 100)) + 1
+    tipo = rnd.randrange(4)
+    if tipo == 0:
+        return 'carácter', (linea + 4, 0, 'z')
+    elif tipo == 1:
+        return 'sentencia', (linea, 0, '    x = x + 1\n')
+    elif tipo == 2:
+        return 'borrar línea', (linea, data.index('\n', linea) + 1 - linea, '')
+    return 'indentación', (linea, 0, '  ')
+
+
+def main(lineas, n=200):
+    data = corpus.generar(lineas)
+    inicio = time.perf_counter()
+    flujo = lexer_incremental.Flujo(data)
+    t_completo = time.perf_counter() - inicio
+
+    rnd = random.Random(0)
+    tiempos = {}
+    tokens = {}
+    for _ in range(n):
+        tipo, cambio = edicion(flujo.data, rnd)
+        inicio = time.perf_counter()
+        flujo.editar(*cambio)
+        tiempos.setdefault(tipo, []).append(time.perf_counter() - inicio)
+        tokens.setdefault(tipo, []).append(flujo.reanalizados)
+
+    nuevo = lexer_incremental.Flujo(flujo.data)
+    assert [(t.type, t.value, t.lineno, t.lexpos) for t in flujo.tokens] == \
+        [(t.type, t.value, t.lineno, t.lexpos) for t in nuevo.tokens]
+
+    print('%d líneas, %d tokens; análisis completo: %.3f s' % (lineas, len(flujo.tokens), t_completo))
+    print('%-14s %10s %14s %18s' % ('edición', 'n', 'media (ms)', 'tokens analizados'))
+    for tipo in sorted(tiempos):
+        t = tiempos[tipo]
+        print('%-14s %10d %14.2f %18.1f' % (tipo, len(t), 1000 * sum(t) / len(t),
+                                            sum(tokens[tipo]) / len(t)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,54 @@
+import sys
+import time
+
+import indentacion
+import lexer_rapido
+
+# Coste de la etapa de indentación sobre código muy anidado. Cada función baja
+# hasta `niveles` bloques while y vuelve a la columna 0 de golpe, que es el
+# caso de varios DEDENT seguidos. Uso: python bench_indentacion.py [niveles ...]
+
+
+def anidado(niveles, funciones):
+    lineas = []
+    for f in range(funciones):
+        lineas.append('def f%d():' % f)
+        for n in range(1, niveles + 1):
+            lineas.append('    ' * n + 'while a < b:')
+            lineas.append('    ' * (n + 1) + '# comentario')
+            lineas.append('')
+        lineas.append('    ' * (niveles + 1) + 'a = a * 1')
+    return '\n'.join(lineas) + '\n'
+
+
+def contar(lexer, data):
+    lexer.input(data)
+    tipos = {}
+    inicio = time.perf_counter()
+    tok = lexer.token()
+    while tok:
+        tipos[tok.type] = tipos.get(tok.type, 0) + 1
+        tok = lexer.token()
+    return tipos, time.perf_counter() - inicio
+
+
+def main(niveles_lista, lineas=100000):
+    base = lexer_rapido.FastLexer()
+    print('%8s %10s %12s %12s %10s %10s %10s' % ('niveles', 'lineas', 'lexer (s)', 'etapa (s)',
+                                                  'lineas/s', 'INDENT', 'DEDENT'))
+    for niveles in niveles_lista:
+        data = anidado(niveles, max(1, lineas // (3 * niveles + 2)))
+        n_lineas = data.count('\n')
+        raw = base.clone()
+        raw.lineno = 1
+        _, t_raw = contar(raw, data)
+        raw = base.clone()
+        raw.lineno = 1
+        tipos, t = contar(indentacion.IndentLexer(raw), data)
+        assert tipos.get('INDENT', 0) == tipos.get('DEDENT', 0)
+        print('%8d %10d %12.3f %12.3f %10.0f %10d %10d' % (niveles, n_lineas, t_raw, t, n_lineas / t,
+                                                          tipos.get('INDENT', 0), tipos.get('DEDENT', 0)))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1, 5, 20, 40])
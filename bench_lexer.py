@@ -0,0 +1,86 @@
+import os
+import sys
+import tempfile
+import time
+
+import corpus
+import lexer_mmap
+import lexer_rapido
+from ply import lex
+
+# Comparación de throughput entre el lexer de PLY construido por lex.lex() y
+# el lexer de expresión maestra de lexer_rapido.py sobre programas de 10k a 1M
+# líneas. Uso: python bench_lexer.py [lineas ...]
+
+
+def lexer_ply():
+    import ll_2
+    return lex.lex(module=ll_2)
+
+
+def contar_token(lexer, data):
+    lexer.lineno = 1
+    lexer.input(data)
+    n = 0
+    token = lexer.token
+    while token():
+        n += 1
+    return n
+
+
+def contar_tokens(lexer, data):
+    lexer.lineno = 1
+    n = 0
+    for _ in lexer.tokens(data):
+        n += 1
+    return n
+
+
+# El archivo se mapea en cada medición; los valores no se decodifican
+def contar_mmap(ruta, data):
+    n = 0
+    with lexer_mmap.MmapLexer(ruta) as lexer:
+        for _ in lexer:
+            n += 1
+    return n
+
+
+# Mejor tiempo de varias repeticiones
+def medir(funcion, lexer, data, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        n = funcion(lexer, data)
+        t = time.perf_counter() - inicio
+        if mejor is None or t < mejor:
+            mejor = t
+    return n, mejor
+
+
+def main(tamanos):
+    ply_lexer = lexer_ply()
+    rapido = lexer_rapido.FastLexer()
+    casos = [
+        ('lex.lex() token()', contar_token, ply_lexer),
+        ('FastLexer.token()', contar_token, rapido),
+        ('FastLexer.tokens()', contar_tokens, rapido),
+    ]
+    print('%-10s %-20s %10s %12s %10s %8s' % ('lineas', 'lexer', 'tokens', 'tokens/s', 'MB/s', 'x PLY'))
+    for lineas in tamanos:
+        data = corpus.generar(lineas)
+        mb = len(data.encode('utf-8')) / 1e6
+        fd, ruta = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+        base = None
+        for nombre, funcion, lexer in casos + [('MmapLexer (bytes)', contar_mmap, ruta)]:
+            n, t = medir(funcion, lexer, data, 3 if lineas <= 100000 else 1)
+            if base is None:
+                base = t
+            print('%-10d %-20s %10d %12.0f %10.2f %8.2f' % (lineas, nombre, n, n / t, mb / t, base / t))
+        os.remove(ruta)
+
+
+if __name__ == '__main__':
+    tamanos = [int(a) for a in sys.argv[1:]] or [10000, 100000, 1000000]
+    main(tamanos)
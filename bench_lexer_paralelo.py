@@ -0,0 +1,71 @@
+import sys
+import time
+
+import corpus
+import lexer_paralelo
+import lotes
+import memoria_compartida
+import tokens_compactos
+import trozos
+
+# Lexer en paralelo de un archivo grande (lexer_paralelo.py) frente al de
+# tokens_compactos.tokenize(data, indentar=True) en un proceso, de 2
+# procesos a todos los procesadores (o a maximo), con el pool ya creado.
+# Mide también las partes secuenciales: buscar las líneas de nivel cero y
+# unir los buffers. Comprueba que el resultado es el mismo. Uso:
+#   python bench_lexer_paralelo.py [lineas] [maximo]
+
+
+def medir(funcion, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def columnas(buf):
+    return ([buf.nombres[t] for t in buf.tipos], [buf.tabla[v] for v in buf.valores],
+            buf.inicios, buf.fines, buf.lineas, buf.errores)
+
+
+def main(lineas=200000, maximo=None):
+    maximo = maximo or lotes.procesos_disponibles()
+    data = corpus.generar(lineas)
+    print('%d líneas, %.1f MB, %d procesadores disponibles'
+          % (lineas, len(data) / 1e6, lotes.procesos_disponibles()))
+    serie, t = medir(lambda: tokens_compactos.tokenize(data, indentar=True))
+    print('%-44s %10s' % ('lexer', 'tiempo (s)'))
+    print('%-44s %10.3f   %d tokens' % ('tokens_compactos.tokenize(), 1 proceso', t, len(serie)))
+    _, t = medir(lambda: trozos.cortes(data, trozos.LINEAS_NIVEL_CERO))
+    print('%-44s %10.3f' % ('  buscar las líneas de nivel cero', t))
+    procesos = 2
+    while True:
+        pool = lexer_paralelo.crear_pool(procesos)
+        try:
+            partes = trozos.trocear(data, procesos * lexer_paralelo.TROZOS_POR_PROCESO, trozos.LINEAS_NIVEL_CERO)
+            lexeados = [(memoria_compartida.abrir_tokens(parte) if isinstance(parte, str) else parte, mensajes)
+                        for parte, mensajes in pool.map(lexer_paralelo._lexear_trozo, partes)]
+
+            def unir():
+                buf = tokens_compactos.TokenBuffer(lexeados[0][0].nombres)
+                for parte, _ in lexeados:
+                    lexer_paralelo._unir(buf, parte)
+                return buf
+
+            paralelo, t = medir(lambda: lexer_paralelo.tokenize(data, procesos, pool))
+            assert columnas(paralelo) == columnas(serie)
+            print('%-44s %10.3f' % ('lexer_paralelo.tokenize(), %d procesos' % procesos, t))
+            _, t = medir(unir)
+            print('%-44s %10.3f' % ('  unir los buffers', t))
+        finally:
+            pool.terminate()
+        if procesos >= maximo:
+            break
+        procesos = min(2 * procesos, maximo)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
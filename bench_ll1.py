@@ -0,0 +1,65 @@
+import sys
+import time
+
+import corpus
+import ll_1
+import ll_2
+
+# Parser predictivo LL(1) de ll_1.py (predictivo.py) frente al parser LALR de
+# PLY de ll_2.py sobre las mismas entradas. Primero solo el parser, con los
+# tokens ya calculados (con NEWLINE, INDENT y DEDENT) y servidos desde una
+# lista; después el análisis completo con el lexer de ll_2.py.
+# Uso: python bench_ll1.py [lineas]
+
+
+class ListaLexer(object):
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def token(self):
+        return next(self.iterador, None)
+
+    def input(self, data):
+        self.iterador = iter(self.tokens)
+
+
+def medir(funcion, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def solo_lalr(lista):
+    ll_2.errors = []
+    lista.input(None)
+    ll_2.get_parser().parse(lexer=lista)
+    return ll_2.errors or True
+
+
+def solo_ll1(lista):
+    lista.input(None)
+    return ll_1.parser.parse(lista)
+
+
+def main(lineas=100000):
+    data = corpus.generar(lineas)
+    tokens = ll_2.tokenize(data)
+    lista = ListaLexer(tokens)
+    print('%d líneas, %d tokens' % (data.count('\n'), len(tokens)))
+    print('%-28s %10s %12s' % ('', 'tiempo (s)', 'tokens/s'))
+    for nombre, funcion in [('parser LALR (ll_2)', lambda: solo_lalr(lista)),
+                            ('parser LL(1) (ll_1)', lambda: solo_ll1(lista)),
+                            ('analyze() de ll_2', lambda: ll_2.analyze(data)),
+                            ('parse() de ll_1', lambda: ll_1.parse(data))]:
+        resultado, t = medir(funcion)
+        assert resultado is True, resultado
+        print('%-28s %10.3f %12.0f' % (nombre, t, len(tokens) / t))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
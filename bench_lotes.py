@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import time
+
+import corpus
+import lotes
+
+# Análisis de muchos archivos en un pool de procesos (lotes.py): archivos por
+# segundo y MB por segundo según el número de procesos, de 1 a todos los
+# procesadores (o a maximo). Los archivos tienen tamaños muy desiguales, como
+# en un repositorio real: muchos pequeños y unos pocos grandes. Como
+# referencia, el mismo pool con los lotes en el orden de entrada en lugar de
+# los más grandes primero, donde un archivo grande al final deja a los demás
+# procesos parados. Uso: python bench_lotes.py [archivos] [maximo]
+
+
+def crear(directorio, n):
+    for i in range(n):
+        # Uno de cada 100 archivos es 50 veces más grande
+        lineas = 5000 if i % 100 == 99 else 20 + (i * 37) % 180
+        with open(os.path.join(directorio, 'f%05d.py' % i), 'w') as f:
+            f.write(corpus.generar(lineas, semilla=i))
+
+
+def medir(rutas, procesos):
+    inicio = time.perf_counter()
+    n = errores = total = 0
+    for _, tamano, resultado in lotes.analizar(rutas, procesos):
+        n += 1
+        total += tamano
+        errores += resultado is not True
+    assert errores == 0
+    return n, total, time.perf_counter() - inicio
+
+
+# Mismo pool, con lotes del mismo tamaño pero en el orden de entrada
+def en_orden(rutas, procesos):
+    import multiprocessing
+    por_tamano = lotes.repartir(rutas, procesos)
+    tamanos = dict(par for lote in por_tamano for par in lote)
+    lote_medio = max(1, len(rutas) // len(por_tamano))
+    en_entrada = [[(r, tamanos[r]) for r in rutas[i:i + lote_medio]] for i in range(0, len(rutas), lote_medio)]
+    opciones = {'recognize_only': False, 'fail_fast': False, 'cache': False}
+    inicio = time.perf_counter()
+    with multiprocessing.Pool(procesos, lotes._iniciar, (opciones,)) as pool:
+        for _ in pool.imap_unordered(lotes._analizar_lote, en_entrada):
+            pass
+    return time.perf_counter() - inicio
+
+
+def main(n=1000, maximo=None):
+    maximo = maximo or lotes.procesos_disponibles()
+    directorio = tempfile.mkdtemp(prefix='bench_lotes-')
+    crear(directorio, n)
+    rutas = lotes.archivos([directorio])
+    print('%d archivos, %d procesadores disponibles' % (len(rutas), lotes.procesos_disponibles()))
+    print('%-10s %12s %12s %10s' % ('procesos', 'tiempo (s)', 'archivos/s', 'MB/s'))
+    procesos = 1
+    while True:
+        archivos, total, t = medir(rutas, procesos)
+        print('%-10d %12.3f %12.1f %10.3f' % (procesos, t, archivos / t, total / t / 1e6))
+        if procesos >= maximo:
+            break
+        procesos = min(2 * procesos, maximo)
+    procesos = max(2, maximo)
+    print('%d procesos, lotes en el orden de entrada: %.3f s' % (procesos, en_orden(rutas, procesos)))
+
+    for nombre in os.listdir(directorio):
+        os.unlink(os.path.join(directorio, nombre))
+    os.rmdir(directorio)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
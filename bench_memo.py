@@ -0,0 +1,57 @@
+import sys
+import time
+
+import corpus
+import lexer_memo
+import lexer_rapido
+from ply import lex
+
+# Memoización por línea frente al lexer de PLY (lexer.input()/lexer.token())
+# y al lexer de expresión maestra, sobre código muy repetitivo (3 nombres y 2
+# números, como el código generado) y sobre el corpus normal.
+# Uso: python bench_memo.py [lineas]
+
+
+def contar(lexer, data):
+    lexer.lineno = 1
+    lexer.input(data)
+    n = 0
+    token = lexer.token
+    while token():
+        n += 1
+    return n
+
+
+def medir(crear, data, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        lexer = crear()
+        inicio = time.perf_counter()
+        n = contar(lexer, data)
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return n, mejor, lexer
+
+
+def main(lineas):
+    import ll_2
+    ply = lex.lex(module=ll_2)
+    rapido = lexer_rapido.FastLexer()
+    corpora = [
+        ('repetitivo', corpus.generar(lineas, nombres=3, numeros=2)),
+        ('normal', corpus.generar(lineas)),
+    ]
+    print('%-11s %-10s %10s %12s %10s' % ('corpus', 'lexer', 'tokens', 'tiempo (s)', 'aciertos'))
+    for nombre, data in corpora:
+        n_ply, t_ply, _ = medir(ply.clone, data)
+        n_rapido, t_rapido, _ = medir(rapido.clone, data)
+        n_memo, t_memo, memo = medir(lambda: lexer_memo.MemoLexer(rapido), data)
+        assert n_ply == n_rapido == n_memo
+        tasa = memo.estadisticas()['tasa_aciertos']
+        print('%-11s %-10s %10d %12.3f %10s' % (nombre, 'PLY', n_ply, t_ply, ''))
+        print('%-11s %-10s %10d %12.3f %10s' % (nombre, 'FastLexer', n_rapido, t_rapido, ''))
+        print('%-11s %-10s %10d %12.3f %9.1f%%' % (nombre, 'MemoLexer', n_memo, t_memo, 100 * tasa))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
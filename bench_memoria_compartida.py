@@ -0,0 +1,130 @@
+import multiprocessing
+import pickle
+import sys
+import time
+
+import corpus
+import ll_2
+import memoria_compartida
+import tokens_compactos
+from ply.lex import LexToken
+
+# Cuánto cuesta pasar los tokens y el árbol de un archivo grande de un
+# proceso a otro (memoria_compartida.py): una lista de LexToken por pickle,
+# el TokenBuffer por pickle y el TokenBuffer por memoria compartida, y el
+# árbol de parse_ast() por pickle y por memoria compartida. Para cada uno,
+# el tiempo en el proceso que lo produce (serializar o escribir el bloque), en
+# el que lo recibe (deserializar o abrir el bloque) y los bytes que pasan por
+# la tubería del pool. Después, la ida y vuelta real por un pool de un
+# proceso, junto al tiempo de producir los tokens aquí. Comprueba que lo recibido es igual a lo enviado. Uso:
+#   python bench_memoria_compartida.py [lineas]
+
+
+def medir(funcion, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+# Los LexToken que devolvería un proceso: solo los cuatro atributos, sin la
+# referencia al lexer que PLY deja en algunos
+def lextokens(code):
+    lista = []
+    for t in ll_2.tokenize(code):
+        tok = LexToken()
+        tok.type, tok.value, tok.lineno, tok.lexpos = t.type, t.value, t.lineno, t.lexpos
+        lista.append(tok)
+    return lista
+
+
+def columnas(buf):
+    return ([buf.nombres[t] for t in buf.tipos], [buf.tabla[v] for v in buf.valores],
+            list(buf.inicios), list(buf.fines), list(buf.lineas), buf.errores)
+
+
+def nodos(arena):
+    return [list(getattr(arena, nombre)) for nombre in arena.ARRAYS] + [list(arena.valores), arena.raiz]
+
+
+def por_pickle(objeto):
+    datos, t_enviar = medir(lambda: pickle.dumps(objeto, pickle.HIGHEST_PROTOCOL))
+    recibido, t_recibir = medir(lambda: pickle.loads(datos))
+    return recibido, t_enviar, t_recibir, len(datos)
+
+
+def por_memoria(exportar, abrir, objeto):
+    t_enviar = t_recibir = None
+    for _ in range(3):
+        inicio = time.perf_counter()
+        nombre = exportar(objeto)
+        t = time.perf_counter() - inicio
+        t_enviar = t if t_enviar is None else min(t_enviar, t)
+        inicio = time.perf_counter()
+        recibido = abrir(nombre)
+        t = time.perf_counter() - inicio
+        t_recibir = t if t_recibir is None else min(t_recibir, t)
+    return recibido, t_enviar, t_recibir, len(pickle.dumps(nombre, pickle.HIGHEST_PROTOCOL))
+
+
+_datos = None
+
+
+def _producir(forma):
+    if forma == 'lextoken':
+        return lextokens(_datos)
+    buf = tokens_compactos.tokenize(_datos, indentar=True)
+    if forma == 'buffer':
+        return buf
+    return memoria_compartida.exportar_tokens(buf)
+
+
+# Ida y vuelta por un pool: tiempo desde que se pide hasta tener los tokens
+def por_pool(pool, forma):
+    def pedir():
+        resultado = pool.apply(_producir, (forma,))
+        if forma == 'memoria':
+            resultado = memoria_compartida.abrir_tokens(resultado)
+        return resultado
+    return medir(pedir)[1]
+
+
+def main(lineas=100000):
+    global _datos
+    _datos = code = corpus.generar(lineas)
+    print('%d líneas, %.1f MB' % (lineas, len(code) / 1e6))
+    lista, t_lista = medir(lambda: lextokens(code))
+    buf, t_buf = medir(lambda: tokens_compactos.tokenize(code, indentar=True))
+    arena = ll_2.parse_ast(code)
+    print('%d tokens, %d nodos' % (len(buf), len(arena.tipo)))
+    print('%-34s %12s %12s %12s' % ('forma', 'enviar (s)', 'recibir (s)', 'bytes'))
+    filas = [
+        ('LexToken por pickle', por_pickle(lista)),
+        ('TokenBuffer por pickle', por_pickle(buf)),
+        ('TokenBuffer por memoria', por_memoria(memoria_compartida.exportar_tokens,
+                                                memoria_compartida.abrir_tokens, buf)),
+        ('árbol por pickle', por_pickle(arena)),
+        ('árbol por memoria', por_memoria(memoria_compartida.exportar_arena,
+                                          memoria_compartida.abrir_arena, arena)),
+    ]
+    for nombre, (recibido, t_enviar, t_recibir, n) in filas:
+        print('%-34s %12.4f %12.4f %12d' % (nombre, t_enviar, t_recibir, n))
+    assert [(t.type, t.value, t.lineno, t.lexpos) for t in filas[0][1][0]] == \
+        [(t.type, t.value, t.lineno, t.lexpos) for t in lista]
+    assert columnas(filas[1][1][0]) == columnas(filas[2][1][0]) == columnas(buf)
+    assert nodos(filas[3][1][0]) == nodos(filas[4][1][0]) == nodos(arena)
+
+    print('%-34s %12s %12s' % ('ida y vuelta por un pool', 'total (s)', 'producir (s)'))
+    memoria_compartida.preparar()
+    with multiprocessing.Pool(1) as pool:
+        for nombre, forma, produccion in (('LexToken por pickle', 'lextoken', t_lista),
+                                          ('TokenBuffer por pickle', 'buffer', t_buf),
+                                          ('TokenBuffer por memoria', 'memoria', t_buf)):
+            print('%-34s %12.4f %12.4f' % (nombre, por_pool(pool, forma), produccion))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
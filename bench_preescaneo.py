@@ -0,0 +1,56 @@
+import sys
+import time
+
+import corpus
+import ll_2
+import preescaneo
+import tokens_compactos
+
+# Pre-escaneo vectorial: velocidad del pre-escaneo, tokenización con los
+# tokens de indentación (etapa de indentacion.py frente a los arrays del
+# pre-escaneo), análisis completo y rechazo de un archivo con un paréntesis
+# sin cerrar al final. Uso: python bench_preescaneo.py [lineas]
+
+
+def medir(funcion, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def main(lineas):
+    data = corpus.generar(lineas)
+    mb = len(data) / 1e6
+    pre, t_pre = medir(lambda: preescaneo.Preescaneo(data))
+    assert not pre.errores
+    print('%d líneas, %.1f MB' % (lineas, mb))
+    print('%-34s %10.3f s %10.1f MB/s' % ('pre-escaneo', t_pre, mb / t_pre))
+
+    a, t_etapa = medir(lambda: tokens_compactos.tokenize(data, indentar=True))
+    b, t_arrays = medir(lambda: preescaneo.tokenize(data, preescaneo.Preescaneo(data)))
+    assert list(a.tipos) == list(b.tipos) and list(a.lineas) == list(b.lineas)
+    print('%-34s %10.3f s' % ('tokenize + etapa de indentación', t_etapa))
+    print('%-34s %10.3f s' % ('pre-escaneo + tokenize', t_arrays))
+
+    r, t_analyze = medir(lambda: ll_2.analyze(data), 1)
+    assert r is True
+    r, t_analyze_pre = medir(lambda: ll_2.analyze_preescaneo(data), 1)
+    assert r is True
+    print('%-34s %10.3f s' % ('analyze()', t_analyze))
+    print('%-34s %10.3f s' % ('analyze_preescaneo()', t_analyze_pre))
+
+    roto = data + 'def g():\n    x = (1 + 2\n'
+    r, t_roto = medir(lambda: ll_2.analyze(roto), 1)
+    assert r is not True
+    r, t_rechazo = medir(lambda: ll_2.analyze_preescaneo(roto), 1)
+    assert r is not True
+    print('%-34s %10.3f s' % ('paréntesis sin cerrar: analyze()', t_roto))
+    print('%-34s %10.3f s  %s' % ('paréntesis sin cerrar: rechazo', t_rechazo, r[0]))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
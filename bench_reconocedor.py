@@ -0,0 +1,77 @@
+import sys
+import time
+
+import corpus
+import ll_2
+
+# analyze() completo frente a solo reconocer (recognize_only, ver
+# reconocedor.py) y al modo de primer error (fail_fast). Primero solo el
+# parser con los tokens ya calculados; después analyze() entero, con el lexer,
+# sobre un programa válido y sobre el mismo programa con un error cerca del
+# principio. Uso: python bench_reconocedor.py [lineas]
+
+
+class ListaLexer(object):
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.lineno = self.lexpos = 0
+
+    def token(self):
+        return next(self.iterador, None)
+
+    def input(self, data):
+        self.iterador = iter(self.tokens)
+
+
+def medir(funcion, repeticiones=5):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def main(lineas=50000):
+    data = corpus.generar(lineas)
+    lista = ListaLexer(ll_2.tokenize(data))
+    # Un paréntesis sin cerrar en la segunda línea
+    erroneo = data.replace('(', '((', 1)
+    parser = ll_2.get_parser()
+    reconocedor = ll_2.get_reconocedor()
+
+    def completo():
+        ll_2.errors = []
+        parser.parse('', lexer=lista, tracking=True)
+        return ll_2.errors or True
+
+    def reconocer():
+        ll_2.errors = []
+        reconocedor.parse('', lexer=lista)
+        return ll_2.errors or True
+
+    print('%d tokens' % len(lista.tokens))
+    print('%-32s %10s' % ('solo el parser', 'tiempo (s)'))
+    referencia = None
+    for nombre, funcion in [('LALR de PLY con tracking', completo), ('reconocedor', reconocer)]:
+        resultado, t = medir(funcion)
+        assert resultado is True, resultado
+        referencia = referencia or t
+        print('%-32s %10.3f %7.2fx' % (nombre, t, referencia / t))
+
+    print('%-32s %10s %10s' % ('analyze()', 'válido (s)', 'error (s)'))
+    for nombre, opciones in [('completo', {}),
+                             ('recognize_only', {'recognize_only': True}),
+                             ('fail_fast', {'fail_fast': True}),
+                             ('recognize_only + fail_fast', {'recognize_only': True, 'fail_fast': True})]:
+        resultado, t = medir(lambda: ll_2.analyze(data, **opciones))
+        assert resultado is True, resultado
+        errores, t_error = medir(lambda: ll_2.analyze(erroneo, **opciones))
+        assert errores is not True
+        print('%-32s %10.3f %10.3f' % (nombre, t, t_error))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,92 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import corpus
+import ll_2
+
+# Prueba de estrés de ParserSession: muchos análisis a la vez desde un
+# ThreadPoolExecutor, cada hilo con su sesión (ll_2.get_session()), sobre
+# entradas válidas, con errores de sintaxis y con errores de indentación, en
+# todos los modos (completo, recognize_only, fail_fast, parse_ast con y sin
+# consing). Cada resultado se compara con el del mismo análisis hecho en
+# secuencia; el intervalo de cambio de hilo se baja para que los análisis se
+# intercalen lo más posible. Como referencia, lo mismo con las funciones del
+# módulo, que comparten estado y se mezclan. Uso:
+#   python bench_sesiones.py [entradas] [hilos]
+
+MODOS = [
+    ('analyze', {}),
+    ('analyze', {'recognize_only': True}),
+    ('analyze', {'fail_fast': True}),
+    ('analyze', {'recognize_only': True, 'fail_fast': True}),
+    ('parse_ast', {}),
+    ('parse_ast', {'hash_cons': True}),
+]
+
+
+def entrada(i):
+    code = corpus.generar(20 + i % 40, semilla=i)
+    lineas = code.split('\n')
+    if i % 3 == 1:
+        # Error de sintaxis
+        lineas.insert(len(lineas) // 2, '    x = = %d' % i)
+    elif i % 3 == 2:
+        # Error de indentación y de sintaxis al final
+        lineas.insert(len(lineas) // 3, '   y = %d' % i)
+        lineas.append('def')
+    return '\n'.join(lineas)
+
+
+# Resultado comparable: la lista de errores, True, o los arrays del árbol
+def resumen(resultado):
+    if resultado is True or isinstance(resultado, list):
+        return resultado if resultado is True else list(resultado)
+    return (resultado.raiz, list(resultado.valores),
+            [list(getattr(resultado, nombre)) for nombre in resultado.ARRAYS])
+
+
+def con_sesion(tarea):
+    code, metodo, opciones = tarea
+    return resumen(getattr(ll_2.get_session(), metodo)(code, **opciones))
+
+
+def con_modulo(tarea):
+    code, metodo, opciones = tarea
+    try:
+        return resumen(getattr(ll_2, metodo)(code, **opciones))
+    except Exception as e:
+        return repr(e)
+
+
+def main(n=300, hilos=8):
+    codigos = [entrada(i) for i in range(n)]
+    tareas = [(code, metodo, opciones) for code in codigos for metodo, opciones in MODOS]
+    ll_2.get_parser()
+
+    inicio = time.perf_counter()
+    esperado = [resumen(getattr(ll_2, metodo)(code, **opciones)) for code, metodo, opciones in tareas]
+    secuencial = time.perf_counter() - inicio
+    print('%d análisis, %d con errores' % (len(tareas), sum(1 for r in esperado if isinstance(r, list))))
+    print('%-36s %10.3f s' % ('funciones del módulo, en secuencia', secuencial))
+
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(hilos) as pool:
+            inicio = time.perf_counter()
+            obtenido = list(pool.map(con_sesion, tareas))
+            t = time.perf_counter() - inicio
+            distintos = sum(1 for a, b in zip(esperado, obtenido) if a != b)
+            print('%-36s %10.3f s   %d distintos' % ('ParserSession, %d hilos' % hilos, t, distintos))
+            assert distintos == 0
+
+            obtenido = list(pool.map(con_modulo, tareas))
+            distintos = sum(1 for a, b in zip(esperado, obtenido) if a != b)
+            print('%-36s %10s     %d distintos' % ('funciones del módulo, %d hilos' % hilos, '', distintos))
+    finally:
+        sys.setswitchinterval(intervalo)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,53 @@
+import sys
+import time
+import tracemalloc
+
+import corpus
+import lexer_rapido
+import lexer_stream
+
+# Memoria máxima del lexer por trozos frente al tamaño de la entrada. La
+# entrada se genera sobre la marcha, como llegaría por una tubería, así que el
+# pico medido es solo el del lexer (el MB/s incluye el coste de tracemalloc).
+# Uso: python bench_stream.py [MB ...]
+
+
+class Tuberia(object):
+
+    def __init__(self, total):
+        self.total = total
+        self.leidos = 0
+        self.bloque = corpus.generar(2000)
+        self.pos = 0
+
+    def read(self, n):
+        n = min(n, self.total - self.leidos)
+        partes = []
+        while n > 0:
+            trozo = self.bloque[self.pos:self.pos + n]
+            self.pos = (self.pos + len(trozo)) % len(self.bloque)
+            n -= len(trozo)
+            partes.append(trozo)
+        texto = ''.join(partes)
+        self.leidos += len(texto)
+        return texto
+
+
+def main(tamanos_mb, trozo=lexer_stream.TAMANO):
+    lexer = lexer_rapido.FastLexer()
+    print('%8s %10s %12s %14s %10s' % ('MB', 'trozo', 'tokens', 'pico (KB)', 'MB/s'))
+    for mb in tamanos_mb:
+        fuente = Tuberia(int(mb * 1e6))
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        n = 0
+        for _ in lexer_stream.tokens(fuente, trozo, lexer):
+            n += 1
+        t = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('%8.1f %10d %12d %14.1f %10.2f' % (mb, trozo, n, pico / 1024.0, mb / t))
+
+
+if __name__ == '__main__':
+    main([float(a) for a in sys.argv[1:]] or [1, 10])
@@ -0,0 +1,81 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Tiempo de arranque de ll_2 en un proceso nuevo: con la caché de tablas
+# vacía, con la caché caliente y con yacc.yacc() tal como lo usa PLY por
+# defecto (parsetab.py ya escrito en el directorio). Después arranca varios
+# procesos a la vez sobre una caché vacía para comprobar que ninguno lee un
+# archivo a medio escribir. Uso: python bench_tablas.py [repeticiones] [procesos]
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+IMPORTAR = 'import ll_2, corpus; assert ll_2.analyze(corpus.generar(5)) is True'
+
+
+# ll_2.py con las llamadas de PLY en lugar de la caché, escrito en el
+# directorio de trabajo para que yacc() deje ahí su parsetab.py
+def ll_2_ply(destino):
+    with open(os.path.join(DIRECTORIO, 'll_2.py'), encoding='utf-8') as f:
+        fuente = f.read()
+    fuente = fuente.replace('tablas.lexer(sys.modules[__name__])', 'lex.lex()')
+    fuente = fuente.replace('tablas.parser(sys.modules[__name__])', 'yacc.yacc()')
+    with open(os.path.join(destino, 'll_2.py'), 'w', encoding='utf-8') as f:
+        f.write(fuente)
+
+
+def arrancar(codigo, cache, cwd=DIRECTORIO):
+    entorno = dict(os.environ, LL2_CACHE=cache)
+    entorno['PYTHONPATH'] = DIRECTORIO
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, '-c', codigo], cwd=cwd, env=entorno, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - inicio
+
+
+def main(repeticiones=5, procesos=8):
+    base = tempfile.mkdtemp(prefix='bench_tablas-')
+    try:
+        vacio = arrancar('pass', os.path.join(base, 'nada'))
+
+        frias = []
+        for i in range(repeticiones):
+            frias.append(arrancar(IMPORTAR, os.path.join(base, 'fria%d' % i)))
+        caliente = os.path.join(base, 'caliente')
+        arrancar(IMPORTAR, caliente)
+        calientes = [arrancar(IMPORTAR, caliente) for _ in range(repeticiones)]
+
+        # PLY por defecto: parsetab.py en el directorio de trabajo
+        trabajo = os.path.join(base, 'ply')
+        os.mkdir(trabajo)
+        ll_2_ply(trabajo)
+        arrancar(IMPORTAR, caliente, trabajo)
+        plys = [arrancar(IMPORTAR, caliente, trabajo) for _ in range(repeticiones)]
+
+        print('%-36s %10s' % ('arranque', 'mejor (s)'))
+        print('%-36s %10.3f' % ('python sin importar nada', vacio))
+        print('%-36s %10.3f' % ('ll_2, caché vacía', min(frias)))
+        print('%-36s %10.3f' % ('ll_2, caché caliente', min(calientes)))
+        print('%-36s %10.3f' % ('ll_2 con PLY (parsetab.py escrito)', min(plys)))
+
+        # Arranques simultáneos con la caché vacía
+        concurrente = os.path.join(base, 'concurrente')
+        entorno = dict(os.environ, LL2_CACHE=concurrente, PYTHONPATH=DIRECTORIO)
+        hijos = [subprocess.Popen([sys.executable, '-c', IMPORTAR], cwd=DIRECTORIO, env=entorno,
+                                  stdout=subprocess.DEVNULL) for _ in range(procesos)]
+        fallidos = sum(1 for h in hijos if h.wait() != 0)
+        archivos = sorted(os.listdir(concurrente))
+        temporales = [a for a in archivos if a.startswith('.tmp-')]
+        print('%d procesos simultáneos: %d fallidos, archivos %s, temporales %d'
+              % (procesos, fallidos, archivos, len(temporales)))
+        # Los pickles que quedaron se cargan sin reconstruir nada
+        arrancar(IMPORTAR, concurrente)
+    finally:
+        shutil.rmtree(base)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
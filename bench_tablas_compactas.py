@@ -0,0 +1,124 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Memoria y velocidad de las tablas compactas (tablas_compactas.py) frente a
+# las de PLY y a la tabla LL(1) en listas. La memoria se mide en procesos
+# nuevos: la memoria de Python que queda asignada al cargar las tablas
+# (tracemalloc) y el aumento de la memoria privada del proceso (Private_* de
+# /proc/self/smaps_rollup), que es la que se multiplica por el número de
+# trabajadores; las páginas del mmap son compartidas. Después, el tiempo del parser solo, con los tokens ya
+# calculados. Uso: python bench_tablas_compactas.py [lineas]
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Todo se importa antes de medir: solo cuenta la carga de las tablas
+PREPARAR = 'import ll_1, ll_2, tablas, tablas_compactas, ply.yacc, pickle'
+
+CARGAR = {
+    'LALR de PLY (pickle)': 'p = ll_2.get_parser()',
+    'LALR compacto (mmap)': 'p = ll_2.get_parser_compacto()',
+    'LL(1) en listas': 'p = ll_1.predictivo.LL1Parser(ll_1.grammar, ll_1.terminal)',
+    'LL(1) compacto (mmap)': 'p = tablas_compactas.cargar_ll1(RUTA, ll_1.terminal)',
+}
+
+MEDIR = '''
+import gc, tracemalloc
+
+
+def privada():
+    gc.collect()
+    total = 0
+    with open('/proc/self/smaps_rollup') as f:
+        for linea in f:
+            if linea.startswith(('Private_Clean', 'Private_Dirty')):
+                total += int(linea.split()[1])
+    return total
+
+
+%s
+antes = privada()
+tracemalloc.start()
+%s
+python = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+print(python, privada() - antes)
+'''
+
+
+class ListaLexer(object):
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def token(self):
+        return next(self.iterador, None)
+
+    def input(self, data):
+        self.iterador = iter(self.tokens)
+
+
+def memoria(codigo, entorno):
+    salida = subprocess.run([sys.executable, '-c', MEDIR % (PREPARAR, codigo)], cwd=DIRECTORIO, env=entorno, check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True).stdout
+    python, privada = salida.split()
+    return int(python), int(privada)
+
+
+def medir(funcion, repeticiones=5):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def main(lineas=50000):
+    import corpus
+    import ll_1
+    import ll_2
+    import tablas_compactas
+
+    ll1 = os.path.join(tempfile.mkdtemp(prefix='bench_tablas_compactas-'), 'll1.bin')
+    tablas_compactas.guardar_ll1(ll1, ll_1.parser)
+    entorno = dict(os.environ)
+    ll_2.get_parser_compacto()
+
+    print('%-24s %14s %16s' % ('tablas', 'python (KiB)', 'privada (KiB)'))
+    for nombre, codigo in CARGAR.items():
+        python, privada = memoria(codigo.replace('RUTA', repr(ll1)), entorno)
+        print('%-24s %14.1f %16d' % (nombre, python / 1024.0, privada))
+
+    data = corpus.generar(lineas)
+    lista = ListaLexer(ll_2.tokenize(data))
+    compacto_ll1 = tablas_compactas.cargar_ll1(ll1, ll_1.terminal)
+
+    def lalr(parser):
+        ll_2.errors = []
+        lista.input(None)
+        parser.parse(lexer=lista)
+        return ll_2.errors or True
+
+    def ll(parser):
+        lista.input(None)
+        return parser.parse(lista)
+
+    print('%d tokens' % len(lista.tokens))
+    print('%-24s %10s' % ('parser', 'tiempo (s)'))
+    for nombre, funcion in [('LALR de PLY', lambda: lalr(ll_2.get_parser())),
+                            ('LALR compacto', lambda: lalr(ll_2.get_parser_compacto())),
+                            ('LL(1) en listas', lambda: ll(ll_1.parser)),
+                            ('LL(1) compacto', lambda: ll(compacto_ll1))]:
+        resultado, t = medir(funcion)
+        assert resultado is True, resultado
+        print('%-24s %10.3f' % (nombre, t))
+    os.unlink(ll1)
+    os.rmdir(os.path.dirname(ll1))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
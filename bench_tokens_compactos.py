@@ -0,0 +1,53 @@
+import gc
+import pickle
+import sys
+import time
+import tracemalloc
+
+import corpus
+import lexer_rapido
+import tokens_compactos
+
+# Memoria por token y coste de guardar y serializar el flujo de tokens: lista
+# de LexToken frente a TokenBuffer. Uso: python bench_tokens_compactos.py [lineas]
+
+
+# El tiempo se mide en una pasada sin tracemalloc, que lo falsearía
+def medir(funcion):
+    gc.collect()
+    inicio = time.perf_counter()
+    funcion()
+    t = time.perf_counter() - inicio
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcion()
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, memoria, t
+
+
+def main(lineas):
+    data = corpus.generar(lineas)
+    lexer = lexer_rapido.FastLexer()
+    lista, mem_lista, t_lista = medir(lambda: list(lexer.clone().tokens(data)))
+    buf, mem_buf, t_buf = medir(lambda: tokens_compactos.tokenize(data, lexer))
+    n = len(lista)
+    assert n == len(buf)
+
+    inicio = time.perf_counter()
+    p_lista = pickle.dumps(lista, pickle.HIGHEST_PROTOCOL)
+    t_p_lista = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    p_buf = pickle.dumps(buf, pickle.HIGHEST_PROTOCOL)
+    t_p_buf = time.perf_counter() - inicio
+
+    print('%d líneas, %d tokens' % (lineas, n))
+    print('%-14s %14s %12s %14s %12s' % ('', 'bytes/token', 'lexing (s)', 'pickle (MB)', 'pickle (s)'))
+    print('%-14s %14.1f %12.3f %14.2f %12.3f' % ('list[LexToken]', mem_lista / n, t_lista,
+                                                 len(p_lista) / 1e6, t_p_lista))
+    print('%-14s %14.1f %12.3f %14.2f %12.3f' % ('TokenBuffer', mem_buf / n, t_buf,
+                                                 len(p_buf) / 1e6, t_p_buf))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
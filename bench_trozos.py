@@ -0,0 +1,56 @@
+import sys
+import time
+
+import corpus
+import ll_2
+import lotes
+import trozos
+
+# Latencia de un solo archivo grande con los trozos de trozos.py en paralelo
+# (ll_2.analyze_parallel) frente a analyze() y a analyze(recognize_only=True)
+# en un proceso, de 1 proceso a todos los procesadores (o a maximo). Con el
+# pool ya creado (el caso de un servicio) y creándolo en cada llamada. Mide
+# también lo que cuesta buscar los cortes, que se hace en secuencia. Uso:
+#   python bench_trozos.py [lineas] [maximo]
+
+
+def medir(funcion, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        t = time.perf_counter() - inicio
+        mejor = t if mejor is None else min(mejor, t)
+    return resultado, mejor
+
+
+def main(lineas=50000, maximo=None):
+    maximo = maximo or lotes.procesos_disponibles()
+    data = corpus.generar(lineas)
+    ll_2.get_parser()
+    ll_2.get_reconocedor()
+    print('%d líneas, %d definiciones, %d procesadores disponibles'
+          % (lineas, len(trozos.cortes(data)), lotes.procesos_disponibles()))
+    print('%-44s %10s' % ('análisis', 'tiempo (s)'))
+    for nombre, funcion in [('analyze()', lambda: ll_2.analyze(data)),
+                            ('analyze(recognize_only=True)', lambda: ll_2.analyze(data, recognize_only=True)),
+                            ('trozos.cortes()', lambda: trozos.cortes(data))]:
+        print('%-44s %10.3f' % (nombre, medir(funcion)[1]))
+    procesos = 2
+    while True:
+        pool = trozos.crear_pool(procesos)
+        try:
+            resultado, t = medir(lambda: ll_2.analyze_parallel(data, procesos, pool=pool))
+            assert resultado is True, resultado[:3]
+        finally:
+            pool.terminate()
+        print('%-44s %10.3f' % ('analyze_parallel(), %d procesos' % procesos, t))
+        _, t = medir(lambda: ll_2.analyze_parallel(data, procesos), 1)
+        print('%-44s %10.3f' % ('  creando el pool en la llamada', t))
+        if procesos >= maximo:
+            break
+        procesos = min(2 * procesos, maximo)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
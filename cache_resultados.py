@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+
+import tablas
+
+# Caché persistente de resultados de análisis por archivo completo, en una
+# base SQLite dentro del directorio de caché de tablas.py. La clave es el
+# hash SHA-256 del contenido del archivo (los bytes, sin decodificar) más la
+# firma del analizador (la gramática y el lexer, ver ll_2.get_result_cache())
+# y el modo: con fail_fast el resultado es otro, pero recognize_only da los
+# mismos errores que el análisis completo y comparte las entradas con él.
+# Cada entrada guarda si el análisis fue correcto, la lista de errores y,
+# opcionalmente, el flujo de tokens (tokens_compactos.TokenBuffer en pickle).
+# Un archivo ya analizado cuesta un hash y una consulta.
+#
+# La base se comparte entre procesos: modo WAL (los lectores no bloquean al
+# que escribe), cada escritura es una transacción corta y una conexión espera
+# hasta ESPERA segundos si otra tiene la base bloqueada. Cada proceso abre su
+# propia conexión (también después de un fork). Si la base no se puede usar
+# (directorio sin permisos, disco lleno, base dañada) se analiza sin caché.
+#
+# Desalojo por tamaño: cada entrada cuenta sus bytes (errores y tokens más un
+# fijo por fila) y, cuando el total pasa de limite, se borran las usadas hace
+# más tiempo hasta dejarlo en el 90 % del límite. La fecha de uso solo se
+# actualiza al leer si tiene más de USO segundos, para que las lecturas no
+# escriban en la base cada vez. El total se comprueba en la primera escritura
+# de cada conexión y después cada vez que esta ha escrito una décima parte
+# del límite: cada proceso puede pasarse como mucho en esa décima parte.
+
+VERSION = 1
+
+ARCHIVO = 'resultados.sqlite3'
+
+LIMITE = 256 * 1024 * 1024
+
+ESPERA = 30.0
+
+USO = 3600
+
+# Bytes que se cuentan por fila además de errores y tokens: claves e índice
+FIJO = 200
+
+_ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS resultados (
+    fuente TEXT NOT NULL,
+    firma TEXT NOT NULL,
+    modo INTEGER NOT NULL,
+    correcto INTEGER NOT NULL,
+    errores TEXT NOT NULL,
+    tokens BLOB,
+    tamano INTEGER NOT NULL,
+    usado INTEGER NOT NULL,
+    PRIMARY KEY (fuente, firma, modo)
+);
+CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado);
+'''
+
+
+def firma_contenido(contenido):
+    if isinstance(contenido, str):
+        contenido = contenido.encode('utf-8')
+    return hashlib.sha256(contenido).hexdigest()
+
+
+class CacheResultados(object):
+
+    def __init__(self, directorio=None, limite=LIMITE, firma=''):
+        self.ruta = os.path.join(tablas.directorio_cache(directorio), ARCHIVO)
+        self.limite = limite
+        self.firma = '%d:%s' % (VERSION, firma)
+        self._conexion = None
+        self._pid = None
+        self._escrito = None
+        # Después de un error de SQLite la caché queda desactivada en este
+        # proceso: buscar() no encuentra nada y guardar() no hace nada
+        self.activa = True
+
+    def _conectar(self):
+        if self._conexion is not None and self._pid == os.getpid():
+            return self._conexion
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        conexion = sqlite3.connect(self.ruta, timeout=ESPERA, isolation_level=None,
+                                   check_same_thread=False)
+        try:
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute('PRAGMA synchronous=NORMAL')
+            conexion.executescript(_ESQUEMA)
+        except BaseException:
+            conexion.close()
+            raise
+        self._conexion = conexion
+        self._pid = os.getpid()
+        self._escrito = None
+        return conexion
+
+    def _desactivar(self):
+        self.activa = False
+        if self._conexion is not None and self._pid == os.getpid():
+            self._conexion.close()
+        self._conexion = None
+
+    # Resultado guardado para contenido (True o la lista de errores), o None
+    # si no está
+    def buscar(self, contenido, fail_fast=False):
+        if not self.activa:
+            return None
+        fuente = firma_contenido(contenido)
+        try:
+            conexion = self._conectar()
+            fila = conexion.execute('SELECT correcto, errores, usado FROM resultados '
+                                    'WHERE fuente = ? AND firma = ? AND modo = ?',
+                                    (fuente, self.firma, int(fail_fast))).fetchone()
+            if fila is None:
+                return None
+            ahora = int(time.time())
+            if ahora - fila[2] > USO:
+                conexion.execute('UPDATE resultados SET usado = ? WHERE fuente = ? AND firma = ? AND modo = ?',
+                                 (ahora, fuente, self.firma, int(fail_fast)))
+        except (OSError, sqlite3.Error):
+            self._desactivar()
+            return None
+        return True if fila[0] else json.loads(fila[1])
+
+    # Tokens guardados para contenido (tokens_compactos.TokenBuffer), o None
+    def tokens(self, contenido):
+        if not self.activa:
+            return None
+        try:
+            fila = self._conectar().execute('SELECT tokens FROM resultados WHERE fuente = ? AND firma = ? '
+                                            'AND tokens IS NOT NULL LIMIT 1',
+                                            (firma_contenido(contenido), self.firma)).fetchone()
+        except (OSError, sqlite3.Error):
+            self._desactivar()
+            return None
+        return None if fila is None else pickle.loads(fila[0])
+
+    # Guarda el resultado (True o lista de errores) del análisis de contenido
+    # y, si se dan, sus tokens (un TokenBuffer)
+    def guardar(self, contenido, resultado, fail_fast=False, tokens=None):
+        if not self.activa:
+            return
+        errores = '[]' if resultado is True else json.dumps(list(resultado))
+        if tokens is not None:
+            tokens = pickle.dumps(tokens, pickle.HIGHEST_PROTOCOL)
+        tamano = FIJO + len(errores) + (len(tokens) if tokens is not None else 0)
+        try:
+            conexion = self._conectar()
+            conexion.execute('INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             (firma_contenido(contenido), self.firma, int(fail_fast), resultado is True,
+                              errores, tokens, tamano, int(time.time())))
+            if self._escrito is None or self._escrito + tamano > self.limite // 10:
+                self.desalojar()
+                self._escrito = 0
+            else:
+                self._escrito += tamano
+        except (OSError, sqlite3.Error):
+            self._desactivar()
+
+    # Borra las entradas usadas hace más tiempo hasta dejar el total en el
+    # 90 % del límite, si lo pasa
+    def desalojar(self):
+        conexion = self._conectar()
+        conexion.execute('BEGIN IMMEDIATE')
+        try:
+            total = conexion.execute('SELECT COALESCE(SUM(tamano), 0) FROM resultados').fetchone()[0]
+            if total > self.limite:
+                conexion.execute('DELETE FROM resultados WHERE rowid IN ('
+                                 'SELECT rowid FROM (SELECT rowid, SUM(tamano) OVER '
+                                 '(ORDER BY usado DESC, rowid DESC) AS acumulado FROM resultados) '
+                                 'WHERE acumulado > ?)', (self.limite * 9 // 10,))
+            conexion.execute('COMMIT')
+        except BaseException:
+            conexion.execute('ROLLBACK')
+            raise
+
+    def tamano(self):
+        return self._conectar().execute('SELECT COALESCE(SUM(tamano), 0) FROM resultados').fetchone()[0]
+
+    def __len__(self):
+        return self._conectar().execute('SELECT COUNT(*) FROM resultados').fetchone()[0]
+
+    def vaciar(self):
+        self._conectar().execute('DELETE FROM resultados')
+
+    def close(self):
+        if self._conexion is not None and self._pid == os.getpid():
+            self._conexion.close()
+        self._conexion = None
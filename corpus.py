@@ -0,0 +1,54 @@
+import random
+
+# Generador de programas sintéticos para los benchmarks. El código generado es
+# aceptado por la gramática de ll_2.py: solo contiene definiciones sin
+# parámetros tipados, con bloques de sentencias simples, if/elif/else, while
+# y for.
+
+_NOMBRES = ['x', 'y', 'a', 'b', 'total', 'indice', 'valor', 'resultado', 'n', 'acc']
+
+_SIMPLES = [
+    '{a} = {b} + {n} * ({c} - {m})',
+    '{a} = {a} * {b}',
+    'r = foo({a}, {b})',
+    '{a} = [{n}, {m}, {n}]',
+    's = "cadena numero {n}"',
+    'return {a} + {n}',
+    'return 0',
+    'pass',
+    '# comentario {n}',
+]
+
+_BLOQUES = [
+    ['while {a} < {b}:', '    {a} = {a} * {n}'],
+    ['if {a} > {b}:', '    return {a} + 1', 'elif {a} < {b}:', '    return {b} + 1', 'else:', '    return 0'],
+    ['for {a} in [1, 2, 3]:', '    {b} = {b} * {a}'],
+]
+
+
+def _rellenar(plantilla, rnd, nombres=_NOMBRES, numeros=1000):
+    return plantilla.format(a=rnd.choice(nombres), b=rnd.choice(nombres),
+                            c=rnd.choice(nombres), n=rnd.randrange(numeros),
+                            m=rnd.randrange(min(numeros, 100)))
+
+
+# Devuelve un programa de aproximadamente `lineas` líneas. Con pocos nombres
+# y números (por ejemplo nombres=3, numeros=2) la mayoría de las líneas se
+# repiten, como en el código generado por máquina.
+def generar(lineas, semilla=0, nombres=None, numeros=1000):
+    rnd = random.Random(semilla)
+    nombres = _NOMBRES[:nombres] if nombres else _NOMBRES
+    salida = []
+    funcion = 0
+    while len(salida) < lineas:
+        salida.append('def f%d():' % funcion)
+        funcion += 1
+        salida.append('    ' + _rellenar(_SIMPLES[0], rnd, nombres, numeros))
+        for _ in range(rnd.randint(3, 12)):
+            if rnd.random() < 0.3:
+                for linea in _BLOQUES[rnd.randrange(len(_BLOQUES))]:
+                    salida.append('    ' + _rellenar(linea, rnd, nombres, numeros))
+            else:
+                salida.append('    ' + _rellenar(rnd.choice(_SIMPLES), rnd, nombres, numeros))
+        salida.append('')
+    return '\n'.join(salida) + '\n'
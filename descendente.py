@@ -0,0 +1,171 @@
+import hashlib
+import importlib.util
+import os
+import re
+import types
+
+import gramaticas
+
+# Generador de parsers descendentes recursivos. A partir de una
+# gramaticas.Grammar escribe un módulo de Python con una función por no
+# terminal; cada función recibe la lista de tipos de token (enteros, los
+# terminales de la gramática, terminada en 0 = '$') y la posición actual, y
+# devuelve la posición siguiente.
+#
+# Las alternativas se eligen con el conjunto de predicción de cada producción
+# como constante entera: `1 << t & 0x...`, sin diccionarios ni cadenas en
+# tiempo de análisis. Los conflictos se resuelven como en predictivo.py (gana
+# la primera producción). Una producción que termina en su propio no terminal
+# (las listas: StatementList -> Statement StatementList) se convierte en un
+# bucle, así que la longitud de un bloque no gasta pila de Python; solo la
+# gasta el anidamiento.
+#
+# El módulo generado solo depende de la gramática: se guarda en la caché de
+# tablas con el hash de la gramática en el nombre y se vuelve a generar
+# únicamente cuando la gramática cambia.
+
+
+def firma(grammar):
+    partes = [grammar.simbolos, grammar.n_terminales, grammar.inicial, grammar.producciones]
+    return hashlib.sha256(repr(partes).encode('utf-8')).hexdigest()[:32]
+
+
+def _nombres(grammar):
+    T = grammar.n_terminales
+    nombres = []
+    usados = set()
+    for a in range(len(grammar.de)):
+        nombre = 'nt_' + re.sub(r'\W', '_', grammar.simbolos[T + a])
+        if nombre in usados:
+            nombre = '%s_%d' % (nombre, a)
+        usados.add(nombre)
+        nombres.append(nombre)
+    return nombres
+
+
+def generar(grammar):
+    T = grammar.n_terminales
+    nombres = _nombres(grammar)
+    lineas = [
+        '# Generado por descendente.py a partir de la gramática %s. No editar.' % firma(grammar),
+        '',
+        'FIRMA = %r' % firma(grammar),
+        'TERMINALES = %r' % (tuple(grammar.simbolos[:T]),),
+        '',
+        '',
+        'class Error(Exception):',
+        '    pass',
+    ]
+    for a, producciones in enumerate(grammar.de):
+        nt = T + a
+        lineas += ['', '', '# %s' % grammar.simbolos[nt]]
+        lineas.append('def %s(k, i):' % nombres[a])
+        # Conjunto efectivo de cada producción: sin los terminales que ya
+        # predice una anterior
+        vistos = 0
+        alternativas = []
+        for p in producciones:
+            conjunto = grammar.prediccion(p) & ~vistos
+            vistos |= conjunto
+            if conjunto:
+                alternativas.append((p, conjunto))
+        bucle = any(grammar.producciones[p][1][-1:] == (nt,) for p, _ in alternativas)
+        # Con una sola alternativa no hace falta elegir: si el token no es
+        # válido, el error salta en la misma posición dentro del cuerpo
+        unica = len(alternativas) == 1 and not bucle
+        sangria = '    '
+        if bucle:
+            lineas.append('    while True:')
+            sangria = '        '
+        if not unica:
+            lineas.append(sangria + 't = k[i]')
+        for p, conjunto in alternativas:
+            cuerpo = grammar.producciones[p][1]
+            if unica:
+                lineas.append(sangria + '# %s' % grammar.produccion(p))
+                interior = sangria
+            else:
+                lineas.append(sangria + 'if 1 << t & %#x:  # %s' % (conjunto, grammar.produccion(p)))
+                interior = sangria + '    '
+            propio = cuerpo[-1:] == (nt,)
+            if propio:
+                cuerpo = cuerpo[:-1]
+            for n, s in enumerate(cuerpo):
+                if s < T:
+                    # El primer terminal ya está comprobado por la predicción
+                    if n or unica:
+                        lineas.append(interior + 'if k[i] != %d:' % s)
+                        lineas.append(interior + '    raise Error(i)')
+                    lineas.append(interior + 'i += 1')
+                elif n == len(cuerpo) - 1 and not propio:
+                    lineas.append(interior + 'return %s(k, i)' % nombres[s - T])
+                else:
+                    lineas.append(interior + 'i = %s(k, i)' % nombres[s - T])
+            if propio:
+                lineas.append(interior + 'continue')
+            elif not cuerpo or cuerpo[-1] < T:
+                lineas.append(interior + 'return i')
+        if not unica:
+            lineas.append(sangria + 'raise Error(i)')
+
+    lineas += [
+        '',
+        '',
+        'def parse(k):',
+        '    i = %s(k, 0)' % nombres[grammar.inicial - T],
+        '    if k[i] != %d:' % grammar.indice[gramaticas.FIN],
+        '        raise Error(i)',
+        '    return i',
+        '',
+    ]
+    return '\n'.join(lineas)
+
+
+# Módulo generado para la gramática, de la caché si ya existe
+def cargar(grammar, directorio=None):
+    import tablas
+    ruta = os.path.join(tablas.directorio_cache(directorio), 'descendente-%s.py' % firma(grammar))
+    if not os.path.exists(ruta):
+        try:
+            tablas._escribir(ruta, generar(grammar).encode('utf-8'))
+        except OSError:
+            # Sin caché: se compila el código en memoria
+            modulo = types.ModuleType('descendente_%s' % firma(grammar))
+            exec(compile(generar(grammar), '<descendente>', 'exec'), modulo.__dict__)
+            return modulo
+    spec = importlib.util.spec_from_file_location('descendente_%s' % firma(grammar), ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+class RDParser(object):
+
+    # Misma interfaz que predictivo.LL1Parser. A diferencia de este, se
+    # detiene en el primer error
+    def __init__(self, grammar, terminal=None, directorio=None):
+        self.modulo = cargar(grammar, directorio)
+        self.indice = dict((s, i) for i, s in enumerate(self.modulo.TERMINALES))
+        self.terminal = terminal or (lambda tok: tok.type)
+
+    def parse(self, lexer, errores=None):
+        errores = [] if errores is None else errores
+        indice = self.indice
+        terminal = self.terminal
+        ninguno = len(indice)
+        tokens = list(iter(lexer.token, None))
+        tipos = [indice.get(terminal(tok), ninguno) for tok in tokens]
+        tipos.append(indice[gramaticas.FIN])
+        try:
+            self.modulo.parse(tipos)
+        except self.modulo.Error as e:
+            i = e.args[0]
+            if i < len(tokens):
+                errores.append(f"Error de sintaxis: Token inesperado '{tokens[i].value}' en la línea {tokens[i].lineno}")
+            else:
+                errores.append("Error de sintaxis: Fin inesperado del archivo")
+        except RecursionError:
+            errores.append("Error de sintaxis: anidamiento demasiado profundo")
+        if errores:
+            return errores
+        return True
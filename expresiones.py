@@ -0,0 +1,159 @@
+# Reconocedor de expresiones por escalada de precedencia, dirigido por una
+# tabla de operadores, para usar dentro de predictivo.LL1Parser en lugar de
+# la cadena Expr -> orExpr -> orExprPrime -> ... -> Factor de la gramática:
+# una expresión se analiza en un solo paso por token en vez de expandir y
+# vaciar un no terminal por nivel de precedencia.
+#
+# Es la escalada de precedencia de siempre,
+#   escalar(minimo): factor; mientras el operador op tenga nivel >= minimo:
+#                    consumir op; escalar(derecha(op))
+# pero con una pila de marcos explícita en lugar de recursión, como el resto
+# de predictivo.py. Cada marco guarda el mínimo, el nivel de lo que lleva a
+# su izquierda y qué hacer al terminar (volver a un operador binario, esperar
+# el `else` de un condicional, cerrar un paréntesis o seguir una lista).
+#
+# El lenguaje aceptado es el de la cadena de la gramática: los binarios son
+# asociativos por la izquierda, los prefijos se aplican a un factor y el
+# condicional `a if b else c` (ll_1.py) tiene la precedencia más baja, con
+# los dos operandos de la derecha del nivel indicado y sin que le pueda seguir
+# un operador de nivel mayor.
+#
+# Los factores son los de la gramática: nombre, nombre(lista), nombre[lista],
+# literal, [lista] y (expresión), con listas de expresiones separadas por
+# comas, posiblemente vacías.
+
+_MAXIMO = 1 << 30
+
+# Qué hacer al terminar un marco
+_FIN, _BINARIO, _CONDICIONAL, _GRUPO, _LISTA = range(5)
+
+
+class ErrorExpresion(Exception):
+    pass
+
+
+class Operadores(object):
+
+    # niveles: tuplas de operadores binarios, de menor a mayor precedencia.
+    # prefijos: operadores unarios de un factor. condicional: (si, sino,
+    # operador del nivel de sus operandos), o None
+    def __init__(self, niveles, prefijos=(), condicional=None):
+        self.niveles = [tuple(n) for n in niveles]
+        self.prefijos = tuple(prefijos)
+        self.condicional = condicional
+
+
+class Expresiones(object):
+
+    # indice: terminal -> entero, como gramaticas.Grammar.indice. Los nombres
+    # de los átomos y la puntuación son los terminales de ll_1.py
+    def __init__(self, operadores, indice, nombre='ID', literales=('None', 'True', 'False', 'INTEGER', 'STRING'),
+                 parentesis=('(', ')'), corchetes=('[', ']'), coma=','):
+        ninguno = -1
+        # binarios[t] = (nivel, nivel mínimo a su izquierda, mínimo a su derecha)
+        self.binarios = {}
+        for nivel, operadores_nivel in enumerate(operadores.niveles, 1):
+            for op in operadores_nivel:
+                self.binarios[indice[op]] = (nivel, nivel, nivel + 1)
+        self.condicional = None
+        if operadores.condicional is not None:
+            si, sino, operandos = operadores.condicional
+            derecha = self.binarios[indice[operandos]][0]
+            # Nivel 0: por debajo de todos los binarios; a su izquierda acepta
+            # cualquier cosa, incluido otro condicional
+            self.binarios[indice[si]] = (0, 0, derecha)
+            self.condicional = (indice[si], indice[sino], derecha)
+        self.prefijos = frozenset(indice[p] for p in operadores.prefijos)
+        self.nombre = indice.get(nombre, ninguno)
+        self.literales = frozenset(indice[l] for l in literales if l in indice)
+        self.abre_parentesis, self.cierra_parentesis = (indice[s] for s in parentesis)
+        self.abre_corchete, self.cierra_corchete = (indice[s] for s in corchetes)
+        self.coma = indice[coma]
+        self.operadores_aplicados = 0
+
+    # Analiza una expresión que empieza en el token actual (tok, t). leer()
+    # devuelve el siguiente (tok, t). Devuelve el primer (tok, t) que ya no es
+    # parte de la expresión, o lanza ErrorExpresion(tok, t) en el primer token
+    # que no puede seguir
+    def analizar(self, tok, t, leer):
+        binarios = self.binarios
+        prefijos = self.prefijos
+        literales = self.literales
+        nombre = self.nombre
+        abre_p, cierra_p = self.abre_parentesis, self.cierra_parentesis
+        abre_c, cierra_c = self.abre_corchete, self.cierra_corchete
+        coma = self.coma
+        condicional = self.condicional
+        aplicados = 0
+
+        # Marco: [mínimo, nivel a la izquierda, al terminar, dato]
+        marcos = [[0, 0, _FIN, None]]
+        factor = True
+        while True:
+            if factor:
+                while t in prefijos:
+                    tok, t = leer()
+                    aplicados += 1
+                if t == nombre:
+                    tok, t = leer()
+                    if t == abre_p or t == abre_c:
+                        cierre = cierra_p if t == abre_p else cierra_c
+                        tok, t = leer()
+                        if t != cierre:
+                            marcos.append([0, 0, _LISTA, cierre])
+                            continue
+                        tok, t = leer()
+                elif t in literales:
+                    tok, t = leer()
+                elif t == abre_c:
+                    tok, t = leer()
+                    if t != cierra_c:
+                        marcos.append([0, 0, _LISTA, cierra_c])
+                        continue
+                    tok, t = leer()
+                elif t == abre_p:
+                    tok, t = leer()
+                    marcos.append([0, 0, _GRUPO, cierra_p])
+                    continue
+                else:
+                    raise ErrorExpresion(tok, t)
+                marcos[-1][1] = _MAXIMO
+                factor = False
+
+            marco = marcos[-1]
+            op = binarios.get(t)
+            if op is not None and op[0] >= marco[0] and marco[1] >= op[1]:
+                tok, t = leer()
+                aplicados += 1
+                if condicional is not None and op[0] == 0:
+                    marcos.append([op[2], 0, _CONDICIONAL, None])
+                else:
+                    marcos.append([op[2], 0, _BINARIO, op[0]])
+                factor = True
+                continue
+
+            # El marco terminó: se vuelve al anterior
+            marcos.pop()
+            al_terminar = marco[2]
+            if al_terminar == _BINARIO:
+                marcos[-1][1] = marco[3]
+            elif al_terminar == _CONDICIONAL:
+                if t != condicional[1]:
+                    raise ErrorExpresion(tok, t)
+                tok, t = leer()
+                marcos.append([condicional[2], 0, _BINARIO, 0])
+                factor = True
+            elif al_terminar == _GRUPO or al_terminar == _LISTA:
+                if al_terminar == _LISTA and t == coma:
+                    tok, t = leer()
+                    marcos.append(marco)
+                    marco[1] = 0
+                    factor = True
+                    continue
+                if t != marco[3]:
+                    raise ErrorExpresion(tok, t)
+                tok, t = leer()
+                marcos[-1][1] = _MAXIMO
+            else:
+                self.operadores_aplicados += aplicados
+                return tok, t
@@ -0,0 +1,253 @@
+# Análisis de una gramática escrita como el diccionario `gramatica` de
+# ll_1.py: no terminal -> producciones, cada una una cadena de símbolos
+# separados por espacios ('ε' es la producción vacía). Los símbolos que no
+# son claves del diccionario son terminales.
+#
+# Cada símbolo se convierte en un entero: primero los terminales (el 0 es el
+# fin de entrada '$') y después los no terminales. Un conjunto de terminales
+# es un int de Python usado como bitset, con el bit i para el terminal i, así
+# que unir conjuntos es un `|` y comprobar conflictos un `&`.
+#
+# Anulables, FIRST y FOLLOW se calculan en tiempo lineal en el tamaño de la
+# gramática: los anulables con una cola de producciones pendientes, y FIRST y
+# FOLLOW como el menor punto fijo de F(x) = F'(x) ∪ ⋃{F(y) | x R y}, con el
+# algoritmo digraph de DeRemer y Pennello (componentes fuertemente conexas de
+# Tarjan), que visita cada arista una sola vez.
+
+EPSILON = 'ε'
+FIN = '$'
+
+
+# Menor punto fijo de F(x) = iniciales[x] | OR(F(y) for y in relacion[x]).
+# Recorrido en profundidad iterativo: una cadena de miles de no terminales no
+# agota la pila de Python
+def _digraph(iniciales, relacion):
+    n = len(iniciales)
+    valores = list(iniciales)
+    profundidad = [0] * n
+    terminado = n + 1
+    pila = []
+    for raiz in range(n):
+        if profundidad[raiz]:
+            continue
+        pila.append(raiz)
+        profundidad[raiz] = len(pila)
+        marcos = [(raiz, 0, len(pila))]
+        while marcos:
+            x, i, d = marcos[-1]
+            sucesores = relacion[x]
+            if i:
+                # Hijo ya recorrido (o visitado antes)
+                y = sucesores[i - 1]
+                if profundidad[y] < profundidad[x]:
+                    profundidad[x] = profundidad[y]
+                valores[x] |= valores[y]
+            if i < len(sucesores):
+                marcos[-1] = (x, i + 1, d)
+                y = sucesores[i]
+                if not profundidad[y]:
+                    pila.append(y)
+                    profundidad[y] = len(pila)
+                    marcos.append((y, 0, len(pila)))
+                continue
+            marcos.pop()
+            if profundidad[x] == d:
+                # x es la raíz de una componente: todos comparten su valor
+                valor = valores[x]
+                while True:
+                    y = pila.pop()
+                    profundidad[y] = terminado
+                    valores[y] = valor
+                    if y == x:
+                        break
+    return valores
+
+
+def bits(conjunto):
+    while conjunto:
+        b = conjunto & -conjunto
+        yield b.bit_length() - 1
+        conjunto ^= b
+
+
+class Grammar(object):
+
+    # gramatica: dict no terminal -> producciones. Si las producciones están
+    # en un set se ordenan, para que los números de producción no dependan
+    # del orden de hash. inicial: por defecto la primera clave
+    def __init__(self, gramatica, inicial=None):
+        no_terminales = list(gramatica)
+        cuerpos = []
+        for cabeza in no_terminales:
+            producciones = gramatica[cabeza]
+            if isinstance(producciones, str):
+                producciones = [producciones]
+            elif isinstance(producciones, (set, frozenset)):
+                producciones = sorted(producciones)
+            cuerpos.append([[s for s in p.split() if s != EPSILON] for p in producciones])
+
+        es_nt = set(no_terminales)
+        terminales = [FIN]
+        vistos = set(terminales)
+        for producciones in cuerpos:
+            for cuerpo in producciones:
+                for s in cuerpo:
+                    if s not in es_nt and s not in vistos:
+                        vistos.add(s)
+                        terminales.append(s)
+
+        self.simbolos = terminales + no_terminales
+        self.indice = dict((s, i) for i, s in enumerate(self.simbolos))
+        self.n_terminales = T = len(terminales)
+        self.inicial = self.indice[inicial if inicial is not None else no_terminales[0]]
+
+        # producciones[p] = (cabeza, cuerpo) con símbolos enteros; de[a] son
+        # las producciones del no terminal a (índice de no terminal, sin T)
+        indice = self.indice
+        self.producciones = []
+        self.de = []
+        for a, producciones in enumerate(cuerpos):
+            self.de.append([])
+            for cuerpo in producciones:
+                self.de[a].append(len(self.producciones))
+                self.producciones.append((T + a, tuple(indice[s] for s in cuerpo)))
+
+        self.anulable = self._anulables()
+        self.first = self._first()
+        self.follow = self._follow()
+
+    def es_terminal(self, simbolo):
+        return simbolo < self.n_terminales
+
+    def _anulables(self):
+        T = self.n_terminales
+        anulable = [False] * (len(self.simbolos) - T)
+        # Por cada producción sin terminales, cuántos símbolos de su cuerpo
+        # faltan por ser anulables; usos[a] son las producciones donde aparece a
+        faltan = []
+        usos = [[] for _ in anulable]
+        cola = []
+        for p, (cabeza, cuerpo) in enumerate(self.producciones):
+            if any(s < T for s in cuerpo):
+                faltan.append(-1)
+                continue
+            faltan.append(len(cuerpo))
+            for s in cuerpo:
+                usos[s - T].append(p)
+            if not cuerpo:
+                cola.append(p)
+        while cola:
+            a = self.producciones[cola.pop()][0] - T
+            if anulable[a]:
+                continue
+            anulable[a] = True
+            for p in usos[a]:
+                faltan[p] -= 1
+                if faltan[p] == 0:
+                    cola.append(p)
+        return anulable
+
+    def _first(self):
+        T = self.n_terminales
+        anulable = self.anulable
+        iniciales = [0] * len(anulable)
+        relacion = [[] for _ in anulable]
+        for cabeza, cuerpo in self.producciones:
+            a = cabeza - T
+            for s in cuerpo:
+                if s < T:
+                    iniciales[a] |= 1 << s
+                    break
+                relacion[a].append(s - T)
+                if not anulable[s - T]:
+                    break
+        return _digraph(iniciales, relacion)
+
+    def _follow(self):
+        T = self.n_terminales
+        anulable = self.anulable
+        first = self.first
+        iniciales = [0] * len(anulable)
+        iniciales[self.inicial - T] = 1 << self.indice[FIN]
+        relacion = [[] for _ in anulable]
+        for cabeza, cuerpo in self.producciones:
+            # FIRST del resto del cuerpo, recorriéndolo de atrás hacia delante
+            resto = 0
+            resto_anulable = True
+            for s in reversed(cuerpo):
+                if s < T:
+                    resto = 1 << s
+                    resto_anulable = False
+                    continue
+                b = s - T
+                iniciales[b] |= resto
+                if resto_anulable:
+                    relacion[b].append(cabeza - T)
+                if anulable[b]:
+                    resto |= first[b]
+                else:
+                    resto = first[b]
+                    resto_anulable = False
+        return _digraph(iniciales, relacion)
+
+    # FIRST de una secuencia de símbolos: (bitset, si es anulable)
+    def first_de(self, simbolos):
+        T = self.n_terminales
+        conjunto = 0
+        for s in simbolos:
+            if s < T:
+                return conjunto | 1 << s, False
+            conjunto |= self.first[s - T]
+            if not self.anulable[s - T]:
+                return conjunto, False
+        return conjunto, True
+
+    # Terminales que predicen la producción p en una tabla LL(1)
+    def prediccion(self, p):
+        cabeza, cuerpo = self.producciones[p]
+        conjunto, anulable = self.first_de(cuerpo)
+        if anulable:
+            conjunto |= self.follow[cabeza - self.n_terminales]
+        return conjunto
+
+    # Conflictos LL(1): (no terminal, terminal, producciones que predice)
+    def conflictos(self):
+        T = self.n_terminales
+        resultado = []
+        for a, producciones in enumerate(self.de):
+            predicciones = [self.prediccion(p) for p in producciones]
+            vistos = 0
+            choques = 0
+            for conjunto in predicciones:
+                choques |= vistos & conjunto
+                vistos |= conjunto
+            for t in bits(choques):
+                resultado.append((self.simbolos[T + a], self.simbolos[t],
+                                  [self.produccion(p) for p, c in zip(producciones, predicciones) if c >> t & 1]))
+        return resultado
+
+    def es_ll1(self):
+        return not self.conflictos()
+
+    def nombres(self, conjunto):
+        return set(self.simbolos[t] for t in bits(conjunto))
+
+    def produccion(self, p):
+        cabeza, cuerpo = self.producciones[p]
+        return '%s -> %s' % (self.simbolos[cabeza], ' '.join(self.simbolos[s] for s in cuerpo) or EPSILON)
+
+    # Conjuntos con nombres, en el formato de `primeros` y `siguientes` de
+    # ll_1.py ('ε' en FIRST de los anulables)
+    def primeros(self):
+        T = self.n_terminales
+        resultado = {}
+        for a, conjunto in enumerate(self.first):
+            nombres = self.nombres(conjunto)
+            if self.anulable[a]:
+                nombres.add(EPSILON)
+            resultado[self.simbolos[T + a]] = nombres
+        return resultado
+
+    def siguientes(self):
+        T = self.n_terminales
+        return dict((self.simbolos[T + a], self.nombres(conjunto)) for a, conjunto in enumerate(self.follow))
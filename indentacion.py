@@ -0,0 +1,123 @@
+from collections import deque
+
+from ply.lex import LexToken
+
+# Etapa de indentación entre el lexer y el parser. El lexer no emite nada
+# para los saltos de línea (t_newline solo cuenta líneas y guarda en
+# lexer.inicio_linea dónde empieza la línea actual); esta etapa detecta el
+# primer token de cada línea lógica por el cambio de lineno y, con la columna
+# de ese token, emite NEWLINE, INDENT y tantos DEDENT como niveles se cierren.
+#
+# Las líneas vacías y las que solo tienen un comentario no producen tokens,
+# así que no cuestan nada aquí. Dentro de paréntesis, corchetes o llaves los
+# saltos de línea se ignoran, como en Python.
+
+ERROR_NIVEL = "Error de indentación: el nivel no coincide con ningún bloque abierto en la línea %d"
+
+_ABREN = ('LPAREN', 'LBRACKET', 'LBRACE')
+_CIERRAN = ('RPAREN', 'RBRACKET', 'RBRACE')
+
+
+def _token(tipo, valor, lineno, lexpos):
+    tok = LexToken()
+    tok.type = tipo
+    tok.value = valor
+    tok.lineno = lineno
+    tok.lexpos = lexpos
+    return tok
+
+
+class IndentLexer(object):
+
+    # errores: lista donde se agregan los errores de indentación (por ejemplo
+    # la lista de errores de analyze()); por defecto una propia
+    def __init__(self, lexer, errores=None):
+        self.lexer = lexer
+        self.errores = [] if errores is None else errores
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self.indent_stack = [0]
+        self.pendientes = deque()
+        self.profundidad = 0
+        self.ultimo = None
+        self.fin_ultimo = 0
+
+    def input(self, data):
+        self.lexer.input(data)
+        self._reiniciar()
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno
+
+    @property
+    def lexpos(self):
+        return self.lexer.lexpos
+
+    # Columna del token en su línea; si el lexer no lleva inicio_linea se
+    # busca el salto de línea anterior en el texto
+    def _columna(self, tok):
+        inicio = getattr(self.lexer, 'inicio_linea', None)
+        if inicio is None:
+            inicio = self.lexer.lexdata.rfind('\n', 0, tok.lexpos) + 1
+        return tok.lexpos - inicio
+
+    def token(self):
+        if self.pendientes:
+            return self.pendientes.popleft()
+        tok = self.lexer.token()
+        ultimo = self.ultimo
+        if tok is None:
+            # Fin de la entrada: se cierra la última línea y todos los bloques
+            if ultimo is not None:
+                self.ultimo = None
+                self.pendientes.append(_token('NEWLINE', '\n', ultimo.lineno, self.fin_ultimo))
+                for _ in range(len(self.indent_stack) - 1):
+                    self.pendientes.append(_token('DEDENT', '', ultimo.lineno, self.fin_ultimo))
+                self.indent_stack = [0]
+                return self.pendientes.popleft()
+            return None
+
+        if ultimo is None or (tok.lineno != ultimo.lineno and self.profundidad == 0):
+            self._nueva_linea(tok, ultimo)
+
+        tipo = tok.type
+        if tipo in _ABREN:
+            self.profundidad += 1
+        elif tipo in _CIERRAN and self.profundidad:
+            self.profundidad -= 1
+        self.ultimo = tok
+        self.fin_ultimo = self.lexer.lexpos
+
+        if self.pendientes:
+            self.pendientes.append(tok)
+            return self.pendientes.popleft()
+        return tok
+
+    def _nueva_linea(self, tok, ultimo):
+        columna = self._columna(tok)
+        pila = self.indent_stack
+        if ultimo is not None:
+            self.pendientes.append(_token('NEWLINE', '\n', ultimo.lineno, self.fin_ultimo))
+        if columna > pila[-1]:
+            pila.append(columna)
+            self.pendientes.append(_token('INDENT', '', tok.lineno, tok.lexpos))
+        elif columna < pila[-1]:
+            while columna < pila[-1]:
+                pila.pop()
+                self.pendientes.append(_token('DEDENT', '', tok.lineno, tok.lexpos))
+            if columna != pila[-1]:
+                self._error_nivel(tok)
+
+    def _error_nivel(self, tok):
+        self.errores.append(ERROR_NIVEL % tok.lineno)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t = self.token()
+        if t is None:
+            raise StopIteration
+        return t
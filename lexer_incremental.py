@@ -0,0 +1,218 @@
+import bisect
+
+import indentacion
+from lexer_rapido import FastLexer
+
+# Re-análisis incremental para editores. Flujo guarda el texto, el flujo de
+# tokens completo (con NEWLINE, INDENT y DEDENT) y un punto de control por
+# cada línea donde empieza un token:
+#   (inicio de la línea, lineno, índice del primer token que produce la línea,
+#    pila de indentación, profundidad de paréntesis, último token, su final)
+# es decir, el estado de la etapa de indentación justo antes de esa línea.
+#
+# editar(offset, borrado, insertado) vuelve a analizar desde el punto de
+# control de la línea dañada. En cada inicio de línea posterior a la edición
+# compara el estado con el punto de control equivalente del flujo anterior;
+# cuando coinciden, el resto del flujo anterior es válido y solo se desplazan
+# sus posiciones y números de línea.
+#
+# En un inicio de línea el lexer no arrastra nada de lo anterior: los tokens
+# no cruzan saltos de línea salvo STRING, y dentro de una cadena no hay punto
+# de control. Por eso basta con el estado de la etapa de indentación. La
+# excepción es una comilla sin cerrar (error léxico): deja de serlo si más
+# adelante aparece otra comilla, así que una edición posterior a ella obliga
+# a empezar desde su línea.
+#
+# Los tokens que siguen a la edición se actualizan en su sitio, no se copian.
+
+
+class _Sincronizado(Exception):
+    pass
+
+
+# Lexer visto por la etapa: avisa de cada token antes de entregarlo
+class _Lector(object):
+
+    def __init__(self, raw, etapa):
+        self.raw = raw
+        self.etapa = etapa
+
+    def __getattr__(self, nombre):
+        return getattr(self.raw, nombre)
+
+    def token(self):
+        tok = self.raw.token()
+        if tok is not None:
+            self.etapa._punto(tok)
+        return tok
+
+
+# Etapa de indentación que guarda un punto de control cuando recibe el primer
+# token de cada línea y anota la línea de cada error de indentación y la
+# posición de cada comilla sin cerrar.
+# comprobar(punto) puede detener el análisis devolviendo True.
+class _Etapa(indentacion.IndentLexer):
+
+    def __init__(self, raw, base, comprobar=None):
+        indentacion.IndentLexer.__init__(self, _Lector(raw, self))
+        self.raw = raw
+        self.base = base
+        self.emitidos = 0
+        self.puntos = []
+        self.lineas_error = []
+        self.comillas = []
+        self.errorf = raw.errorf
+        if raw.errorf is not None:
+            raw.errorf = self._error_lexico
+        self.comprobar = comprobar
+        self.linea = None
+
+    def _punto(self, tok):
+        if tok.lineno == self.linea:
+            return
+        self.linea = tok.lineno
+        # La cola de pendientes está vacía cuando la etapa pide un token
+        punto = (self.raw.inicio_linea, tok.lineno, self.base + self.emitidos, tuple(self.indent_stack),
+                 self.profundidad, self.ultimo, self.fin_ultimo)
+        if self.comprobar is not None and self.comprobar(punto):
+            raise _Sincronizado(punto)
+        self.puntos.append(punto)
+
+    def _error_nivel(self, tok):
+        self.lineas_error.append(tok.lineno)
+
+    def _error_lexico(self, t):
+        if t.value[:1] == '"':
+            self.comillas.append(t.lexpos)
+        return self.errorf(t)
+
+    def token(self):
+        tok = indentacion.IndentLexer.token(self)
+        if tok is not None:
+            self.emitidos += 1
+        return tok
+
+
+class Flujo(object):
+
+    def __init__(self, data, lexer=None):
+        self.lexer = (lexer or FastLexer()).clone()
+        self.data = data
+        etapa = self._etapa(0, 1, 0, None)
+        self.tokens = list(etapa)
+        # Puntos de control en listas paralelas: al desplazar solo se
+        # recorren las columnas de enteros
+        self.inicios, self.lineas, self.indices, self.fines, self.estados = self._columnas(etapa.puntos)
+        self.lineas_error = etapa.lineas_error
+        self.comillas = etapa.comillas
+        self.reanalizados = len(self.tokens)
+
+    @staticmethod
+    def _columnas(puntos):
+        return ([p[0] for p in puntos], [p[1] for p in puntos], [p[2] for p in puntos],
+                [p[6] for p in puntos], [p[3:6] for p in puntos])
+
+    # Errores de indentación, con el texto de indentacion.py
+    @property
+    def errores(self):
+        return [indentacion.ERROR_NIVEL % linea for linea in self.lineas_error]
+
+    def _etapa(self, inicio, lineno, indice, estado, comprobar=None):
+        raw = self.lexer.clone()
+        raw.input(self.data)
+        raw.lexpos = inicio
+        raw.lineno = lineno
+        raw.inicio_linea = inicio
+        etapa = _Etapa(raw, indice, comprobar)
+        if estado is not None:
+            pila, etapa.profundidad, etapa.ultimo, etapa.fin_ultimo = estado
+            etapa.indent_stack = list(pila)
+        return etapa
+
+    # Reemplaza data[offset:offset + borrado] por insertado y actualiza el
+    # flujo. Devuelve (i, j, k): los tokens[i:j] anteriores pasan a ser
+    # tokens[i:k]; el resto solo se desplazó.
+    def editar(self, offset, borrado, insertado):
+        self.data = self.data[:offset] + insertado + self.data[offset + borrado:]
+        delta = len(insertado) - borrado
+        fin_edicion = offset + len(insertado)
+        inicios = self.inicios
+        lineas = self.lineas
+        fines = self.fines
+        estados = self.estados
+
+        c = bisect.bisect_right(inicios, offset) - 1
+        if self.comillas and self.comillas[0] < offset:
+            c = min(c, bisect.bisect_right(inicios, self.comillas[0]) - 1)
+        if c < 0:
+            c = 0
+            inicio, lineno, indice, estado = 0, 1, 0, None
+        else:
+            inicio, lineno, indice = inicios[c], lineas[c], self.indices[c]
+            estado = estados[c] + (fines[c],)
+
+        sincronia = []
+
+        # El punto nuevo coincide con uno anterior si está después de la
+        # edición, en el mismo texto, y la etapa tiene el mismo estado
+        def comprobar(punto):
+            if punto[0] < fin_edicion:
+                return False
+            v = bisect.bisect_left(inicios, punto[0] - delta, c + 1)
+            if v >= len(inicios) or inicios[v] != punto[0] - delta:
+                return False
+            dl = punto[1] - lineas[v]
+            pila, profundidad, ultimo = estados[v]
+            if punto[3] != pila or punto[4] != profundidad or punto[6] != fines[v] + delta:
+                return False
+            if (punto[5] is None) != (ultimo is None):
+                return False
+            if ultimo is not None and punto[5].lineno != ultimo.lineno + dl:
+                return False
+            sincronia.append((punto, v, dl))
+            return True
+
+        etapa = self._etapa(inicio, lineno, indice, estado, comprobar)
+        nuevos = []
+        try:
+            for tok in etapa:
+                nuevos.append(tok)
+        except _Sincronizado:
+            pass
+        self.reanalizados = len(nuevos)
+
+        errores = [linea for linea in self.lineas_error if linea < lineno] + etapa.lineas_error
+        comillas = [p for p in self.comillas if p < inicio] + etapa.comillas
+        puntos = etapa.puntos
+        if sincronia:
+            punto, v, dl = sincronia[0]
+            puntos.append(punto)
+            j = self.indices[v]
+            desplazamiento = indice + len(nuevos) - j
+            for tok in self.tokens[j:]:
+                tok.lexpos += delta
+                tok.lineno += dl
+            errores += [linea + dl for linea in self.lineas_error if linea >= lineas[v]]
+            # Una comilla al comienzo de la línea de sincronía ya se anotó
+            comillas = [p for p in comillas if p < punto[0]]
+            comillas += [p + delta for p in self.comillas if p >= inicios[v]]
+            v += 1
+        else:
+            # Sin sincronía se analizó hasta el final
+            j = len(self.tokens)
+            v = len(inicios)
+            desplazamiento = dl = 0
+        self.tokens[indice:j] = nuevos
+        nuevas = self._columnas(puntos)
+        self.inicios[c:] = nuevas[0] + [p + delta for p in inicios[v:]]
+        self.lineas[c:] = nuevas[1] + [p + dl for p in lineas[v:]]
+        self.indices[c:] = nuevas[2] + [p + desplazamiento for p in self.indices[v:]]
+        self.fines[c:] = nuevas[3] + [p + delta for p in fines[v:]]
+        self.estados[c:] = nuevas[4] + estados[v:]
+        self.lineas_error = errores
+        self.comillas = comillas
+        return indice, j, indice + len(nuevos)
+
+
+def lexear(data, lexer=None):
+    return Flujo(data, lexer)
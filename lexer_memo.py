@@ -0,0 +1,144 @@
+import functools
+
+from ply.lex import LexToken, LexError
+
+import lexer_rapido
+from lexer_rapido import FastLexer
+
+# Lexer con memoización por línea para código generado, donde las mismas
+# líneas (`y = y * x`, `return 0`, ...) se repiten miles de veces. El cuerpo
+# de cada línea, sin la indentación, es la clave de una caché LRU acotada que
+# guarda sus tokens con posiciones relativas al inicio del cuerpo; al
+# reutilizarlos solo se suma el offset de la línea actual.
+#
+# Una línea se guarda solo si se puede analizar aislada: sin errores léxicos,
+# sin reglas función fuera de las que lexer_rapido resuelve en línea y sin una
+# cadena que siga en la línea siguiente. Para esas líneas el resultado no
+# depende del resto del texto. Las demás se analizan en su sitio con el lexer
+# normal y la caché recuerda que no se pueden guardar.
+
+CAPACIDAD = 4096
+
+
+class MemoLexer(object):
+
+    def __init__(self, lexer=None, capacidad=CAPACIDAD):
+        self.lexer = (lexer or FastLexer()).clone()
+        # Copia para analizar líneas aisladas: sin t_error, un error léxico
+        # lanza LexError en lugar de imprimir nada
+        self.aislado = self.lexer.clone()
+        self.aislado.errorf = None
+        self.ignore = self.lexer.ignore
+        self.linea = functools.lru_cache(maxsize=capacidad)(self._analizar_linea)
+        self.no_guardables = 0
+        self.lineno = 1
+        self.lexpos = 0
+        self.inicio_linea = 0
+        self._tokens = None
+
+    # Interfaz de PLY para pasar el lexer a parser.parse(lexer=...)
+    def input(self, data):
+        self._tokens = self.tokens(data)
+
+    def token(self):
+        return next(self._tokens, None)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._tokens)
+
+    # Tokens de una línea aislada como tuplas (tipo, valor, inicio, fin)
+    # relativas al comienzo del texto, o None si la línea no se puede guardar
+    def _analizar_linea(self, texto):
+        lexer = self.aislado
+        lexer.input(texto)
+        lexer.lineno = 1
+        FUNCION = lexer_rapido.FUNCION
+        acciones = lexer.acciones
+        tokens = []
+        pos = 0
+        try:
+            for m in iter(lexer.master.scanner(texto).match, None):
+                if acciones[m.lastindex][0] == FUNCION:
+                    return None
+                tok = lexer.emitir(m)
+                if tok:
+                    tokens.append((tok.type, tok.value, tok.lexpos, lexer.lexpos))
+                pos = m.end()
+        except LexError:
+            return None
+        if texto[pos:].strip(self.ignore):
+            return None
+        return tuple(tokens)
+
+    def tokens(self, data):
+        lexer = self.lexer
+        lexer.input(data)
+        linea = self.linea
+        ignore = self.ignore
+        n = len(data)
+        pos = 0
+        lineno = self.lineno
+        while pos < n:
+            fin = data.find('\n', pos)
+            if fin < 0:
+                fin = n
+            inicio = pos
+            while inicio < fin and data[inicio] in ignore:
+                inicio += 1
+            guardados = linea(data[inicio:fin]) if inicio < fin else ()
+            if guardados is not None:
+                for tipo, valor, desde, hasta in guardados:
+                    tok = LexToken()
+                    tok.type = tipo
+                    tok.value = valor
+                    tok.lineno = lineno
+                    tok.lexpos = inicio + desde
+                    self.lexpos = inicio + hasta
+                    yield tok
+                pos = fin + 1
+                self.lineno = lineno = lineno + 1
+                self.inicio_linea = pos
+                continue
+
+            # Línea que no se puede guardar: se analiza en su sitio hasta el
+            # comienzo de una línea, que puede estar varias más abajo si una
+            # cadena contiene saltos de línea
+            self.no_guardables += 1
+            lexer.lexpos = inicio
+            lexer.lineno = lineno
+            lexer.inicio_linea = pos
+            match = lexer.master.match
+            while True:
+                m = match(data, lexer.lexpos)
+                if m is None:
+                    tok = lexer._error(lexer.lexpos)
+                else:
+                    tok = lexer.emitir(m)
+                self.lineno = lexer.lineno
+                self.lexpos = lexer.lexpos
+                self.inicio_linea = lexer.inicio_linea
+                if tok:
+                    yield tok
+                if lexer.lexpos >= n or data[lexer.lexpos - 1] == '\n':
+                    break
+            pos = lexer.lexpos
+            lineno = lexer.lineno
+        # Como en PLY, al agotar la entrada lexpos queda una posición más allá
+        self.lexpos = n + 1
+
+    # Estadísticas de la caché: aciertos y fallos de la LRU y líneas que se
+    # analizaron en su sitio
+    def estadisticas(self):
+        info = self.linea.cache_info()
+        consultas = info.hits + info.misses
+        return {
+            'aciertos': info.hits,
+            'fallos': info.misses,
+            'no_guardables': self.no_guardables,
+            'tasa_aciertos': info.hits / consultas if consultas else 0.0,
+            'entradas': info.currsize,
+            'capacidad': info.maxsize,
+        }
@@ -0,0 +1,245 @@
+import mmap
+import re
+
+from ply.lex import LexToken, LexError
+
+import lexer_rapido
+from lexer_rapido import FastLexer
+
+# Lexer en modo bytes que trabaja directamente sobre un mmap del archivo, sin
+# decodificar el archivo entero a str. Cada token guarda solo sus posiciones
+# (start, end) en el buffer; el texto de un ID o STRING y el valor de un
+# INTEGER se calculan la primera vez que alguien lee token.value.
+#
+# Las posiciones (lexpos) son offsets en bytes. Coinciden con las de PLY
+# mientras el archivo sea ASCII.
+
+
+class SpanToken(object):
+    __slots__ = ('type', 'start', 'end', 'lineno', 'buf', 'accion', '_valor', 'lexer')
+
+    def __init__(self, tipo, start, end, lineno, buf, accion, valor=None):
+        self.type = tipo
+        self.start = start
+        self.end = end
+        self.lineno = lineno
+        self.buf = buf
+        self.accion = accion
+        self._valor = valor
+
+    @property
+    def lexpos(self):
+        return self.start
+
+    @property
+    def value(self):
+        if self._valor is None:
+            if self.accion == lexer_rapido.STRING:
+                self._valor = self.buf[self.start + 1:self.end - 1].decode('utf-8')
+            elif self.accion == lexer_rapido.INTEGER:
+                self._valor = int(self.buf[self.start:self.end])
+            else:
+                self._valor = self.buf[self.start:self.end].decode('utf-8')
+        return self._valor
+
+    def __str__(self):
+        return 'LexToken(%s,%r,%d,%d)' % (self.type, self.value, self.lineno, self.start)
+
+    def __repr__(self):
+        return str(self)
+
+
+class BytesLexer(object):
+
+    def __init__(self, lexer=None):
+        base = lexer or FastLexer()
+        self.spec = base
+        self.master = re.compile(base.master.pattern.encode('utf-8'), re.VERBOSE)
+        self.acciones = base.acciones
+        self.ignore = base.ignore.encode('utf-8')
+        self.lextokens = base.lextokens
+        self.errorf = base.errorf
+
+        # Los literales se reconocen por su primer byte y su longitud, sin
+        # copiar el texto, siempre que esa clave no sea ambigua
+        claves = dict(((t.encode('utf-8')[0], len(t.encode('utf-8'))), tipo)
+                      for t, tipo in base.literales.items())
+        self.literales = claves if len(claves) == len(base.literales) else None
+        self.literales_bytes = dict((t.encode('utf-8'), tipo) for t, tipo in base.literales.items())
+
+        # Solo se copia el texto de un ID cuando su longitud y primer byte
+        # coinciden con los de alguna palabra reservada
+        self.reserved = dict((k.encode('utf-8'), v) for k, v in base.reserved.items())
+        self.candidatos = set((len(k), k[0]) for k in self.reserved)
+
+        self.lexdata = None
+        self.lexpos = 0
+        self.lexlen = 0
+        self.lineno = 1
+        self.inicio_linea = 0
+        self._tokens = None
+
+    def input(self, buf):
+        self.lexdata = buf
+        self.lexpos = 0
+        self.lexlen = len(buf)
+        self._tokens = self.tokens(buf)
+
+    def token(self):
+        return next(self._tokens, None)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._tokens)
+
+    # Avanza n caracteres (no bytes), como espera t_error con skip(1)
+    def skip(self, n):
+        pos = self.lexpos
+        for _ in range(n):
+            pos += 1
+            while pos < self.lexlen and self.lexdata[pos] & 0xC0 == 0x80:
+                pos += 1
+        self.lexpos = pos
+
+    def _error(self, pos):
+        data = self.lexdata
+        while pos < self.lexlen and data[pos] in self.ignore:
+            pos += 1
+        if pos >= self.lexlen:
+            self.lexpos = pos + 1
+            return None
+        texto = bytes(data[pos:pos + 64]).decode('utf-8', 'replace')
+        if self.errorf is None:
+            self.lexpos = pos
+            raise LexError("Illegal character '%s' at index %d" % (texto[0], pos), texto)
+        tok = LexToken()
+        tok.value = texto
+        tok.lineno = self.lineno
+        tok.type = 'error'
+        tok.lexer = self
+        tok.lexpos = pos
+        self.lexpos = pos
+        newtok = self.errorf(tok)
+        if self.lexpos == pos:
+            raise LexError("Scanning error. Illegal character '%s'" % (texto[0]), texto)
+        return newtok
+
+    # Las reglas función que no tienen acción en línea reciben un LexToken con
+    # el texto decodificado, como en PLY
+    def _llamar(self, m, regla):
+        i = m.lastindex
+        tok = LexToken()
+        tok.value = m.group(i).decode('utf-8')
+        tok.lineno = self.lineno
+        tok.lexpos = m.start(i)
+        tok.type = regla.__name__[2:]
+        tok.lexer = self
+        self.lexmatch = m
+        self.lexpos = m.end()
+        newtok = regla(tok)
+        if newtok and newtok.type not in self.lextokens:
+            raise LexError("%s:%d: Rule '%s' returned an unknown token type '%s'" % (
+                regla.__code__.co_filename, regla.__code__.co_firstlineno,
+                regla.__name__, newtok.type), '')
+        return newtok
+
+    def tokens(self, buf):
+        self.lexdata = buf
+        self.lexlen = len(buf)
+        acciones = self.acciones
+        literales = self.literales
+        literales_bytes = self.literales_bytes
+        reserved = self.reserved
+        candidatos = self.candidatos
+        lextokens = self.lextokens
+        LITERAL = lexer_rapido.LITERAL
+        ID = lexer_rapido.ID
+        NEWLINE = lexer_rapido.NEWLINE
+        DESCARTAR = lexer_rapido.DESCARTAR
+        FUNCION = lexer_rapido.FUNCION
+        pos = 0
+        lineno = self.lineno
+        while True:
+            m = None
+            for m in iter(self.master.scanner(buf, pos).match, None):
+                i = m.lastindex
+                accion, tipo, regla = acciones[i]
+                start, end = m.span(i)
+                if accion == LITERAL:
+                    if literales is not None:
+                        tipo = literales[buf[start], end - start]
+                    else:
+                        tipo = literales_bytes[m.group(i)]
+                    tok = SpanToken(tipo, start, end, lineno, buf, accion)
+                elif accion == ID:
+                    if (end - start, buf[start]) in candidatos:
+                        tipo = reserved.get(m.group(i), 'ID')
+                        if tipo not in lextokens:
+                            f = self.spec.module.t_ID
+                            raise LexError("%s:%d: Rule '%s' returned an unknown token type '%s'" % (
+                                f.__code__.co_filename, f.__code__.co_firstlineno, f.__name__, tipo), '')
+                    else:
+                        tipo = 'ID'
+                    tok = SpanToken(tipo, start, end, lineno, buf, accion)
+                elif accion == NEWLINE:
+                    lineno += end - start
+                    self.inicio_linea = end
+                    continue
+                elif accion == DESCARTAR:
+                    continue
+                elif accion == FUNCION:
+                    self.lineno = lineno
+                    tok = self._llamar(m, regla)
+                    lineno = self.lineno
+                    if tok:
+                        yield tok
+                    pos = self.lexpos
+                    break
+                else:
+                    tok = SpanToken(tipo, start, end, lineno, buf, accion)
+                self.lexpos = end
+                yield tok
+            else:
+                if m is not None:
+                    pos = m.end()
+                self.lineno = lineno
+                tok = self._error(pos)
+                if tok:
+                    yield tok
+                if self.lexpos > self.lexlen:
+                    return
+                pos = self.lexpos
+                lineno = self.lineno
+
+
+# Lexer sobre un archivo mapeado en memoria. Los tokens apuntan al mmap, así
+# que su value debe leerse antes de cerrar el archivo.
+class MmapLexer(BytesLexer):
+
+    def __init__(self, filename, lexer=None):
+        BytesLexer.__init__(self, lexer)
+        self.file = open(filename, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap no admite archivos vacíos
+            self.map = b''
+        self.input(self.map)
+
+    def close(self):
+        # El escáner del generador mantiene exportado el buffer del mmap
+        if self._tokens is not None:
+            self._tokens.close()
+        self._tokens = self.lexdata = self.lexmatch = None
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
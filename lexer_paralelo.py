@@ -0,0 +1,153 @@
+from array import array
+
+import ll_2
+import memoria_compartida
+import tokens_compactos
+import trozos
+from lexer_rapido import FastLexer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Lexer en paralelo para un archivo grande, cuando solo hacen falta los
+# tokens (métricas, indexado): el resultado es el TokenBuffer de
+# tokens_compactos.tokenize(data, indentar=True), con NEWLINE, INDENT y
+# DEDENT, los errores de indentación en errores y las mismas posiciones.
+#
+# El texto se corta en líneas de nivel cero (trozos.LINEAS_NIVEL_CERO): una
+# línea fuera de cadenas y paréntesis cuyo primer token empieza en la columna
+# 0 con una letra o un dígito. En su inicio el lexer no arrastra nada (los
+# tokens no cruzan líneas salvo STRING) y su primer token hace que la etapa
+# de indentación cierre todos los bloques abiertos y vuelva a la pila [0].
+# Cada trozo se analiza en un proceso desde la pila [0] y con los números de
+# línea del archivo, y las posiciones se desplazan a las del archivo.
+#
+# Costura: en la secuencia, los DEDENT que cierran los bloques antes de una
+# línea de nivel cero llevan la línea y la posición del primer token de esa
+# línea; en un trozo, son los del final de la entrada y llevan las del último
+# token. Al unir, los DEDENT del final de cada trozo reciben la línea y la
+# posición del primer token del trozo siguiente. El NEWLINE anterior es
+# igual en los dos casos, y el primer token de un trozo no produce ni NEWLINE
+# ni INDENT. Los valores de cada trozo se traducen a la tabla común.
+#
+# Los errores léxicos, que t_error imprime, se guardan en los procesos y se
+# imprimen aquí en el orden del archivo.
+#
+# Los procesos devuelven los tokens en un bloque de memoria compartida (ver
+# memoria_compartida.py), no por pickle: aquí se leen las columnas del bloque
+# y se copian una vez, al unirlas, en las del resultado.
+
+TROZOS_POR_PROCESO = 4
+
+_lexer = None
+
+
+def _iniciar():
+    global _lexer
+    if _lexer is None:
+        _lexer = FastLexer()
+
+
+# Suma desplazamiento a todos los elementos de una columna
+def _desplazar(columna, desplazamiento):
+    if not desplazamiento:
+        return columna
+    if numpy is not None:
+        return array(columna.typecode, (numpy.frombuffer(columna, dtype=columna.typecode) + desplazamiento).tobytes())
+    return array(columna.typecode, [x + desplazamiento for x in columna])
+
+
+def _lexear_trozo(trozo):
+    inicio, linea, texto = trozo
+    _iniciar()
+    mensajes = []
+
+    def error_lexico(t):
+        mensajes.append(ll_2._mensaje_lexico(t))
+        t.lexer.skip(1)
+
+    lexer = _lexer.clone()
+    lexer.lineno = linea
+    lexer.errorf = error_lexico
+    buf = tokens_compactos.tokenize(texto, lexer, indentar=True)
+    buf.inicios = _desplazar(buf.inicios, inicio)
+    buf.fines = _desplazar(buf.fines, inicio)
+    if memoria_compartida.DISPONIBLE:
+        return memoria_compartida.exportar_tokens(buf), mensajes
+    return buf, mensajes
+
+
+def crear_pool(procesos=None):
+    import multiprocessing
+    import lotes
+    if memoria_compartida.DISPONIBLE:
+        memoria_compartida.preparar()
+    return multiprocessing.Pool(procesos or lotes.procesos_disponibles(), _iniciar)
+
+
+# Traduce los índices de una columna (array o memoryview) con mapa (una lista)
+def _traducir(columna, mapa):
+    tipo = getattr(columna, 'typecode', None) or columna.format
+    if numpy is not None:
+        indices = numpy.frombuffer(columna, dtype=tipo)
+        return array(tipo, numpy.asarray(mapa, dtype=tipo)[indices].tobytes())
+    return array(tipo, map(mapa.__getitem__, columna))
+
+
+# Añade al final de columna (un array) los elementos de otra (un array o una
+# memoryview del mismo tipo), como bytes
+def _extender(columna, otra):
+    columna.frombytes(memoryview(otra).cast('B'))
+
+
+# Añade el buffer de un trozo al final de buf
+def _unir(buf, parte):
+    DEDENT = buf.codigo('DEDENT')
+    if len(buf) and len(parte):
+        # DEDENT del final del trozo anterior: con la línea y la posición del
+        # primer token de este
+        i = len(buf) - 1
+        while i >= 0 and buf.tipos[i] == DEDENT:
+            buf.inicios[i] = buf.fines[i] = parte.inicios[0]
+            buf.lineas[i] = parte.lineas[0]
+            i -= 1
+    if parte.nombres == buf.nombres:
+        _extender(buf.tipos, parte.tipos)
+    else:
+        _extender(buf.tipos, _traducir(parte.tipos, [buf.codigo(n) for n in parte.nombres]))
+    _extender(buf.inicios, parte.inicios)
+    _extender(buf.fines, parte.fines)
+    _extender(buf.lineas, parte.lineas)
+    _extender(buf.valores, _traducir(parte.valores, [buf.interno(v) for v in parte.tabla]))
+    buf.errores.extend(parte.errores)
+
+
+# Como tokens_compactos.tokenize(data, indentar=True), con los trozos en
+# procesos procesos (por defecto, todos los disponibles). pool: uno de
+# crear_pool() ya arrancado, para no pagar su creación en cada llamada (con
+# procesos igual a los suyos)
+def tokenize(data, procesos=None, pool=None):
+    import lotes
+    procesos = procesos or lotes.procesos_disponibles()
+    partes = trozos.trocear(data, procesos * TROZOS_POR_PROCESO, trozos.LINEAS_NIVEL_CERO)
+    if len(partes) == 1 or procesos == 1:
+        return tokens_compactos.tokenize(data, indentar=True)
+    propio = pool is None
+    if propio:
+        pool = crear_pool(procesos)
+    try:
+        buf = None
+        for parte, mensajes in pool.imap(_lexear_trozo, partes):
+            if isinstance(parte, str):
+                parte = memoria_compartida.abrir_tokens(parte)
+            if buf is None:
+                buf = tokens_compactos.TokenBuffer(parte.nombres)
+            _unir(buf, parte)
+            for mensaje in mensajes:
+                print(mensaje)
+        return buf
+    finally:
+        if propio:
+            pool.terminate()
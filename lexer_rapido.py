@@ -0,0 +1,327 @@
+import re
+
+from ply.lex import LexToken, LexError
+
+# Lexer alternativo a lex.lex(): compila las mismas reglas t_* de ll_2.py en
+# una sola expresión regular maestra y resuelve las acciones de t_ID, t_INTEGER,
+# t_STRING, t_newline y t_COMMENT dentro del propio bucle de escaneo, sin
+# llamar a una función Python por token. Produce exactamente el mismo flujo de
+# tokens (type, value, lineno, lexpos) que el lexer de PLY.
+
+# Acciones que se ejecutan en línea
+TOKEN = 0      # Regla definida como string: el token se devuelve tal cual
+ID = 1         # t_ID: clasificación de palabras reservadas
+INTEGER = 2    # t_INTEGER: conversión a int
+STRING = 3     # t_STRING: se quitan las comillas
+NEWLINE = 4    # t_newline: cuenta líneas, guarda inicio_linea y se descarta
+DESCARTAR = 5  # t_COMMENT: se descarta
+FUNCION = 6    # Cualquier otra regla función: se llama como lo haría PLY
+LITERAL = 7    # Grupo común de todas las reglas string literales
+
+_ACCIONES = {
+    't_ID': ID,
+    't_INTEGER': INTEGER,
+    't_STRING': STRING,
+    't_newline': NEWLINE,
+    't_COMMENT': DESCARTAR,
+}
+
+
+# Reglas en el mismo orden que usa PLY para su expresión maestra: primero las
+# funciones por número de línea y después los strings por longitud decreciente
+def reglas(ldict):
+    funciones = []
+    cadenas = []
+    for nombre in sorted(ldict):
+        if nombre[:2] != 't_' or nombre in ('t_error', 't_ignore', 't_eof'):
+            continue
+        regla = ldict[nombre]
+        if callable(regla):
+            funciones.append((nombre, regla))
+        elif isinstance(regla, str):
+            cadenas.append((nombre, regla))
+    funciones.sort(key=lambda x: x[1].__code__.co_firstlineno)
+    cadenas.sort(key=lambda x: len(x[1]), reverse=True)
+    return funciones, cadenas
+
+
+# Devuelve el texto fijo que reconoce un patrón sin metacaracteres (por
+# ejemplo r'\|\|' -> '||') o None si el patrón no es un literal
+def literal(patron):
+    texto = []
+    i = 0
+    while i < len(patron):
+        c = patron[i]
+        if c == '\\':
+            if i + 1 == len(patron) or patron[i + 1].isalnum():
+                return None
+            texto.append(patron[i + 1])
+            i += 2
+        elif c in '.^$*+?{}[]|()' or c.isspace():
+            return None
+        else:
+            texto.append(c)
+            i += 1
+    return ''.join(texto) or None
+
+
+# Si todas las reglas string son literales y el orden de PLY siempre prueba un
+# literal antes que sus prefijos, se pueden reconocer todas con un único grupo
+# (más largos primero) y obtener el tipo con un diccionario
+def agrupar_literales(cadenas):
+    literales = [(literal(patron), nombre) for nombre, patron in cadenas]
+    if not literales or any(texto is None for texto, _ in literales):
+        return None
+    for i, (a, _) in enumerate(literales):
+        for b, _ in literales[:i]:
+            if a.startswith(b):
+                return None
+    largos = sorted((t for t, _ in literales if len(t) > 1), key=len, reverse=True)
+    cortos = [t for t, _ in literales if len(t) == 1]
+    partes = [re.escape(t) for t in largos]
+    if cortos:
+        partes.append('[%s]' % ''.join(re.escape(t) for t in cortos))
+    return '|'.join(partes), dict((t, nombre[2:]) for t, nombre in literales)
+
+
+class FastLexer(object):
+
+    def __init__(self, module=None):
+        if module is None:
+            import ll_2 as module
+        ldict = dict((k, getattr(module, k)) for k in dir(module))
+        self.module = module
+        self.lextokens = frozenset(ldict['tokens'])
+        self.reserved = ldict.get('reserved', {})
+        self.ignore = ldict.get('t_ignore', '')
+        self.errorf = ldict.get('t_error')
+
+        funciones, cadenas = reglas(ldict)
+        agrupadas = agrupar_literales(cadenas)
+        self.literales = {}
+        if agrupadas:
+            patron_literales, self.literales = agrupadas
+            cadenas = []
+        partes = []
+        self.acciones = [None]
+        for nombre, regla in funciones + cadenas:
+            if callable(regla):
+                patron = getattr(regla, 'regex', regla.__doc__)
+                accion = _ACCIONES.get(nombre, FUNCION)
+            else:
+                patron = regla
+                accion = TOKEN
+            partes.append('(?P<%s>%s)' % (nombre, patron))
+            grupo = len(self.acciones)
+            self.acciones.append((accion, nombre[2:], regla))
+            # Los grupos internos de cada regla desplazan los índices
+            for _ in range(re.compile(patron).groups):
+                self.acciones.append(None)
+            assert self.acciones[grupo][1] == nombre[2:]
+        if agrupadas:
+            partes.append('(?P<literal>%s)' % patron_literales)
+            self.acciones.append((LITERAL, None, None))
+
+        self.patrones = partes
+        ignorar = '[%s]*' % re.escape(self.ignore) if self.ignore else ''
+        self.master = re.compile('%s(?:%s)' % (ignorar, '|'.join(partes)), re.VERBOSE)
+        self.lexdata = None
+        self.lexpos = 0
+        self.lexlen = 0
+        self.lineno = 1
+        self.inicio_linea = 0
+
+    def clone(self):
+        c = object.__new__(FastLexer)
+        c.__dict__.update(self.__dict__)
+        return c
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        self.lexlen = len(data)
+
+    def skip(self, n):
+        self.lexpos += n
+
+    # Salta los caracteres ignorados; devuelve la posición del error o None si
+    # solo quedaba espacio en blanco
+    def _error(self, pos):
+        data = self.lexdata
+        while pos < self.lexlen and data[pos] in self.ignore:
+            pos += 1
+        if pos >= self.lexlen:
+            self.lexpos = pos + 1
+            return None
+        if self.errorf is None:
+            self.lexpos = pos
+            raise LexError("Illegal character '%s' at index %d" % (data[pos], pos), data[pos:])
+        tok = LexToken()
+        tok.value = data[pos:]
+        tok.lineno = self.lineno
+        tok.type = 'error'
+        tok.lexer = self
+        tok.lexpos = pos
+        self.lexpos = pos
+        newtok = self.errorf(tok)
+        if self.lexpos == pos:
+            raise LexError("Scanning error. Illegal character '%s'" % (data[pos]), data[pos:])
+        return newtok
+
+    def _llamar(self, m, regla, pos):
+        tok = LexToken()
+        tok.value = m.group(m.lastindex)
+        tok.lineno = self.lineno
+        tok.lexpos = pos
+        tok.type = regla.__name__[2:]
+        tok.lexer = self
+        self.lexmatch = m
+        self.lexpos = m.end()
+        newtok = regla(tok)
+        if newtok and newtok.type not in self.lextokens:
+            raise LexError("%s:%d: Rule '%s' returned an unknown token type '%s'" % (
+                regla.__code__.co_filename, regla.__code__.co_firstlineno,
+                regla.__name__, newtok.type), self.lexdata[self.lexpos:])
+        return newtok
+
+    def _id_invalido(self, pos, tipo):
+        f = self.module.t_ID
+        raise LexError("%s:%d: Rule '%s' returned an unknown token type '%s'" % (
+            f.__code__.co_filename, f.__code__.co_firstlineno, f.__name__, tipo),
+            self.lexdata[pos:])
+
+    # Convierte una coincidencia de la expresión maestra en un token, o None si
+    # la regla descarta el texto. Actualiza lexpos y lineno como lo haría PLY.
+    def emitir(self, m):
+        i = m.lastindex
+        accion, tipo, regla = self.acciones[i]
+        self.lexpos = m.end()
+        if accion == NEWLINE:
+            self.lineno += self.lexpos - m.start(i)
+            self.inicio_linea = self.lexpos
+            return None
+        if accion == DESCARTAR:
+            return None
+        if accion == FUNCION:
+            return self._llamar(m, regla, m.start(i))
+        tok = LexToken()
+        tok.lineno = self.lineno
+        tok.lexpos = m.start(i)
+        if accion == LITERAL:
+            tok.value = valor = m.group(i)
+            tok.type = self.literales[valor]
+        elif accion == ID:
+            tok.value = valor = m.group(i)
+            tipo = self.reserved.get(valor, 'ID')
+            if tipo not in self.lextokens:
+                self._id_invalido(self.lexpos, tipo)
+            tok.type = tipo
+        elif accion == INTEGER:
+            tok.type = tipo
+            tok.value = int(m.group(i))
+        elif accion == STRING:
+            tok.type = tipo
+            tok.value = m.group(i)[1:-1]
+        else:
+            tok.type = tipo
+            tok.value = m.group(i)
+        return tok
+
+    def token(self):
+        data = self.lexdata
+        match = self.master.match
+        while True:
+            m = match(data, self.lexpos)
+            if m is None:
+                if data is None:
+                    raise RuntimeError('No input string given with input()')
+                tok = self._error(self.lexpos)
+                if tok:
+                    return tok
+                if self.lexpos > self.lexlen:
+                    return None
+                continue
+            tok = self.emitir(m)
+            if tok:
+                return tok
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t = self.token()
+        if t is None:
+            raise StopIteration
+        return t
+
+    # Recorrido completo sin la llamada a token() por cada token: es el camino
+    # más rápido cuando se quiere toda la lista de tokens
+    def tokens(self, data):
+        self.input(data)
+        acciones = self.acciones
+        reserved_get = self.reserved.get
+        lextokens = self.lextokens
+        literales = self.literales
+        pos = 0
+        lineno = self.lineno
+        while True:
+            m = None
+            for m in iter(self.master.scanner(data, pos).match, None):
+                i = m.lastindex
+                accion, tipo, regla = acciones[i]
+                if accion == LITERAL:
+                    tok = LexToken()
+                    tok.value = valor = m.group(i)
+                    tok.type = literales[valor]
+                elif accion == ID:
+                    tok = LexToken()
+                    tok.value = valor = m.group(i)
+                    tipo = reserved_get(valor, 'ID')
+                    if tipo not in lextokens:
+                        self._id_invalido(m.end(), tipo)
+                    tok.type = tipo
+                elif accion == NEWLINE:
+                    lineno += m.end() - m.start(i)
+                    continue
+                elif accion == INTEGER:
+                    tok = LexToken()
+                    tok.type = tipo
+                    tok.value = int(m.group(i))
+                elif accion == STRING:
+                    tok = LexToken()
+                    tok.type = tipo
+                    tok.value = m.group(i)[1:-1]
+                elif accion == DESCARTAR:
+                    continue
+                elif accion == TOKEN:
+                    tok = LexToken()
+                    tok.type = tipo
+                    tok.value = m.group(i)
+                else:
+                    # Una regla función puede mover lexpos: se reinicia el escáner
+                    self.lineno = lineno
+                    tok = self._llamar(m, regla, m.start(i))
+                    lineno = self.lineno
+                    if tok:
+                        yield tok
+                    pos = self.lexpos
+                    break
+                tok.lineno = lineno
+                tok.lexpos = m.start(i)
+                yield tok
+            else:
+                # El escáner se detuvo: error léxico o fin de la entrada
+                if m is not None:
+                    pos = m.end()
+                self.lineno = lineno
+                tok = self._error(pos)
+                if tok:
+                    yield tok
+                if self.lexpos > self.lexlen:
+                    return
+                pos = self.lexpos
+                lineno = self.lineno
+
+
+def lex(module=None):
+    return FastLexer(module)
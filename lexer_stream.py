@@ -0,0 +1,119 @@
+import codecs
+
+from lexer_rapido import FastLexer
+
+# Lexer por trozos para entradas que no caben en memoria (tuberías, archivos
+# de varios GB). Lee de cualquier objeto con read() en trozos de tamaño fijo y
+# solo analiza hasta el último salto de línea leído: el resto de la línea se
+# guarda para el siguiente trozo, de modo que un '->', '<=' o '==' partido entre
+# dos trozos, o un '\n' seguido de su indentación, se analizan siempre juntos.
+# Un STRING abierto al final del texto disponible también se guarda, porque el
+# patrón de t_STRING admite saltos de línea dentro de la cadena.
+
+TAMANO = 1 << 16
+
+# Caracteres que abren un token capaz de cruzar un salto de línea
+_COMILLAS = '"'
+
+
+class StreamLexer(object):
+
+    # limite: máximo de caracteres que se guardan esperando el cierre de un
+    # STRING. Pasado ese tamaño la comilla se trata como error léxico, igual
+    # que haría PLY con una cadena sin cerrar, y la memoria sigue acotada.
+    def __init__(self, lexer=None, tamano=TAMANO, limite=None):
+        self.lexer = (lexer or FastLexer()).clone()
+        self.tamano = tamano
+        self.limite = limite or 64 * tamano
+        self.base = 0
+        self._tokens = None
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno
+
+    # Posición absoluta en la entrada, como lexer.lexpos en PLY
+    @property
+    def lexpos(self):
+        return self.base + self.lexer.lexpos
+
+    @property
+    def inicio_linea(self):
+        return self.base + self.lexer.inicio_linea
+
+    # Interfaz de PLY para pasar el lexer a parser.parse(lexer=...)
+    def input(self, fuente):
+        self._tokens = self.tokens(fuente)
+
+    def token(self):
+        return next(self._tokens, None)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._tokens)
+
+    def tokens(self, fuente):
+        leer = fuente.read
+        decodificar = None
+        pendiente = ''
+        self.base = 0
+        self.lexer.inicio_linea = 0
+        final = False
+        while not final:
+            trozo = leer(self.tamano)
+            final = not trozo
+            if isinstance(trozo, bytes):
+                if decodificar is None:
+                    decodificar = codecs.getincrementaldecoder('utf-8')().decode
+                trozo = decodificar(trozo, final)
+            pendiente += trozo
+            if final:
+                fin = len(pendiente)
+            else:
+                fin = pendiente.rfind('\n')
+                if fin < 0:
+                    continue
+            consumido = yield from self._escanear(pendiente, fin, final, self.base)
+            self.base += consumido
+            self.lexer.inicio_linea -= consumido
+            pendiente = pendiente[consumido:]
+
+    # Analiza data hasta fin (exclusivo, salvo en el último trozo) y devuelve
+    # cuántos caracteres se consumieron; el resto vuelve a analizarse junto con
+    # el siguiente trozo
+    def _escanear(self, data, fin, final, base):
+        lexer = self.lexer
+        lexer.input(data)
+        match = lexer.master.match
+        ignore = lexer.ignore
+        n = len(data)
+        pos = 0
+        while True:
+            m = match(data, pos)
+            if m is None:
+                p = pos
+                while p < n and data[p] in ignore:
+                    p += 1
+                if p >= n:
+                    return n if final else pos
+                if not final:
+                    if p >= fin:
+                        return pos
+                    if data[p] in _COMILLAS and n - p <= self.limite:
+                        return p
+                tok = lexer._error(p)
+                pos = lexer.lexpos
+            else:
+                if not final and m.end() > fin:
+                    return pos
+                tok = lexer.emitir(m)
+                pos = lexer.lexpos
+            if tok:
+                tok.lexpos += base
+                yield tok
+
+
+def tokens(fuente, tamano=TAMANO, lexer=None):
+    return StreamLexer(lexer, tamano).tokens(fuente)
@@ -1,5 +1,9 @@
 import ply.yacc as yacc
 
+import expresiones
+import gramaticas
+import predictivo
+
 # Definición de los tokens (omitidos en esta versión sin lexer)
 # Definimos los tokens
 tokens = [
@@ -106,77 +110,10 @@ def t_STRING(t):
     t.value = t.value[1:-1]
     return t
 
-# Conjunto de siguientes para cada NT (símbolo no terminal)
-# Aquí debes completar los conjuntos de siguientes correspondientes a cada NT de acuerdo a la gramática
-# Conjuntos de primeros
-primeros = {
-    'Program': {'def', 'ε'},
-    'DefList': {'def', 'ε'},
-    'Def': {'def'},
-    'TypedVar': {'ID'},
-    'Type': {'int', 'str', '['},
-    'TypedVarList': {'ID', 'ε'},
-    'TypedVarListTail': {',', 'ε'},
-    'Return': {'->', 'ε'},
-    'Block': {'NEWLINE'},
-    'StatementList': {'SimpleStatement', 'if', 'while', 'for', 'ε'},
-    'Statement': {'SimpleStatement', 'if', 'while', 'for'},
-    'ElifList': {'elif', 'ε'},
-    'Elif': {'elif'},
-    'Else': {'else', 'ε'},
-    'SimpleStatement': {'Expr', 'pass', 'return'},
-    'SSTail': {'=', 'ε'},
-    'ReturnExpr': {'Expr', 'ε'},
-    'Expr': {'orExpr'},
-    'ExprPrime': {'if', 'ε'},
-    'orExpr': {'andExpr'},
-    'orExprPrime': {'or', 'ε'},
-    'andExpr': {'notExpr'},
-    'andExprPrime': {'and', 'ε'},
-    'notExpr': {'CompExpr'},
-    'notExprPrime': {'not', 'ε'},
-    'CompExpr': {'IntExpr'},
-    'CompExprPrime': {'CompOp', 'ε'},
-    'IntExpr': {'Term', '-'},
-    'IntExprPrime': {'+', '-', 'ε'},
-    'Term': {'Factor', '-'},
-    'TermPrime': {'*', '//', '%', 'ε'},
-    'Factor': {'-', 'ID', 'None', 'True', 'False', 'INTEGER', 'STRING', '[', '('},
-    'Name': {'ID'},
-    'NameTail': {'ε', '(', '['},
-    'Literal': {'None', 'True', 'False', 'INTEGER', 'STRING'},
-    'List': {'['},
-    'ExprList': {'Expr', 'ε'},
-    'ExprListTail': {',', 'ε'},
-    'CompOp': {'==', '!=', '<', '>', '<=', '>=', 'is'}
-}
-
-# Conjuntos de siguientes
-siguientes = {
-    'Program': {'$'},
-    'DefList': {'SimpleStatement', 'if', 'while', 'for', 'Elif', 'else', 'NEWLINE', 'DEDENT'},
-    'Def': {'def', 'SimpleStatement', 'if', 'while', 'for', 'Elif', 'else', 'NEWLINE', 'DEDENT'},
-    'TypedVar': {'ID'},
-    'Type': {':'},
-    'TypedVarList': {')'},
-    'TypedVarListTail': {')'},
-    'Return': {':'},
-    'Block': {'NEWLINE', 'DEDENT'},
-    'StatementList': {'NEWLINE', 'DEDENT'},
-    'Statement': {'NEWLINE', 'DEDENT'},
-    'ElifList': {'else', 'NEWLINE', 'DEDENT'},
-    'Elif': {'elif', 'else', 'NEWLINE', 'DEDENT'},
-    'Else': {'else', 'NEWLINE', 'DEDENT'},
-    'SimpleStatement': {'NEWLINE'},
-    'SSTail': {'=', 'NEWLINE'},
-    'ReturnExpr': {'NEWLINE'},
-    'Expr': {':', 'NEWLINE'},
-}
-
 #NO TIENE PUNTOS!
 gramatica = {
-    'Program': {'$'},
-    'DefList': {'Def', 'ε'},
+    'Program': {'DefList'},
+    'DefList': {'Def DefList', 'ε'},
     'Def': {'def ID ( TypedVarList ) Return : Block'},
     'TypedVar': {'ID : Type'},
     'Type': {'int', 'str', '[ Type ]'},
@@ -216,6 +153,12 @@ gramatica = {
     'CompOp': {'==', '!=', '<', '>', '<=', '>=', 'is'}
 }
 
+# Conjuntos de primeros y siguientes de cada NT (símbolo no terminal),
+# calculados a partir de la gramática (ver gramaticas.py)
+grammar = gramaticas.Grammar(gramatica)
+primeros = grammar.primeros()
+siguientes = grammar.siguientes()
+
 # Reglas de producción...
 def extract_grammar_rules(grammar):
     rules = {}
@@ -244,13 +187,55 @@ def gettoken():
     else:
         return '$'  # Fin de entrada   
 
+# Terminal de la gramática para un token del lexer de ll_2.py: los tokens con
+# valor propio (números, cadenas, nombres y los de indentación) por su tipo y
+# el resto por su texto ('def', '(', '==', ...). int y str son nombres para
+# el lexer pero terminales para la gramática
+def terminal(tok):
+    if tok.type in ('INTEGER', 'STRING', 'NEWLINE', 'INDENT', 'DEDENT'):
+        return tok.type
+    if tok.type == 'ID' and tok.value not in ('int', 'str'):
+        return 'ID'
+    return tok.value
+
+# Operadores de las expresiones, de menor a mayor precedencia: los mismos
+# niveles que la cadena orExpr ... TermPrime de la gramática, más el menos
+# unario de Factor y el condicional de ExprPrime (ver expresiones.py)
+operadores = expresiones.Operadores(
+    [('or',), ('and',), ('not',), ('==', '!=', '<', '>', '<=', '>=', 'is'), ('+', '-'), ('*', '//', '%')],
+    prefijos=('-',), condicional=('if', 'else', 'and'))
+
+# Parser predictivo LL(1) con la tabla de la gramática (ver predictivo.py).
+# Las expresiones no se expanden con la tabla: Expr se analiza por escalada
+# de precedencia con la tabla de operadores
+parser = predictivo.LL1Parser(grammar, terminal, {'Expr': expresiones.Expresiones(operadores, grammar.indice)})
+
+# Analiza el código con el lexer de ll_2.py; devuelve True o la lista de errores
 def parse(input_code):
-   # parser = yacc.yacc()
-    result = parser.parse(input_code)
-    return result
+    import ll_2
+    errores = []
+    lexer = ll_2.indent_lexer(errores=errores)
+    lexer.input(input_code)
+    return parser.parse(lexer, errores)
 
-# Prueba del parser con una cadena de entrada
-data = '''
+# Parser descendente recursivo generado a partir de la gramática (ver
+# descendente.py), construido en el primer uso
+parser_descendente = None
+
+def parse_descendente(input_code):
+    import descendente
+    import ll_2
+    global parser_descendente
+    if parser_descendente is None:
+        parser_descendente = descendente.RDParser(grammar, terminal)
+    errores = []
+    lexer = ll_2.indent_lexer(errores=errores)
+    lexer.input(input_code)
+    return parser_descendente.parse(lexer, errores)
+
+if __name__ == '__main__':
+    # Prueba del parser con una cadena de entrada
+    data = '''
 def my_func(x: int) -> int:
     if x > 0:
         return x
@@ -259,20 +244,18 @@ def my_func(x: int) -> int:
     else:
         return 0
 '''
-tokens_errors = []  # Lista para almacenar errores léxicos
-scanner.initialize(data)  # Inicializa el scanner con el código de entrada
-result = parser.parse()  # Parser sin argumentos
-result = parse(data)
+    tokens_errors = []  # Lista para almacenar errores léxicos
+    result = parse(data)
 
-if isinstance(result, list):
-    # Se encontraron errores sintácticos
-    print("El código de entrada contiene errores sintácticos:")
-    for error in result:
-        print(error)
-elif tokens_errors:
-    # Se encontraron errores léxicos
-    print("El código de entrada contiene errores léxicos:")
-    for error in tokens_errors:
-        print(error)
-else:
-    print("El código de entrada pertenece al lenguaje")
\ No newline at end of file
+    if isinstance(result, list):
+        # Se encontraron errores sintácticos
+        print("El código de entrada contiene errores sintácticos:")
+        for error in result:
+            print(error)
+    elif tokens_errors:
+        # Se encontraron errores léxicos
+        print("El código de entrada contiene errores léxicos:")
+        for error in tokens_errors:
+            print(error)
+    else:
+        print("El código de entrada pertenece al lenguaje")
\ No newline at end of file
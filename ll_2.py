@@ -1,402 +1,822 @@
-import ply.lex as lex
-import ply.yacc as yacc
-
-# Definición de los tokens (omitidos en esta versión sin lexer)
-# Definimos los tokens
-tokens = [
-    # Indicar el inicio y el final de un bloque en Python
-    'INDENT',
-    'DEDENT',
-    # Palabras reservadas
-    'CLASS', 'DEF', 'IF', 'ELSE', 'WHILE', 'FOR', 'IN', 'RETURN',
-    'BREAK', 'CONTINUE', 'NEW', 'TRUE', 'FALSE',
-    # Identificadores y literales
-    'ID', 'INTEGER', 'STRING',
-    # Operadores y puntuación
-    'PLUS', 'MINUS', 'TIMES', 'DIVIDE', 'MODULO',
-    'LESS_THAN', 'LESS_THAN_EQUAL', 'GREATER_THAN',
-    'GREATER_THAN_EQUAL', 'EQUALS', 'NOT_EQUALS', 'ASSIGN',
-    'LPAREN', 'RPAREN', 'LBRACKET', 'RBRACKET', 'LBRACE', 'RBRACE',
-    'COMMA', 'COLON', 'DOT', 'SEMICOLON', 'ARROW',
-    'AND', 'OR', 'NOT',
-
-    'INT',
-    'STR',
-    'NEWLINE',
-    'ELIF',
-    'PASS',
-    'NONE',
-    'IS'
-]
-
-# Expresiones regulares para cada token
-t_PLUS = r'\+'
-t_MINUS = r'-'
-t_TIMES = r'\*'
-t_DIVIDE = r'/'
-t_MODULO = r'%'
-t_LESS_THAN = r'<'
-t_LESS_THAN_EQUAL = r'<='
-t_GREATER_THAN = r'>'
-t_GREATER_THAN_EQUAL = r'>='
-t_EQUALS = r'=='
-t_NOT_EQUALS = r'!='
-t_ASSIGN = r'='
-t_LPAREN = r'\('
-t_RPAREN = r'\)'
-t_LBRACKET = r'\['
-t_RBRACKET = r'\]'
-t_LBRACE = r'{'
-t_RBRACE = r'}'
-t_COMMA = r','
-t_COLON = r':'
-t_DOT = r'\.'
-t_SEMICOLON = r';'
-t_ARROW = r'->'
-t_AND = r'&&'
-t_OR = r'\|\|'
-t_NOT = r'!'
-
-# Ignoramos espacios en blanco y comentarios
-t_ignore = ' \t\r'
-def t_COMMENT(t):
-    r'\#.*'
-    pass
-
-# Palabras reservadas
-reserved = {
-    'False': 'FALSE',
-    'None': 'NONE',
-    'True': 'TRUE',
-    'and': 'AND',
-    'as': 'AS',
-    'assert': 'ASSERT',
-    'async': 'ASYNC',
-    'await': 'AWAIT',
-    'break': 'BREAK',
-    'class': 'CLASS',
-    'continue': 'CONTINUE',
-    'def': 'DEF',
-    'del': 'DEL',
-    'elif': 'ELIF',
-    'else': 'ELSE',
-    'except': 'EXCEPT',
-    'finally': 'FINALLY',
-    'for': 'FOR',
-    'from': 'FROM',
-    'global': 'GLOBAL',
-    'if': 'IF',
-    'import': 'IMPORT',
-    'in': 'IN',
-    'is': 'IS',
-    'lambda': 'LAMBDA',
-    'nonlocal': 'NONLOCAL',
-    'not': 'NOT',
-    'or': 'OR',
-    'pass': 'PASS',
-    'raise': 'RAISE',
-    'return': 'RETURN',
-    'try': 'TRY',
-    'while': 'WHILE',
-    'with': 'WITH',
-    'yield': 'YIELD'
-}
-
-# Identificadores y literales
-def t_ID(t):
-    r'[a-z|A-Z][a-z|A-Z|0-9|_]*'
-    t.type = reserved.get(t.value, 'ID')
-    return t
-
-def t_INTEGER(t):
-    r'\d+'
-    t.value = int(t.value)
-    return t
-
-def t_STRING(t):
-    r'"(?:[^"\\]|\\.)*"'
-    t.value = t.value[1:-1]
-    return t
-
-# Manejo de errores léxicos
-def t_error(t):
-    print(f"Error léxico: Carácter inesperado '{t.value[0]}' en la línea {t.lineno}")
-    t.lexer.skip(1)
-    
-# Manejo de saltos de línea
-def t_newline(t):
-    r'\n+'
-    t.lexer.lineno += len(t.value)
-
-# Expresiones regulares para INDENT y DEDENT
-def t_INDENT(t):
-    r'\n[ \t]+'
-    t.lexer.level = len(t.value) - 1  # Nivel de indentación
-    if t.lexer.level > t.lexer.indent_stack[-1]:
-        t.type = 'INDENT'
-        t.lexer.indent_stack.append(t.lexer.level)
-        return t
-
-def t_DEDENT(t):
-    r'\n[ \t]+'
-    t.lexer.level = len(t.value) - 1  # Nivel de indentación
-    if t.lexer.level < t.lexer.indent_stack[-1]:
-        while t.lexer.level < t.lexer.indent_stack[-1]:
-            t.lexer.indent_stack.pop()
-            t.type = 'DEDENT'
-            return t
-        t.lexer.skip(1)  # Ignorar líneas vacías
-
-
-# Construir el lexer
-lexer = lex.lex()
-
-lexer.indent_stack = [0]  # Pila de niveles de indentación
-
-# Integración con scanner
-def gettoken():
-    token = lexer.token()
-    if token:
-        return token.type
-    else:
-        return None
-
-# Definición de las reglas gramaticales
-def p_Program(p):
-    '''Program : DefList'''
-    p[0] = True
-
-def p_DefList(p):
-    '''DefList : Def DefList
-               | empty'''
-    p[0] = True
-
-def p_Def(p):
-    '''Def : DEF ID LPAREN TypedVarList RPAREN Return COLON Block'''
-    p[0] = True
-
-def p_TypedVar(p):
-    '''TypedVar : ID COLON Type'''
-    p[0] = True
-
-def p_Type(p):
-    '''Type : INT
-            | STR
-            | LBRACKET Type RBRACKET'''
-    p[0] = True
-
-def p_TypedVarList(p):
-    '''TypedVarList : empty
-                    | TypedVar TypedVarListTail'''
-    p[0] = True
-
-def p_TypedVarListTail(p):
-    '''TypedVarListTail : COMMA TypedVar TypedVarListTail
-                        | empty'''
-    p[0] = True
-
-def p_Return(p):
-    '''Return : ARROW Type
-              | empty'''
-    p[0] = True
-
-def p_Block(p):
-    '''Block : NEWLINE INDENT Statement StatementList DEDENT'''
-    p[0] = True
-
-def p_StatementList(p):
-    '''StatementList : Statement StatementList
-                     | empty'''
-    p[0] = True
-
-def p_Statement(p):
-    '''Statement : SimpleStatement NEWLINE
-                 | IF Expr COLON Block ElifList Else
-                 | WHILE Expr COLON Block
-                 | FOR ID IN Expr COLON Block'''
-    p[0] = True
-
-def p_ElifList(p):
-    '''ElifList : Elif ElifList
-                | empty'''
-    p[0] = True
-
-def p_Elif(p):
-    '''Elif : ELIF Expr COLON Block'''
-    p[0] = True
-
-def p_Else(p):
-    '''Else : ELSE COLON Block
-            | empty'''
-    p[0] = True
-
-def p_SimpleStatement(p):
-    '''SimpleStatement : Expr SSTail
-                       | PASS
-                       | RETURN ReturnExpr'''
-    p[0] = True
-
-def p_SSTail(p):
-    '''SSTail : ASSIGN Expr
-              | empty'''
-    p[0] = True
-
-def p_ReturnExpr(p):
-    '''ReturnExpr : Expr
-                  | empty'''
-    p[0] = True
-
-def p_Expr(p):
-    '''Expr : OrExpr'''
-    p[0] = True
-
-def p_OrExpr(p):
-    '''OrExpr : AndExpr OrExprPrime'''
-    p[0] = True
-
-def p_OrExprPrime(p):
-    '''OrExprPrime : OR AndExpr OrExprPrime
-                   | empty'''
-    p[0] = True
-
-def p_AndExpr(p):
-    '''AndExpr : NotExpr AndExprPrime'''
-    p[0] = True
-
-def p_AndExprPrime(p):
-    '''AndExprPrime : AND NotExpr AndExprPrime
-                    | empty'''
-    p[0] = True
-
-def p_NotExpr(p):
-    '''NotExpr : CompExpr NotExprPrime'''
-    p[0] = True
-
-def p_NotExprPrime(p):
-    '''NotExprPrime : NOT CompExpr NotExprPrime
-                    | empty'''
-    p[0] = True
-
-def p_CompExpr(p):
-    '''CompExpr : IntExpr CompExprPrime'''
-    p[0] = True
-
-def p_CompExprPrime(p):
-    '''CompExprPrime : CompOp IntExpr CompExprPrime
-                     | empty'''
-    p[0] = True
-
-def p_IntExpr(p):
-    '''IntExpr : Term IntExprPrime'''
-    p[0] = True
-
-def p_IntExprPrime(p):
-    '''IntExprPrime : PLUS Term IntExprPrime
-                    | MINUS Term IntExprPrime
-                    | empty'''
-    p[0] = True
-
-def p_Term(p):
-    '''Term : Factor TermPrime'''
-    p[0] = True
-
-def p_TermPrime(p):
-    '''TermPrime : TIMES Factor TermPrime
-                 | DIVIDE Factor TermPrime
-                 | MODULO Factor TermPrime
-                 | empty'''
-    p[0] = True
-
-def p_Factor(p):
-    '''Factor : MINUS Factor
-              | Name
-              | Literal
-              | List
-              | LPAREN Expr RPAREN'''
-    p[0] = True
-
-def p_Name(p):
-    '''Name : ID NameTail'''
-    p[0] = True
-
-def p_NameTail(p):
-    '''NameTail : LPAREN ExprList RPAREN
-                | List
-                | empty'''
-    p[0] = True
-
-def p_Literal(p):
-    '''Literal : NONE
-               | TRUE
-               | FALSE
-               | INTEGER
-               | STRING'''
-    p[0] = True
-
-def p_List(p):
-    '''List : LBRACKET ExprList RBRACKET'''
-    p[0] = True
-
-def p_ExprList(p):
-    '''ExprList : empty
-                | Expr ExprListTail'''
-    p[0] = True
-
-def p_ExprListTail(p):
-    '''ExprListTail : empty
-                    | COMMA Expr ExprListTail'''
-    p[0] = True
-
-def p_CompOp(p):
-    '''CompOp : EQUALS
-              | NOT_EQUALS
-              | LESS_THAN
-              | GREATER_THAN
-              | LESS_THAN_EQUAL
-              | GREATER_THAN_EQUAL
-              | IS'''
-    p[0] = True
-
-def p_empty(p):
-    '''empty :'''
-    p[0] = True
-
-
-# Manejo de errores sintácticos
-def p_error(p):
-    global errors
-    if p:
-        errors.append(f"Error de sintaxis: Token inesperado '{p.value}' en la línea {p.lineno}")
-    else:
-        errors.append("Error de sintaxis: Fin inesperado del archivo")
-
-# Construir el parser
-parser = yacc.yacc()
-
-# Función para analizar el código de entrada
-def analyze(code):
-    global errors
-    errors = []
-    lexer.input(code)
-    parser.parse(lexer=lexer, tracking=True)
-    if errors:
-        return errors
-    else:
-        return True
-
-
-# Prueba del parser con una cadena de entrada
-data = '''
-x = 10 + 5 * (3 - 2)
-print("El resultado es:", x)
-'''
-
-# Análisis del código de entrada
-result = analyze(data)
-    
-# Impresión de los errores o éxito del análisis
-if result == True:
-    print("Análisis exitoso. El código de entrada pertenece al lenguaje.")
-else:
-    for error in result:
-        print(error)
+import sys
+
+# Importar este módulo no construye nada: el lexer se construye (o se carga de
+# la caché de tablas, ver tablas.py) la primera vez que se tokeniza y el
+# parser la primera vez que se analiza. Tokenizar no importa ply.yacc.
+
+# Definición de los tokens (omitidos en esta versión sin lexer)
+# Definimos los tokens
+tokens = [
+    # Indicar el inicio y el final de un bloque en Python
+    'INDENT',
+    'DEDENT',
+    # Palabras reservadas
+    'CLASS', 'DEF', 'IF', 'ELSE', 'WHILE', 'FOR', 'IN', 'RETURN',
+    'BREAK', 'CONTINUE', 'NEW', 'TRUE', 'FALSE',
+    # Identificadores y literales
+    'ID', 'INTEGER', 'STRING',
+    # Operadores y puntuación
+    'PLUS', 'MINUS', 'TIMES', 'DIVIDE', 'MODULO',
+    'LESS_THAN', 'LESS_THAN_EQUAL', 'GREATER_THAN',
+    'GREATER_THAN_EQUAL', 'EQUALS', 'NOT_EQUALS', 'ASSIGN',
+    'LPAREN', 'RPAREN', 'LBRACKET', 'RBRACKET', 'LBRACE', 'RBRACE',
+    'COMMA', 'COLON', 'DOT', 'SEMICOLON', 'ARROW',
+    'AND', 'OR', 'NOT',
+
+    'INT',
+    'STR',
+    'NEWLINE',
+    'ELIF',
+    'PASS',
+    'NONE',
+    'IS'
+]
+
+# Expresiones regulares para cada token
+t_PLUS = r'\+'
+t_MINUS = r'-'
+t_TIMES = r'\*'
+t_DIVIDE = r'/'
+t_MODULO = r'%'
+t_LESS_THAN = r'<'
+t_LESS_THAN_EQUAL = r'<='
+t_GREATER_THAN = r'>'
+t_GREATER_THAN_EQUAL = r'>='
+t_EQUALS = r'=='
+t_NOT_EQUALS = r'!='
+t_ASSIGN = r'='
+t_LPAREN = r'\('
+t_RPAREN = r'\)'
+t_LBRACKET = r'\['
+t_RBRACKET = r'\]'
+t_LBRACE = r'{'
+t_RBRACE = r'}'
+t_COMMA = r','
+t_COLON = r':'
+t_DOT = r'\.'
+t_SEMICOLON = r';'
+t_ARROW = r'->'
+t_AND = r'&&'
+t_OR = r'\|\|'
+t_NOT = r'!'
+
+# Ignoramos espacios en blanco y comentarios
+t_ignore = ' \t\r'
+def t_COMMENT(t):
+    r'\#.*'
+    pass
+
+# Palabras reservadas
+reserved = {
+    'False': 'FALSE',
+    'None': 'NONE',
+    'True': 'TRUE',
+    'and': 'AND',
+    'as': 'AS',
+    'assert': 'ASSERT',
+    'async': 'ASYNC',
+    'await': 'AWAIT',
+    'break': 'BREAK',
+    'class': 'CLASS',
+    'continue': 'CONTINUE',
+    'def': 'DEF',
+    'del': 'DEL',
+    'elif': 'ELIF',
+    'else': 'ELSE',
+    'except': 'EXCEPT',
+    'finally': 'FINALLY',
+    'for': 'FOR',
+    'from': 'FROM',
+    'global': 'GLOBAL',
+    'if': 'IF',
+    'import': 'IMPORT',
+    'in': 'IN',
+    'is': 'IS',
+    'lambda': 'LAMBDA',
+    'nonlocal': 'NONLOCAL',
+    'not': 'NOT',
+    'or': 'OR',
+    'pass': 'PASS',
+    'raise': 'RAISE',
+    'return': 'RETURN',
+    'try': 'TRY',
+    'while': 'WHILE',
+    'with': 'WITH',
+    'yield': 'YIELD'
+}
+
+# Identificadores y literales
+def t_ID(t):
+    r'[a-z|A-Z][a-z|A-Z|0-9|_]*'
+    t.type = reserved.get(t.value, 'ID')
+    return t
+
+def t_INTEGER(t):
+    r'\d+'
+    t.value = int(t.value)
+    return t
+
+def t_STRING(t):
+    r'"(?:[^"\\]|\\.)*"'
+    t.value = t.value[1:-1]
+    return t
+
+def _mensaje_lexico(t):
+    return f"Error léxico: Carácter inesperado '{t.value[0]}' en la línea {t.lineno}"
+
+# Manejo de errores léxicos
+def t_error(t):
+    print(_mensaje_lexico(t))
+    t.lexer.skip(1)
+    
+# Manejo de saltos de línea. NEWLINE, INDENT y DEDENT los emite la etapa de
+# indentación (indentacion.py) a partir de lineno e inicio_linea
+def t_newline(t):
+    r'\n+'
+    t.lexer.lineno += len(t.value)
+    t.lexer.inicio_linea = t.lexpos + len(t.value)
+
+
+_lexer = None
+
+# Lexer del módulo, construido en el primer uso
+def get_lexer():
+    global _lexer
+    if _lexer is None:
+        import tablas
+        _lexer = tablas.lexer(sys.modules[__name__])
+        _lexer.inicio_linea = 0
+    return _lexer
+
+# Integración con scanner
+def gettoken():
+    token = get_lexer().token()
+    if token:
+        return token.type
+    else:
+        return None
+
+# Definición de las reglas gramaticales. Cada regla crea su nodo del árbol
+# en la arena del parser que la ejecuta (p.parser.arena, ver arbol.py) y
+# devuelve su índice; las listas (DefList,
+# StatementList, ...) son recursivas por la derecha y se acumulan en una
+# lista de Python al revés, que se da la vuelta al crear el nodo que las
+# contiene. Las posiciones son las de los tokens (p.lexpos) o, con -1, las
+# de los hijos
+
+# Árbol del análisis en curso de las funciones del módulo. Cada analyze*()
+# empieza uno nuevo (ver _empezar), que es la arena de los parsers de
+# get_parser() y get_parser_compacto(); quien use get_parser() directamente
+# añade nodos a este. Cada ParserSession tiene su propio parser y su propia
+# arena. arbol.py se importa con el primer análisis o el primer get_parser()
+arbol = None
+_arbol = None
+
+def p_Program(p):
+    '''Program : DefList'''
+    p[0] = p.parser.arena.nodo(arbol.PROGRAMA, None, p[1][::-1], -1 if p[1] else 0, -1 if p[1] else 0)
+
+def p_DefList(p):
+    '''DefList : Def DefList
+               | empty'''
+    if len(p) == 3:
+        p[2].append(p[1])
+        p[0] = p[2]
+    else:
+        p[0] = []
+
+def p_Def(p):
+    '''Def : DEF ID LPAREN TypedVarList RPAREN Return COLON Block'''
+    hijos = p[4][::-1]
+    if p[6] is not None:
+        hijos.append(p[6])
+    hijos.append(p[8])
+    p[0] = p.parser.arena.nodo(arbol.DEF, p[2], hijos, p.lexpos(1), -1)
+
+def p_TypedVar(p):
+    '''TypedVar : ID COLON Type'''
+    p[0] = p.parser.arena.nodo(arbol.PARAMETRO, p[1], [p[3]], p.lexpos(1), -1)
+
+def p_Type(p):
+    '''Type : INT
+            | STR
+            | LBRACKET Type RBRACKET'''
+    if len(p) == 2:
+        p[0] = p.parser.arena.hoja(arbol.TIPO, p[1], p.lexpos(1))
+    else:
+        p[0] = p.parser.arena.nodo(arbol.TIPO_LISTA, None, [p[2]], p.lexpos(1), p.lexpos(3))
+
+def p_TypedVarList(p):
+    '''TypedVarList : empty
+                    | TypedVar TypedVarListTail'''
+    if len(p) == 3:
+        p[2].append(p[1])
+        p[0] = p[2]
+    else:
+        p[0] = []
+
+def p_TypedVarListTail(p):
+    '''TypedVarListTail : COMMA TypedVar TypedVarListTail
+                        | empty'''
+    if len(p) == 4:
+        p[3].append(p[2])
+        p[0] = p[3]
+    else:
+        p[0] = []
+
+def p_Return(p):
+    '''Return : ARROW Type
+              | empty'''
+    p[0] = p[2] if len(p) == 3 else None
+
+def p_Block(p):
+    '''Block : NEWLINE INDENT Statement StatementList DEDENT'''
+    hijos = p[4]
+    hijos.append(p[3])
+    p[0] = p.parser.arena.nodo(arbol.BLOQUE, None, hijos[::-1], p.lexpos(1), p.lexpos(5))
+
+def p_StatementList(p):
+    '''StatementList : Statement StatementList
+                     | empty'''
+    if len(p) == 3:
+        p[2].append(p[1])
+        p[0] = p[2]
+    else:
+        p[0] = []
+
+def p_Statement(p):
+    '''Statement : SimpleStatement NEWLINE
+                 | IF Expr COLON Block ElifList Else
+                 | WHILE Expr COLON Block
+                 | FOR ID IN Expr COLON Block'''
+    if len(p) == 3:
+        p[0] = p[1]
+    elif len(p) == 7 and p.slice[1].type == 'IF':
+        hijos = [p[2], p[4]] + p[5][::-1]
+        if p[6] is not None:
+            hijos.append(p[6])
+        p[0] = p.parser.arena.nodo(arbol.IF, None, hijos, p.lexpos(1), -1)
+    elif len(p) == 5:
+        p[0] = p.parser.arena.nodo(arbol.WHILE, None, [p[2], p[4]], p.lexpos(1), -1)
+    else:
+        p[0] = p.parser.arena.nodo(arbol.FOR, p[2], [p[4], p[6]], p.lexpos(1), -1)
+
+def p_ElifList(p):
+    '''ElifList : Elif ElifList
+                | empty'''
+    if len(p) == 3:
+        p[2].append(p[1])
+        p[0] = p[2]
+    else:
+        p[0] = []
+
+def p_Elif(p):
+    '''Elif : ELIF Expr COLON Block'''
+    p[0] = p.parser.arena.nodo(arbol.ELIF, None, [p[2], p[4]], p.lexpos(1), -1)
+
+def p_Else(p):
+    '''Else : ELSE COLON Block
+            | empty'''
+    p[0] = p.parser.arena.nodo(arbol.ELSE, None, [p[3]], p.lexpos(1), -1) if len(p) == 4 else None
+
+def p_SimpleStatement(p):
+    '''SimpleStatement : Expr SSTail
+                       | PASS
+                       | RETURN ReturnExpr'''
+    if len(p) == 2:
+        p[0] = p.parser.arena.nodo(arbol.PASS, None, None, p.lexpos(1), p.lexpos(1))
+    elif p.slice[1].type == 'RETURN':
+        if p[2] is None:
+            p[0] = p.parser.arena.nodo(arbol.RETURN, None, None, p.lexpos(1), p.lexpos(1))
+        else:
+            p[0] = p.parser.arena.nodo(arbol.RETURN, None, [p[2]], p.lexpos(1), -1)
+    elif p[2] is None:
+        p[0] = p.parser.arena.nodo(arbol.EXPRESION, None, [p[1]], -1, -1)
+    else:
+        p[0] = p.parser.arena.nodo(arbol.ASIGNACION, None, [p[1], p[2]], -1, -1)
+
+def p_SSTail(p):
+    '''SSTail : ASSIGN Expr
+              | empty'''
+    p[0] = p[2] if len(p) == 3 else None
+
+def p_ReturnExpr(p):
+    '''ReturnExpr : Expr
+                  | empty'''
+    p[0] = p[1]
+
+# Expresiones: en lugar de una cadena OrExpr -> AndExpr -> ... -> Term con
+# un no terminal Prime por nivel, una sola regla Expr con los operadores
+# binarios y la tabla de precedencias de PLY, que resuelve los conflictos de
+# la gramática ambigua como la escalada de precedencia. El lenguaje es el
+# mismo (todos los binarios asociativos por la izquierda, el menos unario en
+# Factor), pero un literal se reduce en tres pasos (Literal, Factor, Expr)
+# y no en veintiuno. Ver bench_expresiones.py
+precedence = (
+    ('left', 'OR'),
+    ('left', 'AND'),
+    ('left', 'NOT'),
+    ('left', 'EQUALS', 'NOT_EQUALS', 'LESS_THAN', 'GREATER_THAN', 'LESS_THAN_EQUAL', 'GREATER_THAN_EQUAL', 'IS'),
+    ('left', 'PLUS', 'MINUS'),
+    ('left', 'TIMES', 'DIVIDE', 'MODULO'),
+)
+
+def p_Expr(p):
+    '''Expr : Expr OR Expr
+            | Expr AND Expr
+            | Expr NOT Expr
+            | Expr EQUALS Expr
+            | Expr NOT_EQUALS Expr
+            | Expr LESS_THAN Expr
+            | Expr GREATER_THAN Expr
+            | Expr LESS_THAN_EQUAL Expr
+            | Expr GREATER_THAN_EQUAL Expr
+            | Expr IS Expr
+            | Expr PLUS Expr
+            | Expr MINUS Expr
+            | Expr TIMES Expr
+            | Expr DIVIDE Expr
+            | Expr MODULO Expr
+            | Factor'''
+    if len(p) == 4:
+        p[0] = p.parser.arena.nodo(arbol.BINARIO, p[2], [p[1], p[3]], -1, -1)
+    else:
+        p[0] = p[1]
+
+def p_Factor(p):
+    '''Factor : MINUS Factor
+              | Name
+              | Literal
+              | List
+              | LPAREN Expr RPAREN'''
+    if len(p) == 2:
+        p[0] = p[1]
+    elif len(p) == 3:
+        p[0] = p.parser.arena.nodo(arbol.UNARIO, p[1], [p[2]], p.lexpos(1), -1)
+    else:
+        p[0] = p[2]
+
+def p_Name(p):
+    '''Name : ID NameTail'''
+    if p[2] is None:
+        p[0] = p.parser.arena.hoja(arbol.NOMBRE, p[1], p.lexpos(1))
+    else:
+        tipo, hijos, fin = p[2]
+        p[0] = p.parser.arena.nodo(tipo, p[1], hijos, p.lexpos(1), fin)
+
+# (tipo de nodo, hijos, fin) para Name, o None si es solo el nombre
+def p_NameTail(p):
+    '''NameTail : LPAREN ExprList RPAREN
+                | List
+                | empty'''
+    if len(p) == 4:
+        p[0] = (arbol.LLAMADA, p[2][::-1], p.lexpos(3))
+    elif p[1] is not None:
+        p[0] = (arbol.INDICE, [p[1]], -1)
+    else:
+        p[0] = None
+
+# Valor de los literales que el lexer deja como texto
+_LITERALES = {'NONE': None, 'TRUE': True, 'FALSE': False}
+
+def p_Literal(p):
+    '''Literal : NONE
+               | TRUE
+               | FALSE
+               | INTEGER
+               | STRING'''
+    tipo = p.slice[1].type
+    valor = _LITERALES[tipo] if tipo in _LITERALES else p[1]
+    p[0] = p.parser.arena.hoja(arbol.LITERAL, valor, p.lexpos(1))
+
+def p_List(p):
+    '''List : LBRACKET ExprList RBRACKET'''
+    p[0] = p.parser.arena.nodo(arbol.LISTA, None, p[2][::-1], p.lexpos(1), p.lexpos(3))
+
+def p_ExprList(p):
+    '''ExprList : empty
+                | Expr ExprListTail'''
+    if len(p) == 3:
+        p[2].append(p[1])
+        p[0] = p[2]
+    else:
+        p[0] = []
+
+def p_ExprListTail(p):
+    '''ExprListTail : empty
+                    | COMMA Expr ExprListTail'''
+    if len(p) == 4:
+        p[3].append(p[2])
+        p[0] = p[3]
+    else:
+        p[0] = []
+
+def p_empty(p):
+    '''empty :'''
+    p[0] = None
+
+# Errores del último análisis
+errors = []
+
+def _mensaje_error(p):
+    if p:
+        return f"Error de sintaxis: Token inesperado '{p.value}' en la línea {p.lineno}"
+    else:
+        return "Error de sintaxis: Fin inesperado del archivo"
+
+# Manejo de errores sintácticos
+def p_error(p):
+    errors.append(_mensaje_error(p))
+
+_parser = None
+
+# Parser del módulo, construido en el primer análisis
+def get_parser():
+    global _parser
+    if _parser is None:
+        import tablas
+        _parser = tablas.parser(sys.modules[__name__])
+        _parser.arena = _arbol
+        if _arbol is None:
+            _empezar()
+    return _parser
+
+_parser_compacto = None
+
+# Parser con las tablas compactas compartidas por mmap (ver tablas_compactas.py)
+def get_parser_compacto():
+    global _parser_compacto
+    if _parser_compacto is None:
+        import tablas
+        _parser_compacto = tablas.parser_compacto(sys.modules[__name__])
+        _parser_compacto.arena = _arbol
+        if _arbol is None:
+            _empezar()
+    return _parser_compacto
+
+# ll_2.lexer y ll_2.parser siguen disponibles como atributos del módulo
+def __getattr__(nombre):
+    if nombre == 'lexer':
+        return get_lexer()
+    if nombre == 'parser':
+        return get_parser()
+    raise AttributeError("module %r has no attribute %r" % (__name__, nombre))
+
+# Lexer con la etapa de indentación y el estado reiniciado para cada análisis.
+# Los errores de indentación van a errores, por defecto los de analyze()
+def indent_lexer(raw=None, errores=None):
+    import indentacion
+    if raw is None:
+        raw = get_lexer().clone()
+    raw.lineno = 1
+    raw.inicio_linea = 0
+    return indentacion.IndentLexer(raw, errors if errores is None else errores)
+
+# Tokens del código, con NEWLINE, INDENT y DEDENT. Los errores de indentación
+# quedan en errors
+def tokenize(code):
+    global errors
+    errors = []
+    lexer = indent_lexer()
+    lexer.input(code)
+    return list(lexer)
+
+# Empieza un análisis: sin errores y con un árbol vacío
+def _empezar(arena=None):
+    global errors, _arbol, arbol
+    if arbol is None:
+        import arbol
+    errors = []
+    _arbol = arbol.Arena() if arena is None else arena
+    for parser in (_parser, _parser_compacto):
+        if parser is not None:
+            parser.arena = _arbol
+    return _arbol
+
+_reconocedor = None
+
+# Reconocedor sobre las tablas del parser, sin acciones semánticas ni
+# posiciones (ver reconocedor.py), construido en el primer uso
+def get_reconocedor():
+    global _reconocedor
+    if _reconocedor is None:
+        import reconocedor
+        _reconocedor = reconocedor.Reconocedor(get_parser())
+    return _reconocedor
+
+class _PrimerError(Exception):
+    pass
+
+def _error_y_detener(p):
+    p_error(p)
+    raise _PrimerError()
+
+# Función para analizar el código de entrada. Con recognize_only no se
+# ejecutan las acciones de la gramática ni se guardan posiciones: solo se
+# reconoce, con los mismos errores. Con fail_fast se detiene en el primer
+# error y devuelve solo ese
+def analyze(code, recognize_only=False, fail_fast=False):
+    global errors
+    _empezar()
+    if recognize_only:
+        get_reconocedor().parse(code, lexer=indent_lexer(), primer_error=fail_fast)
+    elif fail_fast:
+        parser = get_parser()
+        parser.errorfunc = _error_y_detener
+        try:
+            parser.parse(code, lexer=indent_lexer(), tracking=True)
+        except _PrimerError:
+            pass
+        finally:
+            parser.errorfunc = p_error
+    else:
+        get_parser().parse(code, lexer=indent_lexer(), tracking=True)
+    if fail_fast:
+        # Un error de indentación puede haber llegado antes que el de sintaxis
+        errors = errors[:1]
+    if errors:
+        return errors
+    else:
+        return True
+
+
+# Igual que analyze() pero con el parser de tablas compactas
+def analyze_compacto(code):
+    _empezar()
+    get_parser_compacto().parse(code, lexer=indent_lexer())
+    if errors:
+        return errors
+    else:
+        return True
+
+# Árbol de sintaxis del código (arbol.Arena, con la raíz en .raiz) o, si hay
+# errores, su lista. arena: dónde construirlo, por defecto una nueva. Con
+# hash_cons, una arbol.ArenaCompartida: los subárboles iguales se guardan una
+# sola vez y las posiciones de cada aparición van aparte
+def parse_ast(code, arena=None, hash_cons=False):
+    if arena is None and hash_cons:
+        import arbol
+        arena = arbol.ArenaCompartida()
+    arena = _empezar(arena)
+    raiz = get_parser().parse(code, lexer=indent_lexer())
+    arena.terminar()
+    if errors:
+        return errors
+    arena.raiz = raiz
+    return arena
+
+_firma_gramatica = None
+
+# Hash de la gramática del parser (tablas.firma_parser), calculado una vez
+def grammar_signature():
+    global _firma_gramatica
+    if _firma_gramatica is None:
+        import tablas
+        _firma_gramatica = tablas.firma_parser(sys.modules[__name__])
+    return _firma_gramatica
+
+_firma_lexer = None
+
+# Hash de las reglas del lexer (tablas.firma_lexer), calculado una vez
+def lexer_signature():
+    global _firma_lexer
+    if _firma_lexer is None:
+        import tablas
+        _firma_lexer = tablas.firma_lexer(sys.modules[__name__])
+    return _firma_lexer
+
+# Caché persistente de resultados por contenido de archivo (ver
+# cache_resultados.py) para analyze_file(..., cache=...), con la firma de la
+# gramática y del lexer de este módulo
+def get_result_cache(directorio=None, limite=None):
+    import cache_resultados
+    if limite is None:
+        limite = cache_resultados.LIMITE
+    return cache_resultados.CacheResultados(directorio, limite, grammar_signature() + lexer_signature())
+
+# parse_ast() y además guarda el resultado (árbol o errores) en ruta, en el
+# formato binario de arbol_binario.py
+def save_ast(code, ruta, hash_cons=False):
+    import arbol_binario
+    resultado = parse_ast(code, hash_cons=hash_cons)
+    arbol_binario.guardar(ruta, resultado, code, grammar_signature())
+    return resultado
+
+# Resultado guardado por save_ast(), sin volver a analizar: el árbol (de solo
+# lectura, sobre un mmap del archivo) o la lista de errores. Lanza ValueError
+# si el archivo es de otra gramática o, si se da code, de otro código
+def load_ast(ruta, code=None):
+    import arbol_binario
+    return arbol_binario.abrir(ruta, code, grammar_signature())[1]
+
+# Igual que analyze() pero leyendo el código de un archivo. Con cache (de
+# get_result_cache()), si el contenido ya se analizó no se vuelve a analizar;
+# si no, se analiza y se guarda el resultado y, con save_tokens, también los
+# tokens (cache.tokens(contenido) los devuelve como TokenBuffer)
+def analyze_file(filename, encoding='utf-8', recognize_only=False, fail_fast=False, cache=None,
+                 save_tokens=False):
+    if cache is None:
+        with open(filename, encoding=encoding) as f:
+            return analyze(f.read(), recognize_only, fail_fast)
+    with open(filename, 'rb') as f:
+        contenido = f.read()
+    resultado = cache.buscar(contenido, fail_fast)
+    if resultado is not None:
+        return resultado
+    # Como al abrir en modo texto: los saltos de línea quedan en \n
+    code = contenido.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+    tokens = None
+    if save_tokens:
+        import tokens_compactos
+        tokens = tokens_compactos.TokenBuffer.from_tokens(tokenize(code))
+        tokens.errores = list(errors)
+    resultado = analyze(code, recognize_only, fail_fast)
+    cache.guardar(contenido, resultado, fail_fast, tokens)
+    return resultado
+
+
+# analyze_file() sobre muchos archivos (o los .py de directorios) en un pool
+# de workers procesos, con los más grandes primero (ver lotes.py). Devuelve un
+# iterador de (archivo, tamaño, resultado) según van terminando. Con ast, el
+# resultado es el de parse_ast(), pasado de los procesos por memoria compartida
+def analyze_files(paths, workers=None, recognize_only=False, fail_fast=False, cache=False, ast=False):
+    import lotes
+    return lotes.analizar(paths, workers, recognize_only, fail_fast, cache, ast=ast)
+
+
+# Igual que analyze() pero con el archivo cortado por las definiciones de
+# primer nivel y los trozos analizados en workers procesos a la vez (ver
+# trozos.py). pool: uno de trozos.crear_pool(), para reutilizarlo
+def analyze_parallel(code, workers=None, recognize_only=False, fail_fast=False, pool=None):
+    import trozos
+    return trozos.analizar(code, workers, recognize_only, fail_fast, pool)
+
+
+# Tokens de code como tokens_compactos.tokenize(code, indentar=True) (un
+# TokenBuffer, con NEWLINE, INDENT y DEDENT), con el lexer de trozos del
+# archivo en workers procesos a la vez (ver lexer_paralelo.py)
+def tokenize_parallel(code, workers=None, pool=None):
+    import lexer_paralelo
+    return lexer_paralelo.tokenize(code, workers, pool)
+
+
+# Igual que analyze() pero leyendo de un archivo o tubería por trozos, sin
+# cargar todo el código en memoria
+def analyze_stream(fuente):
+    import indentacion
+    import lexer_stream
+    _empezar()
+    get_parser().parse(fuente, lexer=indentacion.IndentLexer(lexer_stream.StreamLexer(), errors),
+                 tracking=True)
+    if errors:
+        return errors
+    else:
+        return True
+
+
+# Igual que analyze() pero sobre un mmap del archivo en modo bytes: no se
+# decodifica el archivo ni se copia el texto de los tokens que no se leen
+def analyze_mmap(filename):
+    import indentacion
+    import lexer_mmap
+    _empezar()
+    with lexer_mmap.MmapLexer(filename) as mmap_lexer:
+        get_parser().parse(lexer=indentacion.IndentLexer(mmap_lexer, errors), tracking=True)
+    if errors:
+        return errors
+    else:
+        return True
+
+
+# Análisis de un flujo de tokens ya calculado (tokens_compactos.TokenBuffer),
+# que debe incluir NEWLINE, INDENT y DEDENT (tokenize(data, indentar=True))
+def analyze_tokens(buf):
+    _empezar()
+    errors.extend(buf.errores)
+    get_parser().parse(lexer=buf.lexer(), tracking=True)
+    if errors:
+        return errors
+    else:
+        return True
+
+
+# Igual que analyze() pero con el pre-escaneo vectorial de preescaneo.py: los
+# paréntesis desbalanceados y la indentación inconsistente se rechazan antes
+# de tokenizar, y los tokens de indentación salen de los arrays del
+# pre-escaneo. Sin numpy se usa analyze().
+def analyze_preescaneo(code):
+    import preescaneo
+    global errors
+    if preescaneo.numpy is None:
+        return analyze(code)
+    pre = preescaneo.Preescaneo(code)
+    if pre.errores:
+        errors = list(pre.errores)
+        return errors
+    return analyze_tokens(preescaneo.tokenize(code, pre))
+
+
+# Sesión de análisis reentrante. Las funciones del módulo (analyze(),
+# parse_ast(), ...) comparten los errores de errors, la arena de _arbol y un
+# solo LRParser, que guarda sus pilas en el propio objeto: dos análisis a la
+# vez desde hilos distintos se mezclan. Una sesión tiene su propio LRParser
+# (una copia superficial del de get_parser(): comparte las tablas y las
+# funciones p_*, que no cambian), su lexer clonado con su etapa de
+# indentación, su lista de errores y su arena; el reconocedor no guarda
+# estado y se comparte. Las acciones construyen en p.parser.arena y los
+# errores van a la errorfunc de la sesión, así que nada pasa por las
+# variables del módulo. Una sesión no se usa desde dos hilos a la vez: cada
+# hilo usa la suya (get_session()), sin ningún cerrojo.
+class ParserSession(object):
+
+    def __init__(self):
+        import copy
+        self.parser = copy.copy(get_parser())
+        self.parser.errorfunc = self._error
+        self.reconocedor = get_reconocedor()
+        self.lexer = indent_lexer(get_lexer().clone(), [])
+        self.errors = []
+
+    # Empieza un análisis: sin errores, con el lexer al principio (en la
+    # línea lineno) y un árbol vacío
+    def _empezar(self, arena=None, lineno=1):
+        self.errors = []
+        self.lexer.errores = self.errors
+        self.lexer.lexer.lineno = lineno
+        self.lexer.lexer.inicio_linea = 0
+        self.parser.arena = arbol.Arena() if arena is None else arena
+        return self.parser.arena
+
+    def _error(self, p):
+        self.errors.append(_mensaje_error(p))
+
+    def _error_y_detener(self, p):
+        self._error(p)
+        raise _PrimerError()
+
+    # Como analyze() del módulo. lineno: número de línea del principio de
+    # code, para analizar un trozo de un archivo con las líneas del archivo
+    def analyze(self, code, recognize_only=False, fail_fast=False, lineno=1):
+        self._empezar(lineno=lineno)
+        if recognize_only:
+            self.reconocedor.parse(code, lexer=self.lexer, primer_error=fail_fast, errorf=self._error)
+        else:
+            self.parser.errorfunc = self._error_y_detener if fail_fast else self._error
+            try:
+                self.parser.parse(code, lexer=self.lexer, tracking=True)
+            except _PrimerError:
+                pass
+        if fail_fast:
+            del self.errors[1:]
+        if self.errors:
+            return self.errors
+        else:
+            return True
+
+    # Como parse_ast() del módulo
+    def parse_ast(self, code, arena=None, hash_cons=False):
+        if arena is None and hash_cons:
+            arena = arbol.ArenaCompartida()
+        arena = self._empezar(arena)
+        self.parser.errorfunc = self._error
+        raiz = self.parser.parse(code, lexer=self.lexer)
+        arena.terminar()
+        if self.errors:
+            return self.errors
+        arena.raiz = raiz
+        return arena
+
+_sesiones = None
+
+# Sesión del hilo actual, creada en su primer uso: con un
+# concurrent.futures.ThreadPoolExecutor, cada hilo del pool analiza con la
+# suya. Si dos hilos crean _sesiones a la vez, uno pierde la sesión que acaba
+# de crear y crea otra, pero ninguna se comparte
+def get_session():
+    global _sesiones
+    if _sesiones is None:
+        import threading
+        _sesiones = threading.local()
+    sesion = getattr(_sesiones, 'sesion', None)
+    if sesion is None:
+        sesion = _sesiones.sesion = ParserSession()
+    return sesion
+
+
+if __name__ == '__main__':
+    # Prueba del parser con una cadena de entrada
+    data = '''
+x = 10 + 5 * (3 - 2)
+print("El resultado es:", x)
+'''
+
+    # Análisis del código de entrada
+    result = analyze(data)
+
+    # Impresión de los errores o éxito del análisis
+    if result == True:
+        print("Análisis exitoso. El código de entrada pertenece al lenguaje.")
+    else:
+        for error in result:
+            print(error)
+
@@ -0,0 +1,147 @@
+import os
+
+import ll_2
+
+# Análisis de muchos archivos en un pool de procesos. Cada proceso del pool
+# carga las tablas una sola vez al arrancar (_iniciar: get_parser(), que las
+# lee de la caché de tablas.py) y después analiza con analyze_file() los
+# archivos que le tocan.
+#
+# Planificación por tamaño: los archivos se ordenan de mayor a menor y se
+# reparten en lotes de unos objetivo bytes (el total entre LOTES_POR_PROCESO
+# lotes por proceso). Un archivo grande va solo en su lote y sale al
+# principio, así que no queda como cola del análisis con el resto de procesos
+# parados; los pequeños, al final, se agrupan para no pagar la comunicación
+# entre procesos archivo por archivo. Los resultados se devuelven según
+# terminan los lotes, no en el orden de entrada.
+#
+# Con ast, cada proceso construye el árbol de sintaxis (ll_2.parse_ast) y lo
+# devuelve en un bloque de memoria compartida (ver memoria_compartida.py), que
+# aquí se abre sin deserializar nodo a nodo.
+
+EXTENSION = '.py'
+
+LOTES_POR_PROCESO = 16
+
+
+# Lista de archivos: los de rutas, y los de los directorios de rutas (con la
+# extensión dada, recorridos en orden)
+def archivos(rutas, extension=EXTENSION):
+    lista = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            for directorio, subdirectorios, nombres in os.walk(ruta):
+                subdirectorios.sort()
+                lista.extend(os.path.join(directorio, n) for n in sorted(nombres) if n.endswith(extension))
+        else:
+            lista.append(ruta)
+    return lista
+
+
+def procesos_disponibles():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Lotes de (ruta, tamaño) de mayor a menor, de hasta objetivo bytes cada uno
+# (o un solo archivo si es más grande)
+def repartir(rutas, procesos, lotes_por_proceso=LOTES_POR_PROCESO):
+    tamanos = []
+    for ruta in rutas:
+        try:
+            tamanos.append((os.path.getsize(ruta), ruta))
+        except OSError:
+            # El error se informa al analizarlo
+            tamanos.append((0, ruta))
+    tamanos.sort(key=lambda t: -t[0])
+    objetivo = max(1, sum(t for t, _ in tamanos) // (procesos * lotes_por_proceso))
+    lotes = []
+    lote = []
+    bytes_lote = 0
+    for tamano, ruta in tamanos:
+        if lote and bytes_lote + tamano > objetivo:
+            lotes.append(lote)
+            lote = []
+            bytes_lote = 0
+        lote.append((ruta, tamano))
+        bytes_lote += tamano
+    if lote:
+        lotes.append(lote)
+    return lotes
+
+
+_opciones = None
+_ast = False
+
+
+def _iniciar(opciones):
+    global _opciones, _ast
+    _opciones = dict(opciones)
+    _ast = _opciones.pop('ast', False)
+    ll_2.get_parser()
+    if _opciones['recognize_only']:
+        ll_2.get_reconocedor()
+    if _opciones.pop('cache'):
+        _opciones['cache'] = ll_2.get_result_cache()
+
+
+def _analizar(ruta):
+    try:
+        if _ast:
+            with open(ruta, encoding='utf-8') as f:
+                return ll_2.parse_ast(f.read())
+        return ll_2.analyze_file(ruta, **_opciones)
+    except (OSError, UnicodeDecodeError) as e:
+        return ['Error de lectura: %s' % (getattr(e, 'strerror', None) or e)]
+
+
+def _analizar_lote(lote):
+    return [(ruta, tamano, _analizar(ruta)) for ruta, tamano in lote]
+
+
+# En un proceso del pool: los árboles van por memoria compartida, como el
+# nombre del bloque
+def _analizar_lote_compartido(lote):
+    import memoria_compartida
+    resultados = _analizar_lote(lote)
+    for i, (ruta, tamano, resultado) in enumerate(resultados):
+        if not isinstance(resultado, list):
+            resultados[i] = (ruta, tamano, memoria_compartida.exportar_arena(resultado))
+    return resultados
+
+
+# Analiza los archivos de rutas (y los de sus directorios) en procesos
+# procesos (por defecto, todos los disponibles). Devuelve un iterador de
+# (ruta, tamaño en bytes, resultado de analyze_file()) según van terminando.
+# Con cache, cada proceso usa la caché de resultados de get_result_cache().
+# Con ast, el resultado es el de ll_2.parse_ast(): el árbol (de solo lectura)
+# o la lista de errores; no se combina con recognize_only, fail_fast ni cache
+def analizar(rutas, procesos=None, recognize_only=False, fail_fast=False, cache=False,
+             extension=EXTENSION, ast=False):
+    import multiprocessing
+    import memoria_compartida
+    if ast and (recognize_only or fail_fast or cache):
+        raise ValueError('ast no se combina con recognize_only, fail_fast ni cache')
+    procesos = procesos or procesos_disponibles()
+    lotes = repartir(archivos(rutas, extension), procesos)
+    opciones = {'recognize_only': recognize_only, 'fail_fast': fail_fast, 'cache': cache, 'ast': ast}
+    if procesos == 1:
+        _iniciar(opciones)
+        for lote in lotes:
+            yield from _analizar_lote(lote)
+        return
+    # Las tablas se cargan antes de crear el pool: con fork los procesos las
+    # heredan ya cargadas y _iniciar() no tiene que leer nada
+    ll_2.get_parser()
+    compartida = ast and memoria_compartida.DISPONIBLE
+    if compartida:
+        memoria_compartida.preparar()
+    with multiprocessing.Pool(min(procesos, len(lotes) or 1), _iniciar, (opciones,)) as pool:
+        for resultados in pool.imap_unordered(_analizar_lote_compartido if compartida else _analizar_lote,
+                                              lotes):
+            for ruta, tamano, resultado in resultados:
+                if isinstance(resultado, str):
+                    resultado = memoria_compartida.abrir_arena(resultado)
+                yield ruta, tamano, resultado
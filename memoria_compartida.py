@@ -0,0 +1,96 @@
+import mmap
+import os
+
+import arbol_binario
+import tablas_compactas
+import tokens_compactos
+
+# Resultados de los procesos de un pool (tokens y árboles) pasados al proceso
+# principal por memoria compartida en lugar de por pickle. El proceso que los
+# produce escribe las columnas en un bloque de multiprocessing.shared_memory
+# con el formato de tablas_compactas.py (cabecera JSON con los nombres, la
+# tabla de valores y los errores, y los arrays tal cual, con su tipo) y solo
+# devuelve el nombre del bloque. El proceso principal lo abre y lo borra; las
+# columnas que recibe son memoryviews sobre el bloque.
+#
+# En Linux el bloque es un archivo de /dev/shm y se abre con mmap de solo
+# lectura: no se copia nada, y la memoria se libera cuando dejan de usarse las
+# vistas. En otros sistemas POSIX se copia una vez del bloque (sin pickle). En
+# Windows el bloque desaparece al cerrarlo quien lo crea, así que no se usa
+# (DISPONIBLE es False) y los resultados van por pickle.
+#
+# Un bloque sin abrir (un error en el proceso principal a mitad de un pool)
+# lo borra al terminar el resource_tracker de multiprocessing, que comparten
+# los procesos del pool si se arranca antes de crearlo (preparar()).
+
+DISPONIBLE = os.name == 'posix'
+
+_DIRECTORIO = '/dev/shm'
+
+
+# Arranca el resource_tracker antes de crear un pool, para que los procesos
+# lo hereden y los bloques que registran sean los que borra este proceso
+def preparar():
+    from multiprocessing import resource_tracker
+    resource_tracker.ensure_running()
+
+
+# Escribe cabecera y arrays en un bloque nuevo; devuelve su nombre
+def exportar(cabecera, arrays):
+    from multiprocessing import shared_memory
+    texto, posiciones, total = tablas_compactas.disponer(cabecera, arrays)
+    memoria = shared_memory.SharedMemory(create=True, size=total)
+    try:
+        tablas_compactas.escribir_en(memoria.buf, texto, posiciones, arrays)
+    except BaseException:
+        memoria.close()
+        memoria.unlink()
+        raise
+    nombre = memoria.name
+    memoria.close()
+    return nombre
+
+
+# Abre y borra el bloque nombre: (cabecera, {nombre: memoryview})
+def abrir(nombre):
+    from multiprocessing import shared_memory
+    datos = None
+    ruta = os.path.join(_DIRECTORIO, nombre)
+    if os.path.exists(ruta):
+        with open(ruta, 'rb') as f:
+            datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    memoria = shared_memory.SharedMemory(nombre)
+    try:
+        if datos is None:
+            datos = bytes(memoria.buf)
+    finally:
+        memoria.close()
+        # También lo quita del resource_tracker
+        memoria.unlink()
+    return tablas_compactas.leer(datos, nombre)
+
+
+def exportar_tokens(buf):
+    cabecera = {'nombres': buf.nombres, 'tabla': buf.tabla, 'errores': buf.errores}
+    return exportar(cabecera, {'tipos': buf.tipos, 'inicios': buf.inicios, 'fines': buf.fines,
+                               'lineas': buf.lineas, 'valores': buf.valores})
+
+
+# TokenBuffer de exportar_tokens(), con las columnas de solo lectura
+def abrir_tokens(nombre):
+    cabecera, arrays = abrir(nombre)
+    buf = tokens_compactos.TokenBuffer.__new__(tokens_compactos.TokenBuffer)
+    buf.__setstate__((cabecera['nombres'], cabecera['tabla'], cabecera['errores'], arrays['tipos'],
+                      arrays['inicios'], arrays['fines'], arrays['lineas'], arrays['valores']))
+    return buf
+
+
+# Arena (o lista de errores) de ll_2.parse_ast(), como en arbol_binario.py
+def exportar_arena(resultado, code=None, gramatica=None):
+    return exportar(*arbol_binario.disponer(resultado, code, gramatica))
+
+
+# Arena de solo lectura (o lista de errores) de exportar_arena()
+def abrir_arena(nombre, code=None, gramatica=None):
+    cabecera, arrays = abrir(nombre)
+    return arbol_binario.reconstruir(nombre, cabecera, arrays, code, gramatica)
@@ -0,0 +1,150 @@
+import gramaticas
+from expresiones import ErrorExpresion
+
+# Parser predictivo LL(1) dirigido por tabla, sin recursión: la pila de
+# símbolos es una lista de enteros (los de gramaticas.Grammar), así que la
+# profundidad de bloques y expresiones anidadas no depende del límite de
+# recursión de Python.
+#
+# La tabla es una lista plana: tabla[a * ancho + t] es la producción que se
+# expande para el no terminal a con el terminal t a la vista, o -1. La
+# columna extra t = n_terminales es la de los tokens que no son terminales de
+# la gramática y siempre es -1.
+#
+# Los errores se recuperan en modo pánico: con un no terminal en la cima se
+# descartan tokens hasta uno de su FOLLOW (y se quita el no terminal), y con
+# un terminal que no coincide se da por insertado. Como en PLY, después de un
+# error no se informa de otro hasta que se aceptan tres tokens.
+#
+# Un no terminal puede tener un subanalizador externo (por ejemplo Expr con
+# expresiones.Expresiones): en lugar de expandirlo con la tabla se le pasan
+# los tokens con analizar(tok, t, leer), que devuelve el primer token que ya
+# no es suyo o lanza ErrorExpresion(tok, t). La tabla se sigue construyendo
+# entera, y el error se recupera igual que si lo hubiera detectado la tabla.
+
+SILENCIO = 3
+
+
+class LL1Parser(object):
+
+    # terminal(tok): nombre del terminal de la gramática que corresponde a un
+    # token del lexer; por defecto su tipo. externos: no terminal ->
+    # subanalizador
+    def __init__(self, grammar, terminal=None, externos=None):
+        self.grammar = grammar
+        T = grammar.n_terminales
+        ancho = T + 1
+        tabla = [-1] * (ancho * len(grammar.de))
+        # Ante un conflicto queda la primera producción
+        self.conflictos = grammar.conflictos()
+        for a, producciones in enumerate(grammar.de):
+            for p in producciones:
+                for t in gramaticas.bits(grammar.prediccion(p)):
+                    if tabla[a * ancho + t] < 0:
+                        tabla[a * ancho + t] = p
+        # sincronia[a * ancho + t]: si t está en FOLLOW(a)
+        sincronia = [0] * len(tabla)
+        for a, conjunto in enumerate(grammar.follow):
+            for t in gramaticas.bits(conjunto):
+                sincronia[a * ancho + t] = 1
+        # Cuerpos al revés, listos para apilar
+        apilar = [cuerpo[::-1] for _, cuerpo in grammar.producciones]
+        self._iniciar(grammar.simbolos[:T], grammar.inicial, tabla, sincronia, apilar, terminal)
+        for nombre, subanalizador in (externos or {}).items():
+            self.externos[grammar.indice[nombre] - T] = subanalizador
+
+    # Parser sobre tablas ya construidas (ver tablas_compactas.cargar_ll1)
+    @classmethod
+    def desde_tablas(cls, terminales, inicial, tabla, sincronia, apilar, terminal=None):
+        parser = cls.__new__(cls)
+        parser.grammar = None
+        parser.conflictos = None
+        parser._iniciar(terminales, inicial, tabla, sincronia, apilar, terminal)
+        return parser
+
+    def _iniciar(self, terminales, inicial, tabla, sincronia, apilar, terminal):
+        self.terminales = list(terminales)
+        self.indice = dict((s, i) for i, s in enumerate(self.terminales))
+        self.ancho = len(self.terminales) + 1
+        self.inicial = inicial
+        self.tabla = tabla
+        self.sincronia = sincronia
+        self.apilar = apilar
+        self.terminal = terminal or (lambda tok: tok.type)
+        self.externos = [None] * (len(tabla) // self.ancho)
+
+    # Analiza los tokens de lexer (cualquier objeto con token(), como los de
+    # PLY). Los errores se agregan a errores; devuelve True si no hay ninguno
+    def parse(self, lexer, errores=None):
+        errores = [] if errores is None else errores
+        ancho = self.ancho
+        T = ancho - 1
+        tabla = self.tabla
+        sincronia = self.sincronia
+        apilar = self.apilar
+        externos = self.externos
+        indice = self.indice
+        terminal = self.terminal
+        fin = indice[gramaticas.FIN]
+        siguiente = lexer.token
+
+        def leer():
+            tok = siguiente()
+            if tok is None:
+                return None, fin
+            return tok, indice.get(terminal(tok), T)
+
+        pila = [fin, self.inicial]
+        silencio = 0
+        tok, t = leer()
+        while True:
+            x = pila.pop()
+            if x >= T:
+                externo = externos[x - T]
+                if externo is None:
+                    p = tabla[(x - T) * ancho + t]
+                    if p >= 0:
+                        pila.extend(apilar[p])
+                        continue
+                else:
+                    try:
+                        tok, t = externo.analizar(tok, t, leer)
+                        # Lo que reconoce el subanalizador cuenta como un token
+                        if silencio:
+                            silencio -= 1
+                        continue
+                    except ErrorExpresion as e:
+                        tok, t = e.args
+                if not silencio:
+                    self._error(tok, errores)
+                silencio = SILENCIO
+                # Pánico: tokens fuera hasta uno que pueda seguir a x
+                fila = (x - T) * ancho
+                while t != fin and not sincronia[fila + t]:
+                    tok, t = leer()
+                    if tabla[fila + t] >= 0:
+                        break
+                if tabla[fila + t] >= 0:
+                    pila.append(x)
+                continue
+            if x == t:
+                if x == fin:
+                    break
+                if silencio:
+                    silencio -= 1
+                tok, t = leer()
+                continue
+            if not silencio:
+                self._error(tok, errores)
+            silencio = SILENCIO
+            if x == fin:
+                break
+        if errores:
+            return errores
+        return True
+
+    def _error(self, tok, errores):
+        if tok is None:
+            errores.append("Error de sintaxis: Fin inesperado del archivo")
+        else:
+            errores.append(f"Error de sintaxis: Token inesperado '{tok.value}' en la línea {tok.lineno}")
@@ -0,0 +1,457 @@
+import bisect
+import re
+from array import array
+
+import indentacion
+import lexer_rapido
+from lexer_rapido import FastLexer
+from tokens_compactos import TokenBuffer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Pre-escaneo estructural del código fuente con operaciones vectoriales de
+# NumPy, antes de tokenizar. Sobre el texto como array de códigos calcula:
+#   inicios     offset de inicio de cada línea (saltos fuera de cadenas, la
+#               misma numeración de líneas que el lexer)
+#   sangrias    ancho del espacio inicial de cada línea (un tab cuenta 1)
+#   vacias      máscara de líneas vacías o solo con espacios
+#   comentarios máscara de líneas que solo tienen un comentario
+#   cadenas     spans [inicio, fin) de los literales STRING
+#   profundidad profundidad de paréntesis, corchetes y llaves al comienzo de
+#               cada línea, por suma acumulada sobre las posiciones de cierre
+#               y apertura
+# Las operaciones de tamaño del archivo son solo las comparaciones iniciales
+# (a == '\n', a == '"', ...); el resto trabaja sobre las posiciones de esos
+# caracteres. Los paréntesis desbalanceados y la indentación inconsistente
+# se detectan aquí y quedan en errores, sin lexer ni parser.
+#
+# tokenize() usa estos arrays en lugar de la etapa de indentación: el lexer no
+# emite nada por cada salto de línea, lineno se obtiene con searchsorted sobre
+# inicios y NEWLINE, INDENT y DEDENT se intercalan en el TokenBuffer en bloque.
+#
+# Con un str ASCII las posiciones son las del str; con un str no ASCII se usa
+# UTF-32 para que sigan siendo índices de carácter; con bytes o mmap son
+# offsets en bytes.
+
+_SALTO = ord('\n')
+_COMILLA = ord('"')
+_ALMOHADILLA = ord('#')
+_BARRA = ord('\\')
+_ABREN = '([{'
+_CIERRAN = ')]}'
+
+
+def _codigos(data):
+    if isinstance(data, str):
+        if data.isascii():
+            return numpy.frombuffer(data.encode('ascii'), dtype=numpy.uint8)
+        return numpy.frombuffer(data.encode('utf-32-le'), dtype=numpy.uint32)
+    return numpy.frombuffer(data, dtype=numpy.uint8)
+
+
+# Para cada posición de pos indica si va precedida por una racha impar de
+# barras invertidas, es decir, si el carácter está escapado
+def _escapados(pos, barras):
+    escapado = numpy.zeros(len(pos), dtype=bool)
+    if not len(pos) or not len(barras):
+        return escapado
+    corte = numpy.r_[True, barras[1:] != barras[:-1] + 1]
+    inicio_racha = barras[numpy.maximum.accumulate(numpy.where(corte, numpy.arange(len(barras)), 0))]
+    j = numpy.minimum(numpy.searchsorted(barras, pos - 1), len(barras) - 1)
+    previa = barras[j] == pos - 1
+    escapado[previa] = (pos[previa] - inicio_racha[j[previa]]) % 2 == 1
+    return escapado
+
+
+# Máscara de las posiciones que caen dentro de algún span [ini, fin); los
+# spans van ordenados por inicio
+def _dentro(pos, ini, fin):
+    if not len(pos) or not len(ini):
+        return numpy.zeros(len(pos), dtype=bool)
+    j = numpy.searchsorted(ini, pos, 'right') - 1
+    return (j >= 0) & (pos < fin[numpy.maximum(j, 0)])
+
+
+def _fin_de_linea(pos, saltos, n):
+    j = numpy.searchsorted(saltos, pos)
+    return numpy.where(j < len(saltos), saltos[numpy.minimum(j, len(saltos) - 1)], n) \
+        if len(saltos) else numpy.full(len(pos), n, dtype=numpy.int64)
+
+
+class Preescaneo(object):
+
+    def __init__(self, data, ignore=' \t\r'):
+        if numpy is None:
+            raise ImportError('El pre-escaneo necesita numpy')
+        a = _codigos(data)
+        n = self.n = len(a)
+        self.errores = []
+
+        saltos = numpy.flatnonzero(a == _SALTO)
+        comillas = numpy.flatnonzero(a == _COMILLA)
+        almohadillas = numpy.flatnonzero(a == _ALMOHADILLA)
+        barras = numpy.flatnonzero(a == _BARRA)
+        self._cadenas_y_comentarios(a, saltos, comillas, almohadillas, barras)
+
+        # Solo los saltos fuera de cadenas cuentan como línea nueva, igual que
+        # en el lexer (t_STRING no cuenta los saltos que contiene)
+        saltos = saltos[~_dentro(saltos, self.cadenas[:, 0], self.cadenas[:, 1])]
+        self.inicios = numpy.r_[0, saltos + 1].astype(numpy.int64)
+        self._sangrias(a, ignore)
+        self._corchetes(a)
+
+        # Líneas lógicas: las que tienen código y no continúan un paréntesis
+        self.logicas = ~self.vacias & ~self.comentarios & (self.profundidad == 0)
+        lineas = numpy.flatnonzero(self.logicas)
+        if not self.errores:
+            _, _, _, errores = niveles(self.sangrias[lineas], lineas + 1)
+            self.errores.extend(errores)
+
+    # Spans de cadenas y comentarios. Camino rápido: las comillas no escapadas
+    # se emparejan por paridad y se comprueba que el resultado sea el mismo que
+    # daría el lexer recorriendo el texto; si no (comillas dentro de un
+    # comentario, cadenas sin cerrar...), se recorren las comillas y '#' una
+    # a una
+    def _cadenas_y_comentarios(self, a, saltos, comillas, almohadillas, barras):
+        n = self.n
+        escapadas = _escapados(comillas, barras)
+        libres = comillas[~escapadas]
+        # Un salto precedido de una barra sin escapar corta la cadena: en la
+        # expresión de t_STRING '.' no reconoce '\n'
+        cortes = saltos[_escapados(saltos, barras)]
+        if len(libres) % 2 == 0:
+            ini, fin = libres[0::2], libres[1::2] + 1
+            com = almohadillas[~_dentro(almohadillas, ini, fin)]
+            fin_com = _fin_de_linea(com, saltos, n)
+            primera = numpy.ones(len(com), dtype=bool)
+            primera[1:] = fin_com[1:] != fin_com[:-1]
+            com, fin_com = com[primera], fin_com[primera]
+            sin_comillas = numpy.all(numpy.searchsorted(libres, com) == numpy.searchsorted(libres, fin_com))
+            fuera = comillas[escapadas]
+            fuera = fuera[~_dentro(fuera, ini, fin)]
+            # Una comilla escapada fuera de una cadena abre una cadena, salvo
+            # dentro de un comentario
+            if (sin_comillas and _dentro(fuera, com, fin_com).all()
+                    and not _dentro(cortes, ini, fin).any()):
+                self.cadenas = numpy.stack((ini, fin), axis=1)
+                self.spans_comentarios = numpy.stack((com, fin_com), axis=1)
+                return
+
+        eventos = numpy.sort(numpy.concatenate((comillas, almohadillas))).tolist()
+        libres = libres.tolist()
+        cortes = cortes.tolist()
+        saltos = saltos.tolist()
+        cadenas = []
+        comentarios = []
+        pos = 0
+        k = 0
+        while True:
+            k = bisect.bisect_left(eventos, pos, k)
+            if k == len(eventos):
+                break
+            p = eventos[k]
+            if a[p] == _ALMOHADILLA:
+                j = bisect.bisect_left(saltos, p)
+                pos = saltos[j] if j < len(saltos) else n
+                comentarios.append((p, pos))
+                continue
+            j = bisect.bisect_right(libres, p)
+            if j < len(libres) and bisect.bisect_left(cortes, p) == bisect.bisect_left(cortes, libres[j]):
+                pos = libres[j] + 1
+                cadenas.append((p, pos))
+            else:
+                # Cadena sin cerrar: la comilla es un error léxico
+                pos = p + 1
+        self.cadenas = numpy.array(cadenas, dtype=numpy.int64).reshape(-1, 2)
+        self.spans_comentarios = numpy.array(comentarios, dtype=numpy.int64).reshape(-1, 2)
+
+    # Ancho del espacio inicial de cada línea, avanzando una columna a la vez
+    # sobre las líneas que todavía tienen espacio: tantas pasadas como la
+    # sangría más profunda
+    def _sangrias(self, a, ignore):
+        n = self.n
+        blancos = numpy.array([ord(c) for c in ignore], dtype=a.dtype)
+        sangrias = numpy.zeros(len(self.inicios), dtype=numpy.int64)
+        activas = numpy.arange(len(self.inicios))
+        while len(activas):
+            pos = self.inicios[activas] + sangrias[activas]
+            activas = activas[pos < n]
+            pos = pos[pos < n]
+            activas = activas[numpy.isin(a[pos], blancos)]
+            sangrias[activas] += 1
+        self.sangrias = sangrias
+        primero = self.inicios + sangrias
+        caracter = numpy.full(len(primero), _SALTO, dtype=numpy.int64)
+        hay = primero < n
+        caracter[hay] = a[primero[hay]]
+        self.vacias = caracter == _SALTO
+        self.comentarios = caracter == _ALMOHADILLA
+
+    # Profundidad de anidamiento con una suma acumulada sobre los paréntesis,
+    # corchetes y llaves que no están en cadenas ni comentarios
+    def _corchetes(self, a):
+        posiciones = []
+        clases = []
+        signos = []
+        for clase, (abre, cierra) in enumerate(zip(_ABREN, _CIERRAN)):
+            for c, signo in ((abre, 1), (cierra, -1)):
+                p = numpy.flatnonzero(a == ord(c))
+                posiciones.append(p)
+                clases.append(numpy.full(len(p), clase, dtype=numpy.int8))
+                signos.append(numpy.full(len(p), signo, dtype=numpy.int8))
+        pos = numpy.concatenate(posiciones)
+        orden = numpy.argsort(pos, kind='stable')
+        pos, clase, signo = pos[orden], numpy.concatenate(clases)[orden], numpy.concatenate(signos)[orden]
+        spans = numpy.concatenate((self.cadenas, self.spans_comentarios))
+        spans = spans[numpy.argsort(spans[:, 0], kind='stable')]
+        codigo = ~_dentro(pos, spans[:, 0], spans[:, 1])
+        pos, clase, signo = pos[codigo], clase[codigo], signo[codigo]
+        prof = numpy.cumsum(signo, dtype=numpy.int64)
+        self.corchetes = pos
+        self.profundidad_corchetes = prof
+
+        # Un cierre de más no deja la profundidad por debajo de cero, como en
+        # la etapa de indentación: se resta el mínimo acumulado
+        acotada = prof - numpy.minimum(numpy.minimum.accumulate(prof), 0) if len(pos) else prof
+        k = numpy.searchsorted(pos, self.inicios)
+        self.profundidad = numpy.where(k > 0, acotada[numpy.maximum(k, 1) - 1], 0) if len(pos) \
+            else numpy.zeros(len(self.inicios), dtype=numpy.int64)
+        if not len(pos):
+            return
+
+        if prof.min() < 0:
+            i = int(numpy.argmax(prof < 0))
+            self.errores.append("Error de sintaxis: '%s' sin abrir en la línea %d"
+                                % (_CIERRAN[clase[i]], self.linea(pos[i])))
+            return
+        # Agrupando por nivel (orden estable) cada apertura queda seguida de
+        # su cierre, así que los pares se comparan de una vez
+        nivel = numpy.where(signo > 0, prof, prof + 1)
+        orden = numpy.argsort(nivel, kind='stable')
+        nivel, pos, clase, signo = nivel[orden], pos[orden], clase[orden], signo[orden]
+        if prof[-1] > 0:
+            # La última apertura de cada nivel por encima del final no se cerró
+            ultima = numpy.r_[nivel[1:] != nivel[:-1], True] & (signo > 0)
+            i = numpy.flatnonzero(ultima)[0]
+            self.errores.append("Error de sintaxis: '%s' sin cerrar en la línea %d"
+                                % (_ABREN[clase[i]], self.linea(pos[i])))
+            return
+        malos = numpy.flatnonzero(clase[0::2] != clase[1::2])
+        if len(malos):
+            i = 2 * malos[numpy.argmin(pos[1::2][malos])]
+            self.errores.append("Error de sintaxis: '%s' en la línea %d no cierra '%s' de la línea %d"
+                                % (_CIERRAN[clase[i + 1]], self.linea(pos[i + 1]),
+                                   _ABREN[clase[i]], self.linea(pos[i])))
+
+    def linea(self, pos):
+        return int(numpy.searchsorted(self.inicios, pos, 'right'))
+
+    def lineas(self, pos):
+        return numpy.searchsorted(self.inicios, pos, 'right')
+
+
+# Pila de indentación sobre las columnas de las líneas lógicas. Solo recorre
+# las líneas donde la columna cambia; si aparece un error se repite línea a
+# línea, porque tras un error la pila ya no refleja la columna anterior.
+# Devuelve los INDENT (0 o 1) y DEDENT de cada línea, los niveles abiertos al
+# final y los mensajes de error de indentacion.py.
+def niveles(columnas, lineas, todas=False):
+    indent = numpy.zeros(len(columnas), dtype=numpy.int64)
+    dedent = numpy.zeros(len(columnas), dtype=numpy.int64)
+    errores = []
+    if todas:
+        cambios = range(len(columnas))
+    else:
+        cambios = numpy.flatnonzero(columnas != numpy.r_[0, columnas[:-1]]).tolist()
+    columnas = columnas.tolist()
+    pila = [0]
+    for i in cambios:
+        c = columnas[i]
+        if c > pila[-1]:
+            pila.append(c)
+            indent[i] = 1
+        elif c < pila[-1]:
+            k = 0
+            while c < pila[-1]:
+                pila.pop()
+                k += 1
+            dedent[i] = k
+            if c != pila[-1]:
+                if not todas:
+                    return niveles(numpy.asarray(columnas), lineas, True)
+                errores.append(indentacion.ERROR_NIVEL % lineas[i])
+    return indent, dedent, len(pila) - 1, errores
+
+
+# Expresión maestra del lexer con '\n' entre los caracteres ignorados: los
+# saltos de línea no producen ninguna coincidencia, lineno sale del
+# pre-escaneo
+def _maestra(lexer):
+    return re.compile('[%s]*(?:%s)' % (re.escape(lexer.ignore + '\n'), '|'.join(lexer.patrones)), re.VERBOSE)
+
+
+def _lexear(lexer, data, pre, buf):
+    tipos = buf.tipos.append
+    inicios = buf.inicios.append
+    fines = buf.fines.append
+    valores = buf.valores.append
+    codigos = buf.codigos
+    codigo = buf.codigo
+    interno = buf.interno
+    indice = buf.indices.get
+    acciones = lexer.acciones
+    literales = lexer.literales
+    reserved_get = lexer.reserved.get
+    lextokens = lexer.lextokens
+    LITERAL = lexer_rapido.LITERAL
+    ID = lexer_rapido.ID
+    NEWLINE = lexer_rapido.NEWLINE
+    DESCARTAR = lexer_rapido.DESCARTAR
+    INTEGER = lexer_rapido.INTEGER
+    STRING = lexer_rapido.STRING
+    TOKEN = lexer_rapido.TOKEN
+    saltar = lexer.ignore + '\n'
+    master = _maestra(lexer)
+    n = len(data)
+    pos = 0
+    while True:
+        m = None
+        for m in iter(master.scanner(data, pos).match, None):
+            i = m.lastindex
+            accion, tipo, regla = acciones[i]
+            if accion == NEWLINE or accion == DESCARTAR:
+                continue
+            if accion == LITERAL:
+                valor = m.group(i)
+                tipo = literales[valor]
+            elif accion == ID:
+                valor = m.group(i)
+                tipo = reserved_get(valor, 'ID')
+                if tipo not in lextokens:
+                    lexer.lexpos = m.end()
+                    lexer._id_invalido(m.end(), tipo)
+            elif accion == INTEGER:
+                valor = int(m.group(i))
+            elif accion == STRING:
+                valor = m.group(i)[1:-1]
+            elif accion == TOKEN:
+                valor = m.group(i)
+            else:
+                lexer.lineno = pre.linea(m.start(i))
+                tok = lexer._llamar(m, regla, m.start(i))
+                if tok:
+                    buf.append(tok, lexer.lexpos)
+                pos = lexer.lexpos
+                break
+            j = indice(valor) if accion != INTEGER else None
+            inicio, fin = m.span(i)
+            tipos(codigos[tipo] if tipo in codigos else codigo(tipo))
+            inicios(inicio)
+            fines(fin)
+            valores(interno(valor) if j is None else j)
+        else:
+            if m is not None:
+                pos = m.end()
+            while pos < n and data[pos] in saltar:
+                pos += 1
+            if pos >= n:
+                return
+            lexer.lineno = pre.linea(pos)
+            tok = lexer._error(pos)
+            if tok:
+                buf.append(tok, lexer.lexpos)
+            pos = lexer.lexpos
+
+
+# Tokeniza data y devuelve un TokenBuffer con NEWLINE, INDENT y DEDENT, el
+# mismo flujo que tokens_compactos.tokenize(data, indentar=True). Los errores
+# de indentación quedan en buf.errores.
+def tokenize(data, pre=None, lexer=None):
+    if pre is None:
+        pre = Preescaneo(data)
+    lexer = (lexer or FastLexer()).clone()
+    lexer.input(data)
+    buf = TokenBuffer(lexer.module.tokens)
+    _lexear(lexer, data, pre, buf)
+
+    tipos = numpy.frombuffer(buf.tipos, dtype=numpy.uint8)
+    inicios = numpy.frombuffer(buf.inicios, dtype=numpy.int64)
+    fines = numpy.frombuffer(buf.fines, dtype=numpy.int64)
+    valores = numpy.frombuffer(buf.valores, dtype=numpy.int32)
+    lineas = pre.lineas(inicios)
+    n = len(tipos)
+    if not n:
+        return buf
+
+    # Primer token de cada línea lógica: cambia la línea y no se está dentro
+    # de un paréntesis
+    nuevo = numpy.r_[True, lineas[1:] != lineas[:-1]] & (pre.profundidad[lineas - 1] == 0)
+    primeros = numpy.flatnonzero(nuevo)
+    columnas = inicios[primeros] - pre.inicios[lineas[primeros] - 1]
+    indent, dedent, abiertos, buf.errores = niveles(columnas, lineas[primeros])
+
+    # Tokens sintéticos delante de cada token: NEWLINE (salvo el primero),
+    # luego INDENT o los DEDENT
+    salto = numpy.zeros(n, dtype=numpy.int64)
+    salto[primeros[1:]] = 1
+    extra_indent = numpy.zeros(n, dtype=numpy.int64)
+    extra_indent[primeros] = indent
+    extra_dedent = numpy.zeros(n, dtype=numpy.int64)
+    extra_dedent[primeros] = dedent
+    extra = salto + extra_indent + extra_dedent
+    # Al final: NEWLINE y un DEDENT por cada bloque abierto
+    cola = 1 + abiertos
+    total = n + int(extra.sum()) + cola
+
+    destino = numpy.arange(n) + numpy.cumsum(extra)
+    r = numpy.repeat(numpy.arange(n), extra)
+    k = numpy.arange(len(r)) - numpy.repeat(numpy.cumsum(extra) - extra, extra)
+    es_salto = (k == 0) & (salto[r] == 1)
+    es_indent = ~es_salto & (extra_indent[r] == 1)
+
+    codigo_salto = buf.codigo('NEWLINE')
+    codigo_indent = buf.codigo('INDENT')
+    codigo_dedent = buf.codigo('DEDENT')
+    valor_salto = buf.interno('\n')
+    valor_vacio = buf.interno('')
+
+    o_tipos = numpy.empty(total, dtype=numpy.uint8)
+    o_inicios = numpy.empty(total, dtype=numpy.int64)
+    o_fines = numpy.empty(total, dtype=numpy.int64)
+    o_lineas = numpy.empty(total, dtype=numpy.int32)
+    o_valores = numpy.empty(total, dtype=numpy.int32)
+
+    o_tipos[destino] = tipos
+    o_inicios[destino] = inicios
+    o_fines[destino] = fines
+    o_lineas[destino] = lineas
+    o_valores[destino] = valores
+
+    sinteticos = numpy.ones(total, dtype=bool)
+    sinteticos[destino] = False
+    sinteticos[total - cola:] = False
+    s = numpy.flatnonzero(sinteticos)
+    anterior = numpy.maximum(r - 1, 0)
+    o_tipos[s] = numpy.where(es_salto, codigo_salto, numpy.where(es_indent, codigo_indent, codigo_dedent))
+    o_inicios[s] = numpy.where(es_salto, fines[anterior], inicios[r])
+    o_fines[s] = o_inicios[s]
+    o_lineas[s] = numpy.where(es_salto, lineas[anterior], lineas[r])
+    o_valores[s] = numpy.where(es_salto, valor_salto, valor_vacio)
+
+    o_tipos[total - cola:] = codigo_dedent
+    o_tipos[total - cola] = codigo_salto
+    o_inicios[total - cola:] = fines[-1]
+    o_fines[total - cola:] = fines[-1]
+    o_lineas[total - cola:] = lineas[-1]
+    o_valores[total - cola:] = valor_vacio
+    o_valores[total - cola] = valor_salto
+
+    buf.tipos = array('B', o_tipos.tobytes())
+    buf.inicios = array('q', o_inicios.tobytes())
+    buf.fines = array('q', o_fines.tobytes())
+    buf.lineas = array('i', o_lineas.tobytes())
+    buf.valores = array('i', o_valores.tobytes())
+    return buf
@@ -0,0 +1,104 @@
+# Reconocedor LALR: recorre las tablas de un ply.yacc.LRParser sin acciones
+# semánticas. No crea YaccSymbol ni YaccProduction, no llama a las funciones
+# p_* y no guarda posiciones: la única pila es la de estados, y una reducción
+# solo quita estados y sigue el goto. Sirve cuando basta con saber si el
+# código es válido y cuáles son los errores, como en ll_2.analyze().
+#
+# Los errores se informan con la misma p_error y se recuperan como en
+# LRParser.parse() para una gramática sin producciones con `error`: se cuenta
+# igual el silencio de tres tokens, se hacen las mismas reducciones por
+# defecto y se descarta el mismo token, así que la lista de errores es la
+# misma que la del parser completo.
+
+
+class _Fin(object):
+    type = '$end'
+    value = None
+
+
+_FIN = _Fin()
+
+
+class Reconocedor(object):
+
+    # parser: ply.yacc.LRParser, del que se toman las tablas. errorf: por
+    # defecto la del parser
+    def __init__(self, parser, errorf=None):
+        for acciones in parser.action.values():
+            if 'error' in acciones:
+                raise ValueError('la gramática tiene producciones con error')
+        n_estados = max(list(parser.action) + list(parser.goto)) + 1
+        self.acciones = [parser.action.get(s, {}) for s in range(n_estados)]
+        self.saltos = [parser.goto.get(s, {}) for s in range(n_estados)]
+        self.defecto = [parser.defaulted_states.get(s) for s in range(n_estados)]
+        self.largo = [p.len for p in parser.productions]
+        self.cabeza = [p.name for p in parser.productions]
+        self.errorf = errorf if errorf is not None else parser.errorfunc
+
+    # Devuelve True si la entrada es válida y False si no. Con primer_error
+    # se detiene en el primer error de sintaxis. errorf: para este análisis,
+    # en lugar de la del reconocedor. parse() no guarda estado en el objeto:
+    # un reconocedor se puede usar desde varios hilos a la vez
+    def parse(self, input=None, lexer=None, primer_error=False, errorf=None):
+        acciones, saltos, defecto = self.acciones, self.saltos, self.defecto
+        largo, cabeza = self.largo, self.cabeza
+        if errorf is None:
+            errorf = self.errorf
+        if input is not None:
+            lexer.input(input)
+        get_token = lexer.token
+
+        estados = [0]
+        estado = 0
+        lookahead = None
+        silencio = 0
+        valido = True
+        while True:
+            t = defecto[estado]
+            if t is None:
+                if lookahead is None:
+                    lookahead = get_token() or _FIN
+                t = acciones[estado].get(lookahead.type)
+
+            if t is not None:
+                if t > 0:
+                    estados.append(t)
+                    estado = t
+                    lookahead = None
+                    if silencio:
+                        silencio -= 1
+                    continue
+                if t < 0:
+                    plen = largo[-t]
+                    if plen:
+                        del estados[-plen:]
+                    estado = saltos[estados[-1]][cabeza[-t]]
+                    estados.append(estado)
+                    continue
+                return valido
+
+            # Error de sintaxis
+            valido = False
+            if not silencio and errorf is not None:
+                errorf(None if lookahead is _FIN else lookahead)
+                if primer_error:
+                    return False
+            silencio = 3
+            if lookahead is _FIN:
+                return False
+            # Sin producciones con error, PLY quita estados hasta el inicial
+            # (haciendo las reducciones por defecto que encuentre por el
+            # camino) y después descarta el token
+            while len(estados) > 1:
+                estados.pop()
+                estado = estados[-1]
+                t = defecto[estado]
+                while t is not None and t < 0:
+                    plen = largo[-t]
+                    if plen:
+                        del estados[-plen:]
+                    estado = saltos[estados[-1]][cabeza[-t]]
+                    estados.append(estado)
+                    t = defecto[estado]
+            lookahead = None
+            estado = 0
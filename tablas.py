@@ -0,0 +1,179 @@
+import hashlib
+import os
+import pickle
+import types
+
+import ply
+import ply.lex as lex
+
+import lexer_rapido
+
+# Caché persistente de las tablas que generan lex.lex() y yacc.yacc(). La
+# clave es un hash de lo que determina las tablas: la lista de tokens, las
+# expresiones regulares de las reglas t_* en el orden en que PLY las prueba,
+# las docstrings de las reglas p_*, start y precedence, más las versiones de
+# PLY. El cuerpo de las funciones no entra en el hash: las tablas guardan
+# solo sus nombres y al cargarlas se enlazan con las funciones del módulo.
+#
+# Con la caché caliente no se valida el módulo ni se construye nada: se lee
+# un pickle y se crean el Lexer y el LRParser directamente. Nunca se escribe
+# parsetab.py ni parser.out en el directorio de trabajo.
+#
+# Cada proceso escribe en un archivo temporal del mismo directorio y lo
+# renombra con os.replace(), que es atómico: si muchos procesos arrancan a la
+# vez con la caché vacía, todos construyen las tablas y el último rename gana,
+# pero ninguno lee nunca un archivo a medio escribir. Si el directorio no se
+# puede usar, las tablas se construyen sin caché.
+#
+# El directorio es el argumento directorio, o la variable de entorno
+# LL2_CACHE, o ~/.cache/ll_2.
+
+VARIABLE = 'LL2_CACHE'
+
+
+def directorio_cache(directorio=None):
+    return directorio or os.environ.get(VARIABLE) or os.path.join(os.path.expanduser('~'), '.cache', 'll_2')
+
+
+def _diccionario(module):
+    return module if isinstance(module, dict) else dict((k, getattr(module, k)) for k in dir(module))
+
+
+def _hash(partes):
+    return hashlib.sha256(repr(partes).encode('utf-8')).hexdigest()[:32]
+
+
+def firma_lexer(module):
+    ldict = _diccionario(module)
+    funciones, cadenas = lexer_rapido.reglas(ldict)
+    return _hash([
+        'lex', ply.__version__, lex.__tabversion__,
+        list(ldict['tokens']), ldict.get('literals', ''), ldict.get('states', ()),
+        ldict.get('t_ignore', ''), 't_error' in ldict, 't_eof' in ldict,
+        [(nombre, getattr(f, 'regex', f.__doc__)) for nombre, f in funciones],
+        cadenas,
+    ])
+
+
+def firma_parser(module):
+    import ply.yacc as yacc
+    pdict = _diccionario(module)
+    reglas = sorted((f.__code__.co_firstlineno, nombre, f.__doc__) for nombre, f in pdict.items()
+                    if nombre[:2] == 'p_' and nombre != 'p_error' and callable(f))
+    return _hash([
+        'yacc', ply.__version__, yacc.__tabversion__,
+        pdict.get('start'), pdict.get('precedence'), list(pdict['tokens']),
+        [(nombre, doc) for _, nombre, doc in reglas],
+    ])
+
+
+# Escribe el archivo completo en un temporal y lo renombra
+def _escribir(ruta, datos):
+    import tempfile
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(datos)
+        os.chmod(temporal, 0o644)
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+
+def _leer(ruta):
+    try:
+        with open(ruta, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+# Tablas del lexer con el mismo contenido que escribe Lexer.writetab()
+def _tabla_lexer(lexobj):
+    tabre = {}
+    for estado, lre in lexobj.lexstatere.items():
+        tabre[estado] = [(texto, lex._funcs_to_names(func, nombres)) for (_, func), texto, nombres in
+                         zip(lre, lexobj.lexstateretext[estado], lexobj.lexstaterenames[estado])]
+    return {
+        '_tabversion': lex.__tabversion__,
+        '_lextokens': set(lexobj.lextokens),
+        '_lexreflags': int(lexobj.lexreflags),
+        '_lexliterals': lexobj.lexliterals,
+        '_lexstateinfo': lexobj.lexstateinfo,
+        '_lexstatere': tabre,
+        '_lexstateignore': lexobj.lexstateignore,
+        '_lexstateerrorf': dict((e, f.__name__ if f else None) for e, f in lexobj.lexstateerrorf.items()),
+        '_lexstateeoff': dict((e, f.__name__ if f else None) for e, f in lexobj.lexstateeoff.items()),
+    }
+
+
+def lexer(module, directorio=None):
+    ruta = os.path.join(directorio_cache(directorio), 'lextab-%s.pickle' % firma_lexer(module))
+    datos = _leer(ruta)
+    if datos is not None:
+        try:
+            tabla = types.ModuleType('lextab')
+            tabla.__dict__.update(pickle.loads(datos))
+            lexobj = lex.Lexer()
+            lexobj.readtab(tabla, _diccionario(module))
+            return lexobj
+        except Exception:
+            pass
+    lexobj = lex.lex(module=module)
+    try:
+        _escribir(ruta, pickle.dumps(_tabla_lexer(lexobj), pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        pass
+    return lexobj
+
+
+def parser(module, directorio=None):
+    import ply.yacc as yacc
+    pdict = _diccionario(module)
+    ruta = os.path.join(directorio_cache(directorio), 'parsetab-%s.pickle' % firma_parser(module))
+    if os.path.exists(ruta):
+        try:
+            lr = yacc.LRTable()
+            lr.read_pickle(ruta)
+            lr.bind_callables(pdict)
+            return yacc.LRParser(lr, pdict.get('p_error'))
+        except Exception:
+            pass
+    # yacc() escribe el pickle directamente en picklefile: se le da un
+    # temporal propio y después se renombra
+    import tempfile
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        fd, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), prefix='.tmp-')
+        os.close(fd)
+        os.unlink(temporal)
+    except OSError:
+        return yacc.yacc(module=module, debug=False, write_tables=False)
+    try:
+        resultado = yacc.yacc(module=module, debug=False, write_tables=False, picklefile=temporal)
+        if os.path.exists(temporal):
+            os.replace(temporal, ruta)
+        return resultado
+    finally:
+        if os.path.exists(temporal):
+            os.unlink(temporal)
+
+
+# Parser LALR sobre las tablas compactas de tablas_compactas.py, guardadas en
+# la caché junto al pickle de PLY. Todos los procesos que lo cargan comparten
+# por mmap las páginas del mismo archivo. Si la caché no se puede usar se
+# devuelve el parser de PLY
+def parser_compacto(module, directorio=None):
+    import tablas_compactas
+    ruta = os.path.join(directorio_cache(directorio), 'lrtab-%s.bin' % firma_parser(module))
+    try:
+        if not os.path.exists(ruta):
+            tablas_compactas.guardar_lalr(ruta, parser(module, directorio))
+        return tablas_compactas.LRCompacto(ruta, _diccionario(module))
+    except (OSError, ValueError):
+        return parser(module, directorio)
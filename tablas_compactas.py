@@ -0,0 +1,438 @@
+import json
+import mmap
+import sys
+from array import array
+
+# Tablas de análisis como arrays de enteros en un archivo que cada proceso
+# abre con mmap en solo lectura: las páginas las comparte el sistema entre
+# todos los trabajadores en lugar de que cada uno tenga sus diccionarios.
+#
+# Formato: MAGIA, la longitud (uint32) de una cabecera JSON con los nombres
+# de los símbolos, las producciones y la posición de cada array, y después
+# los arrays de int32 (u otro tipo de array, apuntado en la cabecera) en el
+# orden de bytes de la máquina, alineados a 8.
+#
+# LALR (las tablas de PLY): terminales y no terminales son enteros pequeños
+# ('$end' es el terminal 0). La tabla action se comprime por desplazamiento
+# de filas: la acción del estado s con el terminal t está en valor[base[s] +
+# t] si check[base[s] + t] == s; si no, es un error. goto se comprime igual
+# (sin comprobar: después de una reducción la entrada siempre existe). Los
+# estados con una única acción de reducción van en defecto[] y, como en PLY,
+# reducen sin leer el siguiente token.
+#
+# LL(1) (predictivo.py): la tabla es densa, no terminal x terminal, más los
+# cuerpos de las producciones al revés uno detrás de otro.
+
+MAGIA = b'LL2TABS1'
+
+# int32 en todas las plataformas donde corre esto
+assert array('i').itemsize == 4
+
+
+# Comprime filas dispersas [(columna, valor), ...] por desplazamiento.
+# Devuelve (base, check, valor): la fila s queda en las posiciones base[s] +
+# columna, con check igual a s. Los arrays tienen al menos max(base) + ancho +
+# 1 posiciones, para que cualquier columna hasta ancho incluida se pueda
+# consultar sin salir de rango
+def comprimir(filas, ancho):
+    base = [0] * len(filas)
+    check = []
+    valor = []
+    libre = 0
+    # Primero las filas más llenas, cada una en el primer hueco donde cabe
+    for s in sorted(range(len(filas)), key=lambda s: -len(filas[s])):
+        fila = filas[s]
+        if not fila:
+            continue
+        columnas = [c for c, _ in fila]
+        b = libre - min(columnas)
+        while True:
+            ocupada = False
+            for c in columnas:
+                i = b + c
+                if i < len(check) and check[i] >= 0:
+                    ocupada = True
+                    break
+            if not ocupada:
+                break
+            b += 1
+        falta = b + max(columnas) + 1 - len(check)
+        if falta > 0:
+            check.extend([-1] * falta)
+            valor.extend([0] * falta)
+        for c, v in fila:
+            check[b + c] = s
+            valor[b + c] = v
+        base[s] = b
+        while libre < len(check) and check[libre] >= 0:
+            libre += 1
+    falta = max(base + [0]) + ancho + 1 - len(check)
+    if falta > 0:
+        check.extend([-1] * falta)
+        valor.extend([0] * falta)
+    return base, check, valor
+
+
+# Posición de cada array y cabecera completa: (texto de la cabecera,
+# {nombre: [posición, longitud(, typecode)]}, tamaño total). Los arrays son
+# de int32 salvo que sean array o memoryview de otro tipo, que se apunta en
+# la cabecera
+def disponer(cabecera, arrays):
+    cabecera = dict(cabecera, orden=sys.byteorder, arrays={})
+    for nombre, contenido in arrays.items():
+        cabecera['arrays'][nombre] = _entrada(0, contenido)
+    # Las posiciones dependen del tamaño de la cabecera: se calculan sobre una
+    # cabecera con posiciones provisionales del mismo ancho
+    while True:
+        texto = json.dumps(cabecera, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        pos = _alinear(len(MAGIA) + 4 + len(texto))
+        posiciones = {}
+        for nombre, contenido in arrays.items():
+            posiciones[nombre] = _entrada(pos, contenido)
+            pos = _alinear(pos + _tamano(contenido) * len(contenido))
+        if posiciones == cabecera['arrays']:
+            return texto, posiciones, pos
+        cabecera['arrays'] = posiciones
+
+
+def _tipo(contenido):
+    return getattr(contenido, 'typecode', None) or getattr(contenido, 'format', None) or 'i'
+
+
+def _tamano(contenido):
+    return array(_tipo(contenido)).itemsize
+
+
+def _entrada(pos, contenido):
+    tipo = _tipo(contenido)
+    return [pos, len(contenido)] if tipo == 'i' else [pos, len(contenido), tipo]
+
+
+# Escribe la cabecera y los arrays de disponer() en vista, un buffer
+# escribible de al menos el tamaño total y con ceros donde no hay nada
+def escribir_en(vista, texto, posiciones, arrays):
+    vista[:len(MAGIA) + 4 + len(texto)] = MAGIA + len(texto).to_bytes(4, 'little') + texto
+    for nombre, contenido in arrays.items():
+        if not isinstance(contenido, (array, memoryview)):
+            contenido = array('i', contenido)
+        bloque = memoryview(contenido).cast('B')
+        inicio = posiciones[nombre][0]
+        vista[inicio:inicio + len(bloque)] = bloque
+
+
+def guardar(ruta, cabecera, arrays):
+    import tablas
+    texto, posiciones, total = disponer(cabecera, arrays)
+    datos = bytearray(total)
+    escribir_en(datos, texto, posiciones, arrays)
+    tablas._escribir(ruta, bytes(datos))
+
+
+def _alinear(n):
+    return (n + 7) & ~7
+
+
+# Cabecera y arrays de un buffer con el formato de guardar(): (cabecera,
+# {nombre: memoryview}), vistas sobre el mismo buffer. origen es para los
+# mensajes de error
+def leer(datos, origen):
+    if datos[:len(MAGIA)] != MAGIA:
+        raise ValueError('%s: no es un archivo de tablas' % origen)
+    largo = int.from_bytes(datos[len(MAGIA):len(MAGIA) + 4], 'little')
+    inicio = len(MAGIA) + 4
+    cabecera = json.loads(bytes(datos[inicio:inicio + largo]).decode('utf-8'))
+    if cabecera['orden'] != sys.byteorder:
+        raise ValueError('%s: escrito con otro orden de bytes' % origen)
+    vista = memoryview(datos)
+    arrays = {}
+    for nombre, entrada in cabecera['arrays'].items():
+        pos, n = entrada[:2]
+        tipo = entrada[2] if len(entrada) > 2 else 'i'
+        arrays[nombre] = vista[pos:pos + array(tipo).itemsize * n].cast(tipo)
+    return cabecera, arrays
+
+
+# Abre un archivo de tablas con mmap: (cabecera, {nombre: memoryview})
+def abrir(ruta):
+    with open(ruta, 'rb') as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return leer(mapa, ruta)
+    except ValueError:
+        mapa.close()
+        raise
+
+
+# ----------------------------------------------------------------------------
+# LALR
+
+
+# Escribe las tablas de un ply.yacc.LRParser (o LRTable) en ruta
+def guardar_lalr(ruta, parser):
+    action = getattr(parser, 'action', None) or parser.lr_action
+    goto = getattr(parser, 'goto', None) or parser.lr_goto
+    producciones = getattr(parser, 'productions', None) or parser.lr_productions
+
+    terminales = ['$end']
+    for acciones in action.values():
+        for nombre in acciones:
+            if nombre not in terminales:
+                terminales.append(nombre)
+    no_terminales = []
+    for p in producciones:
+        if p.name not in no_terminales:
+            no_terminales.append(p.name)
+    for saltos in goto.values():
+        for nombre in saltos:
+            if nombre not in no_terminales:
+                no_terminales.append(nombre)
+    t_indice = dict((n, i) for i, n in enumerate(terminales))
+    nt_indice = dict((n, i) for i, n in enumerate(no_terminales))
+
+    n_estados = max(list(action) + list(goto)) + 1
+    filas = [[] for _ in range(n_estados)]
+    for s, acciones in action.items():
+        filas[s] = sorted((t_indice[n], v) for n, v in acciones.items())
+    base, check, valor = comprimir(filas, len(terminales))
+    filas = [[] for _ in range(n_estados)]
+    for s, saltos in goto.items():
+        filas[s] = sorted((nt_indice[n], v) for n, v in saltos.items())
+    gbase, _, gvalor = comprimir(filas, len(no_terminales))
+
+    defecto = [0] * n_estados
+    for s, acciones in action.items():
+        valores = list(acciones.values())
+        if len(valores) == 1 and valores[0] < 0:
+            defecto[s] = valores[0]
+
+    cabecera = {
+        'tipo': 'lalr',
+        'terminales': terminales,
+        'no_terminales': no_terminales,
+        'producciones': [[p.name, p.func, p.str] for p in producciones],
+    }
+    guardar(ruta, cabecera, {
+        'base': base, 'check': check, 'valor': valor,
+        'gbase': gbase, 'gvalor': gvalor,
+        'defecto': defecto,
+        'largo': [p.len for p in producciones],
+        'cabeza': [nt_indice[p.name] for p in producciones],
+    })
+
+
+# Parser LALR sobre las tablas de un archivo de guardar_lalr(). Sigue el bucle
+# de ply.yacc.LRParser.parse() sin tracking: llama a las mismas funciones p_*
+# con un YaccProduction, a p_error con el token inesperado y recupera los
+# errores de la misma forma.
+class LRCompacto(object):
+
+    def __init__(self, ruta, pdict, errorf=None):
+        from ply.yacc import YaccProduction, YaccSymbol
+        self._YaccProduction = YaccProduction
+        self._YaccSymbol = YaccSymbol
+        cabecera, arrays = abrir(ruta)
+        if cabecera['tipo'] != 'lalr':
+            raise ValueError('%s: no son tablas LALR' % ruta)
+        self.terminales = cabecera['terminales']
+        self.indice = dict((n, i) for i, n in enumerate(self.terminales))
+        self.nombres = [p[0] for p in cabecera['producciones']]
+        self.acciones = [pdict[p[1]] if p[1] else None for p in cabecera['producciones']]
+        for nombre, vista in arrays.items():
+            setattr(self, nombre, vista)
+        self.errorf = errorf if errorf is not None else pdict.get('p_error')
+        self.errorok = False
+        self.statestack = None
+        self.symstack = None
+        self.state = None
+        self.token = None
+
+    def errok(self):
+        self.errorok = True
+
+    def parse(self, input=None, lexer=None, debug=False, tracking=False, tokenfunc=None):
+        YaccSymbol = self._YaccSymbol
+        base, check, valor = self.base, self.check, self.valor
+        gbase, gvalor = self.gbase, self.gvalor
+        defecto, largo, cabeza = self.defecto, self.largo, self.cabeza
+        nombres, acciones = self.nombres, self.acciones
+        indice = self.indice
+        ninguno = len(self.terminales)
+        error_count = 3
+
+        pslice = self._YaccProduction(None)
+        errorcount = 0
+        if not lexer:
+            from ply import lex
+            lexer = lex.lexer
+        pslice.lexer = lexer
+        pslice.parser = self
+        if input is not None:
+            lexer.input(input)
+        get_token = lexer.token if tokenfunc is None else tokenfunc
+        self.token = get_token
+
+        statestack = self.statestack = [0]
+        symstack = self.symstack = []
+        pslice.stack = symstack
+        sym = YaccSymbol()
+        sym.type = '$end'
+        symstack.append(sym)
+        state = 0
+        lookahead = None
+        ltipo = 0
+        lookaheadstack = []
+
+        while True:
+            t = defecto[state]
+            if not t:
+                if lookahead is None:
+                    lookahead = lookaheadstack.pop() if lookaheadstack else get_token()
+                    if not lookahead:
+                        lookahead = YaccSymbol()
+                        lookahead.type = '$end'
+                    ltipo = indice.get(lookahead.type, ninguno)
+                i = base[state] + ltipo
+                t = valor[i] if check[i] == state else None
+
+            if t is not None:
+                if t > 0:
+                    # Desplazamiento
+                    statestack.append(t)
+                    state = t
+                    symstack.append(lookahead)
+                    lookahead = None
+                    if errorcount:
+                        errorcount -= 1
+                    continue
+
+                if t < 0:
+                    # Reducción por la producción -t
+                    r = -t
+                    plen = largo[r]
+                    sym = YaccSymbol()
+                    sym.type = nombres[r]
+                    sym.value = None
+                    if plen:
+                        targ = symstack[-plen - 1:]
+                        targ[0] = sym
+                    else:
+                        targ = [sym]
+                    pslice.slice = targ
+                    try:
+                        if plen:
+                            del symstack[-plen:]
+                        self.state = state
+                        acciones[r](pslice)
+                        if plen:
+                            del statestack[-plen:]
+                        symstack.append(sym)
+                        state = gvalor[gbase[statestack[-1]] + cabeza[r]]
+                        statestack.append(state)
+                    except SyntaxError:
+                        lookaheadstack.append(lookahead)
+                        if plen:
+                            symstack.extend(targ[1:-1])
+                        statestack.pop()
+                        state = statestack[-1]
+                        sym.type = 'error'
+                        sym.value = 'error'
+                        lookahead = sym
+                        ltipo = indice.get('error', ninguno)
+                        errorcount = error_count
+                        self.errorok = False
+                    continue
+
+                # Aceptación
+                return getattr(symstack[-1], 'value', None)
+
+            # Error de sintaxis
+            if errorcount == 0 or self.errorok:
+                errorcount = error_count
+                self.errorok = False
+                errtoken = lookahead
+                if errtoken.type == '$end':
+                    errtoken = None
+                if self.errorf:
+                    if errtoken and not hasattr(errtoken, 'lexer'):
+                        errtoken.lexer = lexer
+                    self.state = state
+                    tok = self.errorf(errtoken)
+                    if self.errorok:
+                        lookahead = tok
+                        ltipo = indice.get(tok.type, ninguno) if tok else 0
+                        continue
+                else:
+                    if errtoken:
+                        sys.stderr.write('yacc: Syntax error at line %d, token=%s\n'
+                                         % (getattr(lookahead, 'lineno', 0), errtoken.type))
+                    else:
+                        sys.stderr.write('yacc: Parse error in input. EOF\n')
+                        return
+            else:
+                errorcount = error_count
+
+            # Sin nada en la pila se descarta el token y se vuelve a empezar
+            if len(statestack) <= 1 and lookahead.type != '$end':
+                lookahead = None
+                state = 0
+                del lookaheadstack[:]
+                continue
+
+            if lookahead.type == '$end':
+                return
+
+            if lookahead.type != 'error':
+                sym = symstack[-1]
+                if sym.type == 'error':
+                    lookahead = None
+                    continue
+                t = YaccSymbol()
+                t.type = 'error'
+                if hasattr(lookahead, 'lineno'):
+                    t.lineno = t.endlineno = lookahead.lineno
+                if hasattr(lookahead, 'lexpos'):
+                    t.lexpos = t.endlexpos = lookahead.lexpos
+                t.value = lookahead
+                lookaheadstack.append(lookahead)
+                lookahead = t
+                ltipo = indice.get('error', ninguno)
+            else:
+                symstack.pop()
+                statestack.pop()
+                state = statestack[-1]
+
+
+# ----------------------------------------------------------------------------
+# LL(1)
+
+
+# Escribe las tablas de un predictivo.LL1Parser en ruta
+def guardar_ll1(ruta, parser):
+    cuerpos = []
+    inicios = [0]
+    for cuerpo in parser.apilar:
+        cuerpos.extend(cuerpo)
+        inicios.append(len(cuerpos))
+    guardar(ruta, {
+        'tipo': 'll1',
+        'terminales': parser.terminales,
+        'inicial': parser.inicial,
+    }, {
+        'tabla': parser.tabla,
+        'sincronia': parser.sincronia,
+        'cuerpos': cuerpos,
+        'inicios': inicios,
+    })
+
+
+# predictivo.LL1Parser sobre las tablas de un archivo de guardar_ll1()
+def cargar_ll1(ruta, terminal=None):
+    import predictivo
+    cabecera, arrays = abrir(ruta)
+    if cabecera['tipo'] != 'll1':
+        raise ValueError('%s: no son tablas LL(1)' % ruta)
+    inicios = arrays['inicios']
+    cuerpos = arrays['cuerpos']
+    apilar = [cuerpos[inicios[p]:inicios[p + 1]] for p in range(len(inicios) - 1)]
+    return predictivo.LL1Parser.desde_tablas(cabecera['terminales'], cabecera['inicial'], arrays['tabla'],
+                                             arrays['sincronia'], apilar, terminal)
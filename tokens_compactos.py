@@ -0,0 +1,270 @@
+from array import array
+
+from ply.lex import LexToken
+
+import lexer_rapido
+from lexer_rapido import FastLexer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Flujo de tokens en forma de columnas (struct-of-arrays) en lugar de un
+# LexToken por token:
+#   tipos    array('B')  índice del tipo en TokenBuffer.nombres
+#   inicios  array('q')  lexpos del token
+#   fines    array('q')  posición siguiente al token
+#   lineas   array('i')  lineno
+#   valores  array('i')  índice del valor en la tabla TokenBuffer.tabla
+# Los valores (textos de ID, STRING, enteros, operadores) se guardan una sola
+# vez en la tabla. Un token ocupa 25 bytes en columnas; un LexToken con su
+# diccionario de atributos ronda los 160 (bench_tokens_compactos.py).
+
+
+class TokenBuffer(object):
+
+    def __init__(self, nombres=None):
+        self.nombres = list(nombres or [])
+        self.codigos = dict((n, i) for i, n in enumerate(self.nombres))
+        self.tabla = []
+        self.indices = {}
+        self.errores = []
+        self.tipos = array('B')
+        self.inicios = array('q')
+        self.fines = array('q')
+        self.lineas = array('i')
+        self.valores = array('i')
+
+    def codigo(self, nombre):
+        c = self.codigos.get(nombre)
+        if c is None:
+            c = len(self.nombres)
+            if c > 255:
+                raise ValueError('Demasiados tipos de token para una columna uint8')
+            self.nombres.append(nombre)
+            self.codigos[nombre] = c
+        return c
+
+    def interno(self, valor):
+        # Los str se indexan por sí mismos; el resto por (tipo, valor) para que
+        # 1 y True, o 1 y 1.0, no se mezclen
+        clave = valor if valor.__class__ is str else (valor.__class__, valor)
+        i = self.indices.get(clave)
+        if i is None:
+            i = self.indices[clave] = len(self.tabla)
+            self.tabla.append(valor)
+        return i
+
+    def append(self, tok, fin=None):
+        self.tipos.append(self.codigo(tok.type))
+        self.inicios.append(tok.lexpos)
+        self.fines.append(tok.lexpos if fin is None else fin)
+        self.lineas.append(tok.lineno)
+        self.valores.append(self.interno(tok.value))
+
+    @classmethod
+    def from_tokens(cls, tokens, nombres=None):
+        buf = cls(nombres)
+        for tok in tokens:
+            buf.append(tok, getattr(tok, 'end', None))
+        return buf
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def type(self, i):
+        return self.nombres[self.tipos[i]]
+
+    def value(self, i):
+        return self.tabla[self.valores[i]]
+
+    def token(self, i):
+        tok = LexToken()
+        tok.type = self.nombres[self.tipos[i]]
+        tok.value = self.tabla[self.valores[i]]
+        tok.lineno = self.lineas[i]
+        tok.lexpos = self.inicios[i]
+        return tok
+
+    # Un corte comparte la tabla de valores; las columnas se copian, que con
+    # array es una copia de memoria contigua
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            buf = TokenBuffer.__new__(TokenBuffer)
+            buf.nombres = self.nombres
+            buf.codigos = self.codigos
+            buf.tabla = self.tabla
+            buf.indices = self.indices
+            buf.errores = self.errores
+            buf.tipos = self.tipos[i]
+            buf.inicios = self.inicios[i]
+            buf.fines = self.fines[i]
+            buf.lineas = self.lineas[i]
+            buf.valores = self.valores[i]
+            return buf
+        return self.token(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.token(i)
+
+    # Para pickle (y por tanto multiprocessing) basta con las columnas y la
+    # tabla; el índice de la tabla se reconstruye al cargar
+    def __getstate__(self):
+        return (self.nombres, self.tabla, self.errores, self.tipos, self.inicios,
+                self.fines, self.lineas, self.valores)
+
+    def __setstate__(self, estado):
+        (self.nombres, self.tabla, self.errores, self.tipos, self.inicios,
+         self.fines, self.lineas, self.valores) = estado
+        self.codigos = dict((n, i) for i, n in enumerate(self.nombres))
+        self.indices = dict((v if v.__class__ is str else (v.__class__, v), i)
+                            for i, v in enumerate(self.tabla))
+
+    def nbytes(self):
+        return sum(c.itemsize * len(c) for c in
+                   (self.tipos, self.inicios, self.fines, self.lineas, self.valores))
+
+    # Vistas NumPy sin copia sobre las mismas columnas
+    def to_numpy(self):
+        if numpy is None:
+            raise ImportError('to_numpy() necesita numpy')
+        return {
+            'tipos': numpy.frombuffer(self.tipos, dtype=numpy.uint8),
+            'inicios': numpy.frombuffer(self.inicios, dtype=numpy.int64),
+            'fines': numpy.frombuffer(self.fines, dtype=numpy.int64),
+            'lineas': numpy.frombuffer(self.lineas, dtype=numpy.int32),
+            'valores': numpy.frombuffer(self.valores, dtype=numpy.int32),
+        }
+
+    # Lexer de solo lectura sobre el buffer para parser.parse(lexer=...)
+    def lexer(self):
+        return BufferLexer(self)
+
+
+class BufferLexer(object):
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.i = 0
+        self.lineno = 1
+        self.lexpos = 0
+
+    def input(self, buf):
+        self.buf = buf
+        self.i = 0
+
+    def token(self):
+        i = self.i
+        buf = self.buf
+        if i >= len(buf.tipos):
+            return None
+        self.i = i + 1
+        tok = LexToken()
+        tok.type = buf.nombres[buf.tipos[i]]
+        tok.value = buf.tabla[buf.valores[i]]
+        tok.lineno = self.lineno = buf.lineas[i]
+        tok.lexpos = buf.inicios[i]
+        self.lexpos = buf.fines[i]
+        return tok
+
+
+# Analiza data y guarda los tokens directamente en columnas, sin crear un
+# LexToken por token. Con indentar=True los tokens pasan por la etapa de
+# indentación y el buffer incluye NEWLINE, INDENT y DEDENT, listo para el
+# parser; los errores de indentación quedan en buf.errores.
+def tokenize(data, lexer=None, indentar=False):
+    lexer = (lexer or FastLexer()).clone()
+    lexer.input(data)
+    if indentar:
+        return _tokenize_indentado(lexer)
+    buf = TokenBuffer(lexer.module.tokens)
+    tipos = buf.tipos.append
+    inicios = buf.inicios.append
+    fines = buf.fines.append
+    lineas = buf.lineas.append
+    valores = buf.valores.append
+    codigos = buf.codigos
+    codigo = buf.codigo
+    interno = buf.interno
+    indice = buf.indices.get
+    acciones = lexer.acciones
+    literales = lexer.literales
+    reserved_get = lexer.reserved.get
+    lextokens = lexer.lextokens
+    LITERAL = lexer_rapido.LITERAL
+    ID = lexer_rapido.ID
+    NEWLINE = lexer_rapido.NEWLINE
+    DESCARTAR = lexer_rapido.DESCARTAR
+    INTEGER = lexer_rapido.INTEGER
+    STRING = lexer_rapido.STRING
+    TOKEN = lexer_rapido.TOKEN
+    pos = 0
+    lineno = lexer.lineno
+    while True:
+        m = None
+        for m in iter(lexer.master.scanner(data, pos).match, None):
+            i = m.lastindex
+            accion, tipo, regla = acciones[i]
+            if accion == NEWLINE:
+                lineno += m.end() - m.start(i)
+                continue
+            if accion == DESCARTAR:
+                continue
+            if accion == LITERAL:
+                valor = m.group(i)
+                tipo = literales[valor]
+            elif accion == ID:
+                valor = m.group(i)
+                tipo = reserved_get(valor, 'ID')
+                if tipo not in lextokens:
+                    lexer.lexpos = m.end()
+                    lexer._id_invalido(m.end(), tipo)
+            elif accion == INTEGER:
+                valor = int(m.group(i))
+            elif accion == STRING:
+                valor = m.group(i)[1:-1]
+            elif accion == TOKEN:
+                valor = m.group(i)
+            else:
+                lexer.lineno = lineno
+                tok = lexer.emitir(m)
+                if tok:
+                    buf.append(tok, lexer.lexpos)
+                lineno = lexer.lineno
+                pos = lexer.lexpos
+                break
+            j = indice(valor) if accion != INTEGER else None
+            inicio, fin = m.span(i)
+            tipos(codigos[tipo] if tipo in codigos else codigo(tipo))
+            inicios(inicio)
+            fines(fin)
+            lineas(lineno)
+            valores(interno(valor) if j is None else j)
+        else:
+            if m is not None:
+                pos = m.end()
+            lexer.lineno = lineno
+            tok = lexer._error(pos)
+            if tok:
+                buf.append(tok, lexer.lexpos)
+            if lexer.lexpos > lexer.lexlen:
+                return buf
+            pos = lexer.lexpos
+            lineno = lexer.lineno
+
+
+def _tokenize_indentado(lexer):
+    import indentacion
+    etapa = indentacion.IndentLexer(lexer)
+    buf = TokenBuffer(lexer.module.tokens)
+    buf.errores = etapa.errores
+    # Solo hay un token del lexer a la vez en la cola de la etapa, así que su
+    # final es siempre lexer.lexpos
+    sinteticos = ('NEWLINE', 'INDENT', 'DEDENT')
+    while True:
+        tok = etapa.token()
+        if tok is None:
+            return buf
+        buf.append(tok, tok.lexpos if tok.type in sinteticos else lexer.lexpos)
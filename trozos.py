@@ -0,0 +1,142 @@
+import re
+
+import ll_2
+
+# Análisis de un solo archivo en paralelo, cortado por las definiciones de
+# primer nivel. DEF solo aparece en la regla Def, y Program es una lista de
+# Def, así que cada `def` en la columna 0 (fuera de cadenas, comentarios y
+# paréntesis) empieza una unidad independiente: ahí la etapa de indentación
+# ha cerrado todos los bloques (la pila queda en [0]) y el parser solo tiene
+# Def completas en la pila. Los trozos entre cortes se agrupan en unos
+# TROZOS_POR_PROCESO trozos de tamaño parecido por proceso y cada proceso
+# analiza los suyos con su sesión (ll_2.get_session()), con la pila de
+# indentación desde cero y los números de línea del archivo.
+#
+# El archivo es válido si y solo si lo es cada trozo: los tokens son los
+# mismos salvo el final de cada trozo ($end en lugar del DEF siguiente, y los
+# DEDENT con la línea del último token), y tras una lista de Def da igual lo
+# que siga. Los procesos solo reconocen y se detienen en el primer error. Si
+# algún trozo tiene errores, el resto del archivo desde ese trozo se analiza
+# en secuencia en este proceso: la recuperación de errores de PLY vacía la
+# pila y arrastra la cuenta de silencio de un trozo al siguiente, así que los
+# errores de trozos analizados por separado no serían exactamente los de
+# analyze(). El caso rápido es el de los archivos sin errores; con errores,
+# se paga el análisis secuencial desde el primer trozo con errores.
+#
+# Los errores léxicos, que t_error imprime, se guardan en los procesos y se
+# imprimen aquí en el orden del archivo.
+
+TROZOS_POR_PROCESO = 4
+
+# Busca los posibles cortes (el patrón inicio) saltando lo que puede
+# ocultarlos: las cadenas y los comentarios se saltan enteros con las mismas
+# expresiones que usa el lexer, un carácter que no empieza nada se salta como
+# en t_error, y se cuentan los paréntesis como en la etapa de indentación
+def _patron(inicio):
+    return re.compile('(%s)|%s|([(\\[{])|([)\\]}])|(%s)'
+                      % (ll_2.t_STRING.__doc__, ll_2.t_COMMENT.__doc__, inicio), re.M)
+
+# Un `def` en la columna 0
+DEFINICIONES = _patron('^def(?![A-Za-z0-9_|])')
+
+# Una línea que empieza en la columna 0 con una letra o un dígito, es decir,
+# con un ID, una palabra reservada o un INTEGER: en ella la etapa de
+# indentación vuelve al nivel 0 (ver lexer_paralelo.py)
+LINEAS_NIVEL_CERO = _patron('^(?=[A-Za-z0-9])')
+
+
+# Cortes de primer nivel (fuera de paréntesis) en code, en orden, como
+# (posición, línea); por defecto, los `def` de primer nivel. La línea es la
+# que lleva el lexer, que no cuenta los saltos de línea dentro de las cadenas
+def cortes(code, patron=DEFINICIONES):
+    posiciones = []
+    profundidad = 0
+    anterior = 0
+    linea = 1
+    en_cadenas = 0
+    for m in patron.finditer(code):
+        if m.group(2):
+            profundidad += 1
+        elif m.group(3):
+            if profundidad:
+                profundidad -= 1
+        elif m.group(4) is not None:
+            if profundidad == 0:
+                posicion = m.start()
+                linea += code.count('\n', anterior, posicion) - en_cadenas
+                posiciones.append((posicion, linea))
+                anterior = posicion
+                en_cadenas = 0
+        elif m.group(1):
+            en_cadenas += m.group(1).count('\n')
+    return posiciones
+
+
+# Trozos de code como (inicio, línea del inicio, texto), cortados en los
+# cortes de primer nivel de patron, unos n de tamaño parecido
+def trocear(code, n, patron=DEFINICIONES):
+    objetivo = len(code) // max(1, n)
+    trozos = []
+    inicio = 0
+    linea = 1
+    for corte, linea_corte in cortes(code, patron):
+        if corte > inicio and corte - inicio >= objetivo:
+            trozos.append((inicio, linea, code[inicio:corte]))
+            inicio = corte
+            linea = linea_corte
+    trozos.append((inicio, linea, code[inicio:]))
+    return trozos
+
+
+def _analizar_trozo(trozo):
+    _, linea, texto = trozo
+    sesion = ll_2.get_session()
+    mensajes = []
+
+    def error_lexico(t):
+        mensajes.append(ll_2._mensaje_lexico(t))
+        t.lexer.skip(1)
+
+    sesion.lexer.lexer.lexerrorf = error_lexico
+    return sesion.analyze(texto, recognize_only=True, fail_fast=True, lineno=linea) is True, mensajes
+
+
+def _iniciar():
+    ll_2.get_session()
+
+
+def crear_pool(procesos=None):
+    import multiprocessing
+    import lotes
+    ll_2.get_parser()
+    ll_2.get_reconocedor()
+    return multiprocessing.Pool(procesos or lotes.procesos_disponibles(), _iniciar)
+
+
+# Como ll_2.analyze(code, recognize_only, fail_fast), con los trozos en
+# procesos procesos (por defecto, todos los disponibles). pool: un pool de
+# crear_pool() ya arrancado, para no pagar su creación en cada llamada (con
+# procesos igual a los suyos)
+def analizar(code, procesos=None, recognize_only=False, fail_fast=False, pool=None):
+    import lotes
+    procesos = procesos or lotes.procesos_disponibles()
+    trozos = trocear(code, procesos * TROZOS_POR_PROCESO)
+    if len(trozos) == 1 or procesos == 1:
+        return ll_2.analyze(code, recognize_only, fail_fast)
+    propio = pool is None
+    if propio:
+        pool = crear_pool(procesos)
+    try:
+        # En orden: en el primer trozo con errores ya no hace falta esperar
+        # al resto
+        for (inicio, linea, _), (valido, mensajes) in zip(trozos, pool.imap(_analizar_trozo, trozos)):
+            if not valido:
+                # Desde aquí, en secuencia: los errores léxicos los imprime
+                # t_error
+                return ll_2.get_session().analyze(code[inicio:], recognize_only, fail_fast, lineno=linea)
+            for mensaje in mensajes:
+                print(mensaje)
+        return True
+    finally:
+        if propio:
+            pool.terminate()